@@ -0,0 +1,47 @@
+"""
+Benchmark for the Gemini client against a local fake backend.
+
+Measures time to the full answer, time to the first streamed chunk and the
+cost of a cached repeat question. Run from the repository root:
+
+    python -m benchmarks.bench_ai_chat
+"""
+import argparse
+import time
+
+from modules.ai_chat import GeminiClient
+from benchmarks.fakes import FakeModel
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--first-chunk-delay", type=float, default=0.4, help="fake model latency to first chunk (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.2, help="fake model delay between chunks (s)")
+    args = parser.parse_args()
+
+    model = FakeModel(args.first_chunk_delay, args.chunk_delay)
+    client = GeminiClient(model=model)
+
+    start = time.perf_counter()
+    client.generate("What is the capital of France?")
+    blocking = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stream = client.stream("Tell me about the moon")
+    next(stream)
+    first_chunk = time.perf_counter() - start
+    for _ in stream:
+        pass
+    streamed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        client.generate("  what is the CAPITAL of france?")
+    cached = (time.perf_counter() - start) / 1000
+
+    print(f"blocking answer      {blocking * 1e3:9.1f} ms")
+    print(f"stream first chunk   {first_chunk * 1e3:9.1f} ms  (full stream {streamed * 1e3:.1f} ms)")
+    print(f"cached repeat        {cached * 1e6:9.2f} us")
+    print(f"model calls {model.calls}, cache hits {client.cache.hits}, misses {client.cache.misses}")
+
+if __name__ == "__main__":
+    main()
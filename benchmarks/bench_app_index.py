@@ -0,0 +1,54 @@
+"""
+Benchmark for the trigram app index behind pc_control.find_app.
+
+Builds an index over synthetic application names and compares lookups
+(exact, misspelled and missing names) against a difflib.get_close_matches
+scan over every name, as find_app used to do. Run from the repository root:
+
+    python -m benchmarks.bench_app_index --apps 50000
+"""
+import argparse
+import difflib
+import random
+import time
+
+from benchmarks.fixtures import misspell, synthetic_names
+from modules.app_index import AppIndex
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apps", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--legacy-queries", type=int, default=10, help="queries for the slow difflib baseline")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = synthetic_names(args.apps, rng)
+    apps = {name: f"/opt/apps/{name}" for name in names}
+
+    start = time.perf_counter()
+    index = AppIndex(apps)
+    build = time.perf_counter() - start
+
+    queries = []
+    for _ in range(args.queries):
+        kind = rng.random()
+        name = rng.choice(names)
+        queries.append(name if kind < 0.3 else misspell(name, rng) if kind < 0.8 else "unknown tool")
+
+    start = time.perf_counter()
+    found = sum(index.lookup(q) is not None for q in queries)
+    indexed = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    for q in queries[:args.legacy_queries]:
+        if q not in apps:
+            difflib.get_close_matches(q, list(apps.keys()), n=1, cutoff=0.8)
+    legacy = (time.perf_counter() - start) / args.legacy_queries
+
+    print(f"{args.apps} apps, index built in {build:.2f} s")
+    print(f"  trigram index   {indexed * 1e3:9.3f} ms/lookup  ({found}/{len(queries)} found)")
+    print(f"  difflib scan    {legacy * 1e3:9.3f} ms/lookup")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark for search_google against a local stub search server.
+
+Compares the HTTP fetch mode on a pooled keep-alive session with a fresh
+connection per query. With --browser it also compares a pooled Chrome
+driver against starting a new driver per search, as search_google used to
+(requires Chrome and chromedriver). Run from the repository root:
+
+    python -m benchmarks.bench_browser --queries 200
+"""
+import argparse
+import time
+
+import requests
+
+from modules import browser
+from benchmarks.stub_server import start_stub_server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--browser", action="store_true", help="also benchmark Chrome (pooled vs new per search)")
+    parser.add_argument("--browser-queries", type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    queries = [f"query {i}" for i in range(args.queries)]
+
+    start = time.perf_counter()
+    for q in queries:
+        requests.get(browser.search_url(q, base_url), timeout=5)
+    fresh = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    for q in queries:
+        results = browser.fetch_search_results(q, base_url)
+    pooled = (time.perf_counter() - start) / len(queries)
+    assert results and results[0][1].startswith("https://example.com/")
+
+    print(f"HTTP fetch, fresh connection   {fresh * 1e3:8.2f} ms/query")
+    print(f"HTTP fetch, pooled session     {pooled * 1e3:8.2f} ms/query")
+
+    if args.browser:
+        from selenium import webdriver
+        pool = browser.BrowserPool(headless=True)
+        start = time.perf_counter()
+        for q in queries[:args.browser_queries]:
+            options = webdriver.ChromeOptions()
+            options.add_argument("--headless=new")
+            driver = webdriver.Chrome(options=options)
+            driver.get(browser.search_url(q, base_url))
+            driver.quit()
+        cold = (time.perf_counter() - start) / args.browser_queries
+
+        start = time.perf_counter()
+        for q in queries[:args.browser_queries]:
+            pool.get(browser.search_url(q, base_url))
+        warm = (time.perf_counter() - start) / args.browser_queries
+        pool.shutdown()
+        print(f"Chrome, new driver per search  {cold * 1e3:8.1f} ms/query")
+        print(f"Chrome, pooled driver          {warm * 1e3:8.1f} ms/query")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
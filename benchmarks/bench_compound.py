@@ -0,0 +1,80 @@
+"""
+Benchmark for compound commands: one action at a time versus the planner.
+
+Routes a set of multi-action utterances ("open chrome and spotify and remind
+me at 5 pm to stretch") into action plans and executes them with a fake
+executor whose actions take about as long as the real ones (launching an
+app, killing a process, writing a store, loading a results page). Compares
+the end-to-end time of running every action one after another against the
+planner's concurrent waves, and reports the routing cost of splitting. Run
+from the repository root:
+
+    python -m benchmarks.bench_compound
+"""
+import argparse
+import time
+
+from modules.intent_router import route
+from modules.planner import PlanRunner, schedule
+
+COMMANDS = [
+    "open chrome and spotify and remind me at 5 pm to stretch",
+    "close notepad, close calculator and open visual studio code",
+    "open chrome then search for train times to delhi",
+    "my favorite food is biryani and remind me at 7 pm to order dinner",
+    "open slack and zoom and calendar and remind me at 10 am to join standup",
+    "remind me at 6 pm to stretch and drink water, then close spotify",
+    "my friend name is rahul and open whatsapp",
+    "close chrome and firefox and exit",
+]
+
+# Rough cost of each action in seconds: app launch/lookup, taskkill, store writes, page load.
+LATENCY = {"open_app": 0.30, "close_app": 0.15, "reminder": 0.02, "remember": 0.02,
+           "recall": 0.01, "search": 0.40, "chat": 0.80, "exit": 0.0}
+
+def fake_execute(intent):
+    time.sleep(LATENCY.get(intent.name, 0.0))
+    return f"done: {intent.text}."
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="planner pool size")
+    parser.add_argument("--route-repeat", type=int, default=20000, help="routings timed per command")
+    args = parser.parse_args()
+
+    runner = PlanRunner(workers=args.workers)
+    sequential_total = planned_total = 0.0
+    print(f"{'command':<72}{'actions':>8}{'waves':>6}{'serial s':>10}{'planned s':>10}")
+    for command in COMMANDS:
+        intent = route(command)
+        actions = intent.actions
+        waves = schedule(actions, intent.slots.get("after_then"))
+
+        start = time.perf_counter()
+        for action in actions:
+            fake_execute(action)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        runner.run(actions, fake_execute, intent.slots.get("after_then"))
+        planned = time.perf_counter() - start
+
+        sequential_total += sequential
+        planned_total += planned
+        print(f"{command[:70]:<72}{len(actions):>8}{len(waves):>6}{sequential:>10.2f}{planned:>10.2f}")
+    print(f"{'total':<86}{sequential_total:>10.2f}{planned_total:>10.2f}  "
+          f"({sequential_total / planned_total:.1f}x faster)")
+
+    start = time.perf_counter()
+    for _ in range(args.route_repeat):
+        for command in COMMANDS:
+            route(command)
+    compound = (time.perf_counter() - start) / (args.route_repeat * len(COMMANDS))
+    start = time.perf_counter()
+    for _ in range(args.route_repeat):
+        route("open chrome")
+    single = (time.perf_counter() - start) / args.route_repeat
+    print(f"routing: {compound * 1e6:.1f} us per compound command, {single * 1e6:.1f} us for a single one")
+
+if __name__ == "__main__":
+    main()
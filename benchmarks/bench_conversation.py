@@ -0,0 +1,67 @@
+"""
+Benchmark for the bounded conversation session.
+
+Runs a long chat against the local fake model and reports the prompt size per
+turn with the rolling window + running summary, next to what resending the
+full history every turn would cost. Run from the repository root:
+
+    python -m benchmarks.bench_conversation --turns 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import FakeModel
+from modules.ai_chat import GeminiClient
+from modules.brain import MemoryStore
+from modules.conversation import ConversationSession, estimate_tokens
+
+TOPICS = ["the moon", "cricket", "my favorite food", "python decorators", "the weather in Delhi",
+          "my friend", "train timings", "a pasta recipe", "black holes", "my family"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--window-tokens", type=int, default=1024)
+    parser.add_argument("--summary-tokens", type=int, default=256)
+    parser.add_argument("--model-delay", type=float, default=0.0, help="fake model latency per call (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = MemoryStore(os.path.join(directory, "memory.json"))
+        store.add("favorite food", "burger")
+        store.add("friend", "pushpendra")
+        store.add("family", "mom and dad")
+
+        model = FakeModel(first_chunk_delay=args.model_delay, chunk_delay=0)
+        session = ConversationSession(GeminiClient(model=model), args.window_tokens,
+                                      args.summary_tokens, fact_search=store.search)
+        full_history = 0
+        session_prompt_tokens = []
+        full_prompt_tokens = []
+        latencies = []
+        for turn in range(args.turns):
+            question = f"Question {turn}: tell me something new about {TOPICS[turn % len(TOPICS)]}"
+            start = time.perf_counter()
+            reply = "".join(session.ask_stream(question))
+            latencies.append(time.perf_counter() - start)
+            session_prompt_tokens.append(session.stats()["last_prompt_tokens"])
+            full_prompt_tokens.append(full_history + estimate_tokens(question))
+            full_history += estimate_tokens(question) + estimate_tokens(reply)
+        session.wait_idle()
+        store.close()
+
+    latencies.sort()
+    print(f"{args.turns} turns, window {args.window_tokens} tokens, summary {args.summary_tokens} tokens")
+    print(f"{'turn':>8}{'session prompt':>16}{'full history':>14}")
+    for turn in sorted({t for t in (1, 10, 50, 100, args.turns // 2, args.turns) if 1 <= t <= args.turns}):
+        print(f"{turn:>8}{session_prompt_tokens[turn - 1]:>16}{full_prompt_tokens[turn - 1]:>14}")
+    stats = session.stats()
+    print(f"max session prompt {max(session_prompt_tokens)} tokens, "
+          f"{stats['summaries']} summaries, {model.calls} model calls")
+    print(f"turn latency p50 {latencies[len(latencies) // 2] * 1e3:.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1e3:.2f} ms")
+
+if __name__ == "__main__":
+    main()
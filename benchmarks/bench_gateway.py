@@ -0,0 +1,147 @@
+"""
+Benchmark for the outbound-call gateway against a local fake service.
+
+A stub HTTP server stands in for recognize_google / the translator / Gemini,
+and is made slow, hung or failing while the benchmark runs. Each scenario
+calls it once directly, as the assistant used to, and once through a
+Gateway:
+  - coalescing: many threads asking the same thing at once
+  - concurrency: more parallel calls than the service's limit
+  - outage: the service hangs, then returns errors; the circuit breaker
+    opens and calls fail fast to a local fallback, then it recovers
+  - keep-alive: sequential calls on the gateway's pooled session (needs requests)
+Run from the repository root:
+
+    python -m benchmarks.bench_gateway
+"""
+import argparse
+import threading
+import time
+from urllib.error import URLError
+from urllib.parse import quote_plus
+from urllib.request import urlopen
+
+from benchmarks.stub_server import FakeService, service_handler, start_stub_server
+from modules.gateway import CLOSED, Gateway
+
+def fetch(base_url, text, timeout=30):
+    """One request on a fresh connection, as recognize_google and the translator make them."""
+    with urlopen(f"{base_url}/?q={quote_plus(text)}", timeout=timeout) as response:
+        return response.read().decode()
+
+def in_threads(n, fn):
+    """Run fn(i) on n threads released together; returns the wall time."""
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        fn(i)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+def coalescing(state, base_url, gateway, threads):
+    state.delay, state.status = 0.2, 200
+    state.reset_counters()
+    direct = in_threads(threads, lambda i: fetch(base_url, "same phrase"))
+    direct_requests = state.requests
+    state.reset_counters()
+    gated = in_threads(threads, lambda i: gateway.call("translate", fetch, base_url, "same phrase", key="same phrase"))
+    print(f"coalescing  {threads} identical calls: direct {direct_requests} requests in {direct:.2f} s, "
+          f"gateway {state.requests} request(s) in {gated:.2f} s")
+
+def concurrency(state, base_url, gateway, calls):
+    state.delay, state.status = 0.1, 200
+    state.reset_counters()
+    direct = in_threads(calls, lambda i: fetch(base_url, f"phrase {i}"))
+    direct_peak = state.max_active
+    state.reset_counters()
+    gated = in_threads(calls, lambda i: gateway.call("translate", fetch, base_url, f"phrase {i}"))
+    limit = gateway.service("translate").max_concurrent
+    print(f"concurrency {calls} parallel calls: direct peak {direct_peak} at the service ({direct:.2f} s), "
+          f"gateway peak {state.max_active} with limit {limit} ({gated:.2f} s)")
+
+def outage(state, base_url, gateway, calls, hang):
+    service = gateway.service("speech")
+    state.delay, state.status = hang, 200
+    start = time.perf_counter()
+    try:
+        fetch(base_url, "hello", timeout=hang * 2)
+    except (URLError, OSError):
+        pass
+    print(f"outage      service hangs {hang:.1f} s: a direct call waits {time.perf_counter() - start:.2f} s")
+
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        gateway.call("speech", fetch, base_url, f"hello {i}", fallback=lambda: None)
+        latencies.append(time.perf_counter() - start)
+    s = service.stats()
+    print(f"            through the gateway ({service.timeout:.2f} s timeout): first call {latencies[0]:.2f} s, "
+          f"mean {sum(latencies) / calls * 1e3:.1f} ms over {calls} calls, "
+          f"{s['timeouts']} timed out, {s['rejected']} failed fast, circuit {s['state']}")
+
+    while service.in_flight:   # the hung calls still hold their slots until the service answers
+        time.sleep(0.05)
+    state.delay, state.status = 0.0, 500
+    time.sleep(service.breaker.reset_after)
+    gateway.call("speech", fetch, base_url, "trial", fallback=lambda: None)
+    print(f"            service returns errors: the half-open trial fails, circuit {service.breaker.state}")
+
+    state.status = 200
+    time.sleep(service.breaker.reset_after)
+    start = time.perf_counter()
+    answer = gateway.call("speech", fetch, base_url, "back", fallback=lambda: None)
+    print(f"            service recovers: trial answered {answer!r} in {(time.perf_counter() - start) * 1e3:.1f} ms, "
+          f"circuit {service.breaker.state}")
+    assert service.breaker.state == CLOSED
+
+def keep_alive(state, base_url, gateway, calls):
+    try:
+        import requests
+    except ImportError:
+        print("keep-alive  skipped: requests is not installed")
+        return
+    state.delay, state.status = 0.0, 200
+    state.reset_counters()
+    start = time.perf_counter()
+    for i in range(calls):
+        requests.get(f"{base_url}/?q={i}", timeout=5)
+    direct, direct_connections = time.perf_counter() - start, state.connections
+    state.reset_counters()
+    session = gateway.session("search")
+    start = time.perf_counter()
+    for i in range(calls):
+        gateway.call("search", session.get, f"{base_url}/?q={i}", timeout=5)
+    print(f"keep-alive  {calls} sequential calls: direct {direct_connections} connections in {direct:.2f} s, "
+          f"gateway {state.connections} connection(s) in {time.perf_counter() - start:.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=20, help="callers in the coalescing and concurrency runs")
+    parser.add_argument("--calls", type=int, default=50, help="calls in the outage and keep-alive runs")
+    parser.add_argument("--hang", type=float, default=2.0, help="seconds the hung service takes to answer")
+    args = parser.parse_args()
+
+    state = FakeService()
+    server, base_url = start_stub_server(service_handler(state))
+    gateway = Gateway({
+        "translate": {"max_concurrent": 4, "timeout": 5.0},
+        "speech": {"max_concurrent": 2, "timeout": 0.25, "failure_threshold": 3, "reset_after": 0.5},
+        "search": {"max_concurrent": 4, "timeout": 5.0},
+    })
+    try:
+        coalescing(state, base_url, gateway, args.threads)
+        concurrency(state, base_url, gateway, args.threads)
+        outage(state, base_url, gateway, args.calls, args.hang)
+        keep_alive(state, base_url, gateway, args.calls)
+        print(f"metrics     {gateway.report()}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark for per-utterance routing latency.
+
+Compares the compiled intent router against the old main.py dispatch chain
+(brain regex lists searched one by one, then substring checks) over a
+synthetic corpus of commands. Run from the repository root:
+
+    python -m benchmarks.bench_intent_router --size 5000
+"""
+import argparse
+import re
+import time
+
+from benchmarks.fixtures import build_corpus
+from modules.intent_router import route
+
+# The pre-router dispatch chain, kept here (without its side effects) as the baseline.
+LEGACY_TEACH = [
+    r"my friend name is\s+(.*)", r"remember that my friend(?: is)?\s+(.*)", r"(.*)\s+is my friend",
+    r"my best friend(?:'s)? name is\s+(.*)", r"my (?:favourite|favorite) food(?: is)?\s+(.*)",
+    r"i love (?:eating|food)\s+(.*)", r"my (?:favourite|favorite) place(?: is)?\s+(.*)",
+    r"i love (?:visiting|being in)\s+(.*)", r"my family(?: is)?\s+(.*)",
+    r"remember that my family(?: is)?\s+(.*)", r"my (girlfriend|boyfriend) name is\s+(.*)",
+    r"i am (single|married|in a relationship)", r"remember that my (girlfriend|boyfriend) is\s+(.*)",
+]
+LEGACY_QUERY = [
+    ["who is my friend", "how is my friend", "friend"],
+    ["favorite food", "favourite food", "what do i like to eat"],
+    ["favorite place", "favourite place", "where do i like to go"],
+    ["family", "my family"],
+    ["relationship", "girlfriend", "boyfriend"],
+]
+
+def legacy_route(command):
+    command = command.strip().lower()
+    for pattern in LEGACY_TEACH:
+        if re.search(pattern, command):
+            return "remember"
+    for keywords in LEGACY_QUERY:
+        if any(q in command for q in keywords):
+            return "recall"
+    for keyword in ("open", "close", "search", "set reminder", "remind me", "exit", "stop"):
+        if keyword in command:
+            return keyword
+    return "chat"
+
+def time_router(fn, corpus):
+    """Return sorted per-utterance latencies in microseconds."""
+    latencies = []
+    for command in corpus:
+        start = time.perf_counter()
+        fn(command)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    return latencies
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+def report(label, latencies):
+    mean = sum(latencies) / len(latencies)
+    print(f"{label:<8} mean {mean:7.2f} us  p50 {percentile(latencies, 50):7.2f} us  "
+          f"p95 {percentile(latencies, 95):7.2f} us  p99 {percentile(latencies, 99):7.2f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=5000, help="number of utterances in the corpus")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size)
+    print(f"Routing {len(corpus)} utterances...")
+    report("legacy", time_router(legacy_route, corpus))
+    report("router", time_router(route, corpus))
+
+if __name__ == "__main__":
+    main()
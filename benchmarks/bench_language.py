@@ -0,0 +1,56 @@
+"""
+Benchmark for the cached language detection and transliteration layer.
+
+Replays a stream of utterances (mostly ASCII, some repeated Hindi phrases)
+through detect_language and transliterate_hindi_to_roman, with the
+translator replaced by a fake that takes a fixed round-trip time, and
+prints the resulting hit rates and latencies. Run from the repository root:
+
+    python -m benchmarks.bench_language
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from modules import language
+
+HINDI = ["नमस्ते", "क्या हाल है", "मेरा नाम राहुल है", "आज मौसम अच्छा है", "धन्यवाद"]
+ENGLISH = ["open chrome", "what is the time", "remind me at 5 pm to stretch", "tell me a joke"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utterances", type=int, default=2000)
+    parser.add_argument("--hindi-ratio", type=float, default=0.2)
+    parser.add_argument("--network-delay", type=float, default=0.15, help="fake translator round trip (s)")
+    args = parser.parse_args()
+
+    class FakeTranslator:
+        def __init__(self, source, target):
+            pass
+
+        def translate(self, text):
+            time.sleep(args.network_delay)
+            return language.transliterate_offline(text)
+
+    language.GoogleTranslator = FakeTranslator
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        language.translation_cache = language.TranslationCache(os.path.join(directory, "translations.jsonl"))
+        start = time.perf_counter()
+        for _ in range(args.utterances):
+            text = rng.choice(HINDI) if rng.random() < args.hindi_ratio else rng.choice(ENGLISH)
+            if language.detect_language(text) == "hi":
+                language.transliterate_hindi_to_roman(text)
+        elapsed = time.perf_counter() - start
+
+    stats = language.language_stats()
+    uncached = args.utterances * args.hindi_ratio * args.network_delay
+    print(f"{args.utterances} utterances in {elapsed:.2f} s (about {uncached:.1f} s with a round trip per Hindi phrase)")
+    print(f"  detect skip rate     {stats['detect_skip_rate']:.1%}")
+    print(f"  translate hit rate   {stats['translate_hit_rate']:.1%}  "
+          f"({stats['translate_network']} network calls, mean {stats['network_mean_ms']:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Offline benchmark for the session Listener.
+
+Synthesizes a WAV file of tone bursts ("phrases") separated by silence, then
+feeds it through the Listener with a fake recognizer that takes a fixed time
+per phrase, standing in for the recognize_google round trip. Compares the
+overlapped capture/recognition pipeline against capturing and recognizing
+one phrase at a time. Run from the repository root:
+
+    python -m benchmarks.bench_listener
+"""
+import argparse
+import math
+import os
+import struct
+import tempfile
+import time
+import wave
+
+import speech_recognition as sr
+
+from modules.speech import Listener, get_recognizer
+
+RATE = 16000
+
+def write_wav(path, phrases, phrase_seconds, gap_seconds):
+    """Write `phrases` 440 Hz tone bursts separated by silence."""
+    frames = bytearray()
+    silence = b"\x00\x00" * int(RATE * gap_seconds)
+    frames += silence
+    for _ in range(phrases):
+        for i in range(int(RATE * phrase_seconds)):
+            frames += struct.pack("<h", int(12000 * math.sin(2 * math.pi * 440 * i / RATE)))
+        frames += silence
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(bytes(frames))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--phrases", type=int, default=10)
+    parser.add_argument("--phrase-seconds", type=float, default=1.0)
+    parser.add_argument("--gap-seconds", type=float, default=1.0)
+    parser.add_argument("--recognize-delay", type=float, default=0.5, help="fake recognition latency (s)")
+    args = parser.parse_args()
+
+    count = iter(range(1, 1_000_000))
+
+    def fake_recognize(audio):
+        time.sleep(args.recognize_delay)
+        return f"phrase {next(count)}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "phrases.wav")
+        write_wav(path, args.phrases, args.phrase_seconds, args.gap_seconds)
+
+        # Serial: capture one phrase, recognize it, repeat (the old listen()).
+        start = time.perf_counter()
+        recognizer = get_recognizer()
+        with sr.AudioFile(path) as source:
+            recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            while True:
+                audio = recognizer.listen(source, phrase_time_limit=10)
+                if not audio.frame_data:
+                    break
+                fake_recognize(audio)
+        serial = time.perf_counter() - start
+
+        listener = Listener(source_factory=lambda: sr.AudioFile(path), recognize=fake_recognize,
+                            calibration_seconds=0.5)
+        start = time.perf_counter()
+        phrases = 0
+        while listener.listen() is not None:
+            phrases += 1
+        pipelined = time.perf_counter() - start
+
+    print(f"serial     {serial:6.2f} s")
+    print(f"pipelined  {pipelined:6.2f} s  ({phrases} phrases, {listener.phrases_captured} captured)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark for vectorized recall over the brain memory.
+
+Indexes a large number of synthetic facts spread over many categories, then
+measures incremental adds, single-query latency, batched queries, and how
+often a rephrased question ("tell me about my <category>") finds the right
+category. Run from the repository root:
+
+    python -m benchmarks.bench_memory_recall --facts 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.fixtures import make_facts
+from modules.memory_index import MemoryIndex
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--facts", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    facts, categories = make_facts(args.facts, rng)
+
+    index = MemoryIndex(dim=args.dim)
+    start = time.perf_counter()
+    index.add_many(facts[:-1000])
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for category, fact in facts[-1000:]:
+        index.add(category, fact)
+    add = (time.perf_counter() - start) / 1000
+
+    questions = [(category, f"tell me about my {category}s") for category in rng.choices(categories, k=args.queries)]
+    latencies = []
+    correct = 0
+    for category, question in questions:
+        start = time.perf_counter()
+        matches = index.search(question, k=5)
+        latencies.append(time.perf_counter() - start)
+        correct += matches[0][1] == category
+    latencies.sort()
+
+    batch = [question for _, question in questions[:args.batch]]
+    start = time.perf_counter()
+    index.search_many(batch, k=5)
+    batched = (time.perf_counter() - start) / len(batch)
+
+    print(f"{len(index)} facts in {len(categories)} categories, {args.dim} dimensions "
+          f"({index._matrix.nbytes / 2 ** 20:.0f} MiB matrix)")
+    print(f"  bulk index   {build / (len(facts) - 1000) * 1e6:8.2f} us/fact  ({build:.2f} s)")
+    print(f"  add          {add * 1e6:8.2f} us/fact")
+    print(f"  query        {statistics.median(latencies) * 1e3:8.2f} ms p50, "
+          f"{latencies[int(len(latencies) * 0.95)] * 1e3:.2f} ms p95")
+    print(f"  batched      {batched * 1e3:8.2f} ms/query  (batches of {len(batch)})")
+    print(f"  top-1 category accuracy {correct / len(questions):.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark for the brain's MemoryStore.
+
+Adds and reads back a large number of facts in a temporary directory and
+compares against the old load-modify-rewrite JSON approach at a smaller
+size (it is quadratic, so running it at full scale takes minutes). Run from
+the repository root:
+
+    python -m benchmarks.bench_memory_store --facts 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from modules.brain import MemoryStore
+
+CATEGORIES = ["friend", "favorite food", "favorite place", "family", "relationship",
+              "girlfriend", "boyfriend", "hobby", "pet", "city"]
+
+def legacy_add(path, category, fact):
+    """The pre-MemoryStore add_fact: re-read, O(n) duplicate scan, full rewrite."""
+    try:
+        with open(path, "r") as f:
+            memory = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        memory = {}
+    cat = category.lower()
+    if cat in memory:
+        if fact.lower() not in [x.lower() for x in memory[cat]]:
+            memory[cat].append(fact)
+    else:
+        memory[cat] = [fact]
+    with open(path, "w") as f:
+        json.dump(memory, f, indent=4)
+
+def bench_store(directory, n):
+    path = os.path.join(directory, "memory.json")
+    store = MemoryStore(path)
+
+    start = time.perf_counter()
+    for i in range(n):
+        store.add(CATEGORIES[i % len(CATEGORIES)], f"Fact {i}")
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(n):
+        store.contains(CATEGORIES[i % len(CATEGORIES)], f"fact {i}")
+    lookup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for cat in CATEGORIES:
+        store.get(cat)
+    get_time = time.perf_counter() - start
+
+    store.close()
+    start = time.perf_counter()
+    reloaded = MemoryStore(path)
+    load_time = time.perf_counter() - start
+    assert sum(len(v) for v in reloaded.snapshot().values()) == n
+
+    print(f"MemoryStore, {n} facts:")
+    print(f"  add      {add_time / n * 1e6:8.2f} us/fact  ({add_time:.2f} s total, incl. compactions)")
+    print(f"  contains {lookup_time / n * 1e6:8.2f} us/lookup")
+    print(f"  get      {get_time / len(CATEGORIES) * 1e3:8.2f} ms/category")
+    print(f"  reload   {load_time:8.2f} s")
+
+def bench_legacy(directory, n):
+    path = os.path.join(directory, "legacy.json")
+    start = time.perf_counter()
+    for i in range(n):
+        legacy_add(path, CATEGORIES[i % len(CATEGORIES)], f"Fact {i}")
+    add_time = time.perf_counter() - start
+    print(f"Legacy JSON rewrite, {n} facts:")
+    print(f"  add      {add_time / n * 1e6:8.2f} us/fact  ({add_time:.2f} s total)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--facts", type=int, default=100000, help="facts to add to the store")
+    parser.add_argument("--legacy-facts", type=int, default=2000, help="facts for the legacy baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench_store(directory, args.facts)
+        bench_legacy(directory, args.legacy_facts)
+
+if __name__ == "__main__":
+    main()
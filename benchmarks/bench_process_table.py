@@ -0,0 +1,53 @@
+"""
+Benchmark for the shared process table.
+
+Compares four independent psutil.process_iter walks (what close_app,
+list_processes, kill_process and get_unused_tasks each did) with one
+ProcessTable sample served to all four, and shows how many processes look
+idle with the old unprimed cpu_percent versus primed deltas. Run from the
+repository root:
+
+    python -m benchmarks.bench_process_table
+"""
+import argparse
+import time
+
+import psutil
+
+from modules.process_table import ProcessTable
+
+def legacy_walks():
+    names = [p.info["name"] for p in psutil.process_iter(attrs=["name"])]
+    listed = [p.info for p in psutil.process_iter(attrs=["pid", "name"])]
+    matched = [p.info for p in psutil.process_iter(attrs=["pid", "name"]) if "python" in (p.info["name"] or "")]
+    idle = [p.info for p in psutil.process_iter(["pid", "name", "cpu_percent", "memory_info"])
+            if p.info["cpu_percent"] is not None and p.info["cpu_percent"] < 0.5]
+    return len(names), len(listed), len(matched), len(idle)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        legacy_idle = legacy_walks()[3]
+    legacy = (time.perf_counter() - start) / args.rounds
+
+    table = ProcessTable(prime_interval=0.5)
+    table.snapshot(primed=True)
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        snapshot = table.refresh()
+        table.names()
+        [info for info in snapshot.values() if "python" in info.name]
+        primed_idle = sum(1 for info in snapshot.values()
+                          if info.cpu_percent is not None and info.cpu_percent < 0.5)
+    shared = (time.perf_counter() - start) / args.rounds
+
+    print(f"{len(snapshot)} processes")
+    print(f"  four independent walks   {legacy * 1e3:8.2f} ms/round  ({legacy_idle} flagged idle, unprimed CPU)")
+    print(f"  one shared sample        {shared * 1e3:8.2f} ms/round  ({primed_idle} flagged idle, primed CPU)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark for the heap-based ReminderScheduler.
+
+Schedules thousands of reminders in a temporary reminders file, all due within
+a short window, then measures insert cost, how late each one fires, whether
+any fired twice, and how many times the timer thread woke up. Run from the
+repository root:
+
+    python -m benchmarks.bench_reminder_scheduler --reminders 5000
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from modules.background_tasks import ReminderScheduler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=5000, help="number of pending reminders")
+    parser.add_argument("--window", type=float, default=3.0, help="seconds over which reminders fall due")
+    args = parser.parse_args()
+
+    fired = Counter()
+    lateness = []
+    due_at = {}
+    done = threading.Event()
+
+    def on_due(message):
+        lateness.append(time.time() - due_at[message])
+        fired[message] += 1
+        if len(lateness) == args.reminders:
+            done.set()
+
+    with tempfile.TemporaryDirectory() as directory:
+        scheduler = ReminderScheduler(os.path.join(directory, "reminders.json"), on_due)
+        scheduler.start()
+
+        base = datetime.now() + timedelta(seconds=1)
+        start = time.perf_counter()
+        for i in range(args.reminders):
+            due = base + timedelta(seconds=args.window * i / args.reminders)
+            due_at[f"reminder {i}"] = due.timestamp()
+            scheduler.add(due, f"reminder {i}")
+        insert_time = time.perf_counter() - start
+
+        done.wait(args.window + 30)
+        scheduler.stop()
+
+    lateness.sort()
+    print(f"{args.reminders} reminders over {args.window:.1f} s")
+    print(f"  insert   {insert_time / args.reminders * 1e3:8.3f} ms/reminder (includes persisting)")
+    print(f"  fired    {len(fired)} distinct, {sum(c > 1 for c in fired.values())} fired more than once")
+    if lateness:
+        print(f"  lateness p50 {lateness[len(lateness) // 2] * 1e3:.2f} ms, max {lateness[-1] * 1e3:.2f} ms")
+    print(f"  wakeups  {scheduler.wakeups}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark for the pipelined speech output queue.
+
+Uses a fake TTS engine (speaking takes time proportional to the sentence
+length) and a fake per-sentence preparation delay standing in for language
+detection and translation. Reports time to first audio for the pipelined
+queue against preparing and speaking the whole text in one go, as the old
+speak() did. Run from the repository root:
+
+    python -m benchmarks.bench_speech_output
+"""
+import argparse
+import time
+
+from modules.speech import SpeechOutput, split_sentences
+
+class FakeEngine:
+    """pyttsx3 stand-in: runAndWait() sleeps for `seconds_per_char` per queued character."""
+
+    def __init__(self, seconds_per_char):
+        self.seconds_per_char = seconds_per_char
+        self._pending = 0
+
+    def say(self, text):
+        self._pending += len(text)
+
+    def runAndWait(self):
+        time.sleep(self._pending * self.seconds_per_char)
+        self._pending = 0
+
+    def stop(self):
+        self._pending = 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=6, help="sentences per answer")
+    parser.add_argument("--prepare-delay", type=float, default=0.15, help="fake detect/translate time per sentence (s)")
+    parser.add_argument("--seconds-per-char", type=float, default=0.002, help="fake speaking rate")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    text = " ".join(f"This is sentence number {i + 1} of a long answer." for i in range(args.sentences))
+
+    def prepare(sentence):
+        time.sleep(args.prepare_delay)
+        return sentence
+
+    # Old behaviour: prepare the whole text, then speak it.
+    engine = FakeEngine(args.seconds_per_char)
+    start = time.perf_counter()
+    for _ in split_sentences(text):
+        prepare("")
+    serial_ttfa = time.perf_counter() - start
+    engine.say(text)
+    engine.runAndWait()
+    serial_total = time.perf_counter() - start
+
+    output = SpeechOutput(engine_factory=lambda: FakeEngine(args.seconds_per_char), prepare=prepare)
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        output.say(text).wait()
+    pipelined_total = (time.perf_counter() - start) / args.runs
+    metrics = output.metrics()
+
+    print(f"serial     first audio {serial_ttfa * 1e3:8.1f} ms  total {serial_total * 1e3:8.1f} ms")
+    print(f"pipelined  first audio {metrics['ttfa_mean'] * 1e3:8.1f} ms  total {pipelined_total * 1e3:8.1f} ms")
+
+    # Barge-in: cancel a long answer shortly after it starts.
+    handle = output.say(text * 4)
+    time.sleep(args.prepare_delay * 2)
+    start = time.perf_counter()
+    output.cancel()
+    handle.wait()
+    print(f"barge-in   stopped after {(time.perf_counter() - start) * 1e3:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark for assistant startup.
+
+Imports main in fresh interpreters with `python -X importtime`, reports the
+median wall time of the import, the modules with the largest cumulative import
+time, and checks that none of the heavy optional libraries (speech, TTS,
+translation, Gemini, Selenium, psutil, tkinter, NumPy) were imported eagerly. Run from
+the repository root:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --module ui.cli --max-ms 150
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("speech_recognition", "pyttsx3", "deep_translator", "langdetect",
+                 "google.generativeai", "selenium", "requests", "psutil", "tkinter", "numpy")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed)
+print(",".join(heavy))
+"""
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def probe(module):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                             PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    elapsed, heavy = result.stdout.splitlines()
+    return float(elapsed), [name for name in heavy.split(",") if name], parse_importtime(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list")
+    parser.add_argument("--max-ms", type=float, help="exit with status 1 if the median import is slower")
+    args = parser.parse_args()
+
+    probe(args.module)  # warm the bytecode cache
+    samples = []
+    for _ in range(args.runs):
+        elapsed, heavy, times = probe(args.module)
+        samples.append(elapsed)
+    median_ms = statistics.median(samples) * 1e3
+
+    print(f"import {args.module}: median {median_ms:.1f} ms, min {min(samples) * 1e3:.1f} ms over {args.runs} runs")
+    print(f"{'module':<40}{'self ms':>10}{'cumul. ms':>12}")
+    for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{name:<40}{self_us / 1e3:>10.1f}{cumulative_us / 1e3:>12.1f}")
+    print("heavy libraries imported eagerly: " + (", ".join(heavy) if heavy else "none"))
+
+    if heavy or (args.max_ms is not None and median_ms > args.max_ms):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark for the reminder time parser.
+
+Times modules.time_parser.parse on each form of time expression (a time of
+day, relative, date-qualified, recurring and invalid), next to the old
+parse_time_str, which tried three strptime formats in turn and understood
+only times of day. Also times expanding a recurring reminder's next
+occurrence. Run from the repository root:
+
+    python -m benchmarks.bench_time_parser --rounds 20000
+"""
+import argparse
+import time
+from datetime import datetime
+
+from benchmarks.fixtures import TIME_EXPRESSIONS
+from modules.time_parser import Recurrence, parse
+
+def legacy_parse_time_str(time_str):
+    """The pre-parser parse_time_str, kept here as the baseline."""
+    normalized = time_str.strip().upper().replace('.', '')
+    for fmt in ["%I:%M %p", "%I:%M%p", "%H:%M"]:
+        try:
+            return datetime.strptime(normalized, fmt).strftime("%H:%M")
+        except ValueError:
+            continue
+    return None
+
+def per_call_us(fn, inputs, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds // len(inputs) + 1):
+        for text in inputs:
+            fn(text)
+    calls = (rounds // len(inputs) + 1) * len(inputs)
+    return (time.perf_counter() - start) * 1e6 / calls
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20000, help="calls per form")
+    args = parser.parse_args()
+
+    now = datetime.now()
+    understood = sum(parse(text, now) is not None for texts in TIME_EXPRESSIONS.values() for text in texts)
+    legacy_understood = sum(legacy_parse_time_str(text) is not None
+                            for texts in TIME_EXPRESSIONS.values() for text in texts)
+    total = sum(len(texts) for texts in TIME_EXPRESSIONS.values())
+    print(f"understood: parser {understood}/{total}, legacy {legacy_understood}/{total} "
+          f"({len(TIME_EXPRESSIONS['invalid'])} are invalid)")
+    for form, texts in TIME_EXPRESSIONS.items():
+        parsed = per_call_us(lambda text: parse(text, now), texts, args.rounds)
+        legacy = per_call_us(legacy_parse_time_str, texts, args.rounds)
+        print(f"{form:<10} parser {parsed:6.2f} us   legacy {legacy:6.2f} us")
+
+    rule = Recurrence("week", 1, (0, 2, 4))
+    due = parse("every monday at 8 am", now).due
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        rule.next_after(due)
+    print(f"next occurrence of a weekly reminder: {(time.perf_counter() - start) * 1e6 / args.rounds:.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Idle benchmark for the central timer service.
+
+Runs the assistant's idle background work in accelerated time (every interval
+divided by --speedup): process sampling every 10 s, the unused-task monitor
+every 60 s, idle-user eviction every 300 s and a reminder store whose thread
+re-checked the clock at least once a minute. First as before, with one
+polling thread per loop; then registered with one TimerService, normally and
+in low-power mode, where processes are only sampled by the monitor's own
+check, so the separate sampling loop is gone. Reports wakeups per (real-time) minute and the CPU used.
+Run from the repository root:
+
+    python -m benchmarks.bench_timers
+"""
+import argparse
+import threading
+import time
+
+from modules.timers import TimerService
+
+# (name, interval in seconds) of the idle loops before the timer service.
+LOOPS = [("process_table", 10), ("unused_tasks", 60), ("user_eviction", 300), ("reminders", 60)]
+
+def work():
+    sum(range(2000))   # a little work per run, the same in every mode
+
+def run_threads(speedup, seconds):
+    wakeups = [0]
+    stop = threading.Event()
+
+    def loop(interval):
+        while not stop.wait(interval / speedup):
+            wakeups[0] += 1
+            work()
+
+    threads = [threading.Thread(target=loop, args=(interval,), daemon=True) for _, interval in LOOPS]
+    cpu = time.process_time()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    return wakeups[0], time.process_time() - cpu
+
+def run_service(speedup, seconds, low_power):
+    service = TimerService()
+    service.MAX_SLEEP = TimerService.MAX_SLEEP / speedup
+    service.set_low_power(low_power)
+    timers = []
+    for name, interval in LOOPS:
+        if name == "process_table":
+            continue   # sampled on demand by the unused-task check
+        if name == "reminders":
+            timers.append(service.call_at(time.time() + 3600 / speedup, work, name))   # one reminder, an hour away
+        else:
+            timers.append(service.call_every(interval / speedup, work, name))
+    cpu = time.process_time()
+    time.sleep(seconds)
+    cpu = time.process_time() - cpu
+    for timer in timers:
+        timer.cancel()
+    return service.counts["wakeups"], cpu, service
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--speedup", type=float, default=200.0, help="how much faster than real time to run")
+    parser.add_argument("--seconds", type=float, default=6.0, help="benchmark length per mode")
+    args = parser.parse_args()
+    simulated_minutes = args.seconds * args.speedup / 60
+
+    def report(name, wakeups, cpu):
+        print(f"{name:<28}{wakeups / simulated_minutes:8.2f} wakeups/min  "
+              f"CPU {cpu * 1e3 / simulated_minutes:6.2f} ms/min")
+
+    print(f"{simulated_minutes:.0f} simulated minutes of idle per mode")
+    report("one thread per loop", *run_threads(args.speedup, args.seconds))
+    wakeups, cpu, service = run_service(args.speedup, args.seconds, low_power=False)
+    report("timer service", wakeups, cpu)
+    print(f"{'':<28}{service.counts['shared_wakeups']} wakeups ran several timers at once")
+    wakeups, cpu, _ = run_service(args.speedup, args.seconds, low_power=True)
+    report("timer service, low power", wakeups, cpu)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Concurrency benchmark for per-user sessions.
+
+Simulates hundreds of users issuing memory and reminder commands at once,
+with one user whose commands are slow (e.g. a long AI answer), and compares
+the per-user registry against the single shared store behind one global
+dispatch lock. Also reports lazy loads, eviction and reload times. Run from
+the repository root:
+
+    python -m benchmarks.bench_users --users 300
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from modules.background_tasks import ReminderScheduler
+from modules.brain import MemoryStore, add_fact, describe_fact
+from modules.users import UserRegistry
+
+SLOW_USER = "user-0"
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+def command(memory, reminders, user_id, i, slow_seconds):
+    add_fact("favorite food", f"dish {i} of {user_id}", memory)
+    describe_fact("favorite food", memory)
+    if i % 5 == 0:
+        reminders.add(datetime.now() + timedelta(hours=1), f"task {i}")
+    if user_id == SLOW_USER:
+        time.sleep(slow_seconds)
+
+def run(workers, users, ops, do_command):
+    latencies = []
+    lock = threading.Lock()
+
+    def user_loop(user_id):
+        for i in range(ops):
+            start = time.perf_counter()
+            do_command(user_id, i)
+            elapsed = time.perf_counter() - start
+            if user_id != SLOW_USER:
+                with lock:
+                    latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(user_loop, [f"user-{n}" for n in range(users)]))
+    return time.perf_counter() - start, sorted(latencies)
+
+def report(name, elapsed, latencies, total_ops):
+    print(f"{name:<26}{elapsed:8.2f} s  {total_ops / elapsed:8.0f} ops/s  "
+          f"p50 {percentile(latencies, 50) * 1e3:7.2f} ms  p99 {percentile(latencies, 99) * 1e3:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--ops", type=int, default=20, help="commands per user")
+    parser.add_argument("--workers", type=int, default=64, help="users served concurrently")
+    parser.add_argument("--slow-seconds", type=float, default=0.05, help="extra time per command of the slow user")
+    args = parser.parse_args()
+    total_ops = args.users * args.ops
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Before: one shared store, every command under one global lock.
+        memory = MemoryStore(os.path.join(directory, "memory.json"))
+        reminders = ReminderScheduler(os.path.join(directory, "reminders.json"), print)
+        global_lock = threading.Lock()
+
+        def shared(user_id, i):
+            with global_lock:
+                command(memory, reminders, user_id, i, args.slow_seconds)
+
+        elapsed, latencies = run(args.workers, args.users, args.ops, shared)
+        memory.close()
+
+        # After: per-user stores, sharded on disk, per-user locks.
+        registry = UserRegistry(root=os.path.join(directory, "users"))
+
+        def per_user(user_id, i):
+            with registry.session(user_id) as user:
+                command(user.memory, user.reminders, user_id, i, args.slow_seconds)
+
+        user_elapsed, user_latencies = run(args.workers, args.users, args.ops, per_user)
+
+        print(f"{args.users} users x {args.ops} commands, {args.workers} concurrent, "
+              f"{SLOW_USER} takes +{args.slow_seconds * 1e3:.0f} ms per command")
+        report("global lock, shared store", elapsed, latencies, total_ops)
+        report("per-user sessions", user_elapsed, user_latencies, total_ops)
+
+        loaded = len(registry.loaded_users())
+        start = time.perf_counter()
+        evicted = registry.evict_idle(max_idle=0)
+        evict_time = time.perf_counter() - start
+        start = time.perf_counter()
+        with registry.session("user-1") as user:
+            facts = len(user.memory.get("favorite food"))
+        reload_time = time.perf_counter() - start
+        shards = len(os.listdir(os.path.join(directory, "users")))
+        print(f"{loaded} users loaded, {evicted} evicted in {evict_time * 1e3:.1f} ms, "
+              f"reload of one user {reload_time * 1e3:.2f} ms ({facts} facts), {shards} shard directories")
+        registry.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Offline benchmark for the voice-activity detector in front of recognize_google.
+
+Synthesizes a WAV recording of voiced "phrases" (a pitched harmonic tone
+with syllable-rate loudness changes) on a noise floor, mixed with quiet
+background chatter, clicks and clipped noise bursts, or reads one given with
+--wav. The file is streamed through the VAD in microphone-sized chunks.
+Reports processing speed in frames per second, how much of the audio would
+be sent for recognition (before the VAD, every phrase-limited chunk was
+sent), and how much of the planted speech the segments cover. Run from the
+repository root:
+
+    python -m benchmarks.bench_vad
+"""
+import argparse
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from modules.vad import VoiceActivityDetector, WavSource
+
+RATE = 16000
+
+def synthesize(path, seconds, phrases, seed=0):
+    """Write the test recording; returns the planted speech as [(start, end)] in seconds."""
+    rng = np.random.default_rng(seed)
+    audio = rng.normal(0, 60, int(RATE * seconds))          # noise floor
+    t = np.arange(len(audio)) / RATE
+    chatter = np.sin(2 * np.pi * 180 * t) * 90 * (1 + np.sin(2 * np.pi * 0.3 * t))
+    audio += chatter                                          # distant voices, below the threshold
+
+    speech = []
+    slots = np.linspace(1.0, seconds - 4.0, phrases)
+    for start in slots:
+        length = rng.uniform(1.0, 3.0)
+        n = int(RATE * length)
+        i = int(RATE * start)
+        f0 = rng.uniform(110, 220)
+        tt = np.arange(n) / RATE
+        voice = sum(np.sin(2 * np.pi * f0 * k * tt) / k for k in (1, 2, 3))
+        syllables = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * tt) ** 2
+        audio[i:i + n] += 5000 * voice * syllables
+        speech.append((start, start + length))
+
+    for _ in range(phrases * 2):                              # clicks and clipped bursts between phrases
+        i = int(RATE * rng.uniform(0.5, seconds - 0.5))
+        n = int(RATE * rng.uniform(0.01, 0.08))
+        audio[i:i + n] += rng.normal(0, 30000, n)
+
+    pcm = np.clip(audio, -32768, 32767).astype("<i2")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(pcm.tobytes())
+    return speech
+
+def covered(speech, segments):
+    """Fraction of the planted speech that lies inside a segment."""
+    total = sum(end - start for start, end in speech)
+    inside = sum(max(0.0, min(end, s.end) - max(start, s.start))
+                 for start, end in speech for s in segments)
+    return inside / total
+
+def run(path, chunk):
+    segments = []
+    with WavSource(path, chunk=chunk) as source:
+        detector = VoiceActivityDetector(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        duration = source._wav.getnframes() / source.SAMPLE_RATE
+        start = time.perf_counter()
+        while True:
+            data = source.stream.read(source.CHUNK)
+            if not data:
+                segments.extend(detector.flush())
+                break
+            segments.extend(detector.feed(data))
+        elapsed = time.perf_counter() - start
+    return detector, segments, duration, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--wav", help="mono WAV file to use instead of the synthetic recording")
+    parser.add_argument("--seconds", type=float, default=300.0, help="length of the synthetic recording")
+    parser.add_argument("--phrases", type=int, default=60, help="phrases in the synthetic recording")
+    parser.add_argument("--chunk", type=int, default=1024, help="samples per read, as from the microphone")
+    parser.add_argument("--phrase-time-limit", type=float, default=10.0, help="the old listen() limit (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path, speech = args.wav, None
+        if path is None:
+            path = os.path.join(directory, "session.wav")
+            speech = synthesize(path, args.seconds, args.phrases)
+        detector, segments, duration, elapsed = run(path, args.chunk)
+
+    stats = detector.stats
+    frame_ms = detector.frame_samples * 1000 / detector.sample_rate
+    print(f"{duration:.0f} s of audio, {stats['frames']} frames of {frame_ms:.0f} ms, chunks of {args.chunk} samples")
+    print(f"  speed      {stats['frames'] / elapsed:,.0f} frames/s ({duration / elapsed:,.0f}x real time, "
+          f"{elapsed / stats['frames'] * 1e6:.1f} us per frame)")
+    print(f"  sent       {detector.fraction_sent:.1%} of the audio in {stats['segments']} segments "
+          f"({stats['rejected']} noise bursts rejected); without VAD up to "
+          f"{duration / args.phrase_time_limit:.0f}+ requests covering 100%")
+    if speech is not None:
+        print(f"  speech     {len(speech)} phrases planted, {covered(speech, segments):.1%} of their audio sent")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Local stand-ins for network services, browsers and the process list, used by the benchmarks.
+"""
+import contextlib
+import time
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    """
+    Offline replacement for bard.GenerativeModel.
+    Answers every prompt after `first_chunk_delay` seconds, then streams the
+    rest of the reply in sentence-sized chunks `chunk_delay` seconds apart.
+    Replies mention the last few words of the prompt, so their length does not
+    grow with the prompt; every prompt is kept in `prompts`.
+    """
+
+    def __init__(self, first_chunk_delay=0.4, chunk_delay=0.2, sentences=4):
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+        self.sentences = sentences
+        self.calls = 0
+        self.prompts = []
+
+    def _chunks(self, prompt):
+        self.calls += 1
+        self.prompts.append(prompt)
+        topic = " ".join(prompt.replace("Assistant:", "").split()[-6:])
+        time.sleep(self.first_chunk_delay)
+        for i in range(self.sentences):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield FakeChunk(f"Sentence {i + 1} about {topic}. ")
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        if stream:
+            return self._chunks(prompt)
+        return FakeChunk("".join(chunk.text for chunk in self._chunks(prompt)))
+
+class FakeDriver:
+    """Offline replacement for a Selenium Chrome driver; remembers the pages it was sent to."""
+
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def quit(self):
+        pass
+
+class FakeMemoryInfo:
+    def __init__(self, rss):
+        self.rss = rss
+
+class FakeProcess:
+    """A process as psutil.process_iter() yields it, with fixed name, CPU and memory."""
+
+    def __init__(self, pid, name, cpu_percent, rss, create_time=0.0):
+        self.pid = pid
+        self._name = name
+        self._cpu_percent = cpu_percent
+        self._rss = rss
+        self._create_time = create_time
+
+    def __eq__(self, other):
+        return isinstance(other, FakeProcess) and (self.pid, self._create_time) == (other.pid, other._create_time)
+
+    def __hash__(self):
+        return hash((self.pid, self._create_time))
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def name(self):
+        return self._name
+
+    def cpu_percent(self, interval=None):
+        return self._cpu_percent
+
+    def memory_info(self):
+        return FakeMemoryInfo(self._rss)
+
+class FakePsutil:
+    """
+    Offline replacement for the psutil module, serving a fixed process list.
+    Install it as the `psutil` of modules.process_table to sample synthetic
+    processes.
+    """
+
+    class NoSuchProcess(Exception):
+        pass
+
+    class AccessDenied(Exception):
+        pass
+
+    class ZombieProcess(Exception):
+        pass
+
+    def __init__(self, processes):
+        self.processes = processes
+
+    def process_iter(self, attrs=None):
+        return iter(self.processes)
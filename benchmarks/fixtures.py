@@ -0,0 +1,134 @@
+"""
+Synthetic data for the benchmarks: utterances, memory facts, reminders, app
+names and process lists, generated at any scale from a seeded random source.
+"""
+import json
+import os
+import random
+import string
+from datetime import datetime, timedelta
+
+from benchmarks.fakes import FakeProcess, FakePsutil
+
+# ------------------------------
+# Utterances
+# ------------------------------
+TEMPLATES = [
+    "open {app}", "close {app}", "search for {topic}", "search {topic}",
+    "remind me at {hour}:{minute} pm to {task}", "set reminder at {hour}:{minute} am {task}",
+    "my friend name is {name}", "{name} is my friend", "my favorite food is {food}",
+    "my favourite place is {place}", "i am married", "my girlfriend name is {name}",
+    "who is my friend", "what is my favorite food", "tell me about my family",
+    "what is my relationship status", "tell me a joke about {topic}",
+    "what is the weather in {place}", "how far is {place} from {place}", "exit",
+]
+COMPOUND_TEMPLATES = [
+    "open {app} and {app} and remind me at {hour} pm to {task}",
+    "close {app}, then open {app}",
+    "my favorite food is {food} and what is my favorite food",
+    "open {app} then search for {topic}",
+]
+WORDS = {
+    "app": ["chrome", "spotify", "notepad", "firefox", "vlc", "code"],
+    "topic": ["open source", "python", "cricket scores", "friend requests", "family recipes"],
+    "hour": [str(h) for h in range(1, 13)],
+    "minute": ["00", "15", "30", "45"],
+    "task": ["call john", "stretch", "drink water", "check the oven"],
+    "name": ["ishant", "anjali", "pushpendra", "rahul"],
+    "food": ["pizza", "burger", "biryani"],
+    "place": ["paris", "goa", "delhi", "tokyo"],
+}
+
+def build_corpus(size, seed=0, templates=TEMPLATES):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        template = rng.choice(templates)
+        corpus.append(template.format(**{k: rng.choice(v) for k, v in WORDS.items()}))
+    return corpus
+
+TIME_STRINGS = ["10:52 PM", "10:52PM", "10:52 p.m.", "22:52", "7:05 am", "12:00 AM", "9:30", "25:99", "noon"]
+# Reminder time expressions by form, as the time parser sees them.
+TIME_EXPRESSIONS = {
+    "clock": ["10:52 PM", "10:52 p.m.", "22:52", "7:05 am", "noon", "5 pm", "at 9:30", "tonight at 9"],
+    "relative": ["in 20 minutes", "in an hour", "after 2 hours", "in half an hour", "in 3 days"],
+    "dated": ["tomorrow at 9", "at 5 pm on friday", "next monday morning", "on march 5th at 8 am",
+              "the day after tomorrow at noon", "the 5th of june"],
+    "recurring": ["every monday at 8 am", "every weekday at 7", "every 2 hours", "daily at 9",
+                  "every monday and wednesday at 8", "every morning"],
+    "invalid": ["25:99", "13 pm", "february 30", "whenever"],
+}
+
+# ------------------------------
+# Memory Facts
+# ------------------------------
+SUBJECTS = ["car", "pet", "teacher", "doctor", "city", "school", "bank", "gym", "phone", "laptop",
+            "cousin", "uncle", "aunt", "neighbour", "boss", "colleague", "dentist", "team", "club", "game"]
+QUALIFIERS = ["favorite", "first", "old", "new", "best", "childhood", "current", "dream", "lucky", "weekend"]
+NAMES = ["Ravi", "Anjali", "Ishant", "Priya", "Arjun", "Meera", "Kabir", "Sara", "Dev", "Nisha",
+         "Rahul", "Pooja", "Vikram", "Asha", "Rohan", "Tara", "Aman", "Kiran", "Neel", "Zoya"]
+
+def make_facts(n, rng):
+    """n (category, fact) pairs over 200 categories, plus the category list."""
+    categories = [f"{q} {s}" for q in QUALIFIERS for s in SUBJECTS]
+    return [(rng.choice(categories), f"{rng.choice(NAMES)} {i}") for i in range(n)], categories
+
+def write_memory(path, facts):
+    """Write facts as a memory.json snapshot ({category: [facts]})."""
+    memory = {}
+    for category, fact in facts:
+        memory.setdefault(category, []).append(fact)
+    with open(path, "w") as f:
+        json.dump(memory, f)
+
+# ------------------------------
+# Reminders
+# ------------------------------
+def write_reminders(path, n, rng, now=None):
+    """Write n pending reminders spread over the next week, in the reminders.json format."""
+    now = now or datetime.now()
+    reminders = []
+    for i in range(n):
+        due = (now + timedelta(minutes=rng.randint(1, 7 * 24 * 60))).replace(second=0, microsecond=0)
+        reminders.append({"time": due.strftime("%H:%M"), "due": due.isoformat(timespec="seconds"),
+                          "message": f"task {i}"})
+    with open(path, "w") as f:
+        json.dump(reminders, f)
+
+# ------------------------------
+# App Catalog
+# ------------------------------
+SYLLABLES = ["app", "soft", "win", "tool", "note", "pad", "media", "play", "chrome", "code",
+             "zoom", "team", "sync", "cloud", "edit", "view", "mail", "chat", "game", "photo"]
+
+def synthetic_names(n, rng):
+    names = set()
+    while len(names) < n:
+        parts = rng.sample(SYLLABLES, rng.randint(2, 3))
+        names.add("-".join(parts) + str(rng.randint(0, 999)))
+    return sorted(names)
+
+def misspell(name, rng):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+def app_catalog(n, rng):
+    """{app name: path} for n synthetic apps, as the catalog scan produces."""
+    return {name: os.path.join("/opt", name, name) for name in synthetic_names(n, rng)}
+
+# ------------------------------
+# Process Table
+# ------------------------------
+PROCESS_NAMES = ["chrome", "code", "python", "systemd", "bash", "sshd", "spotify", "slack",
+                 "dbus-daemon", "pulseaudio", "Xorg", "gnome-shell", "node", "java", "postgres"]
+
+def fake_psutil(n, rng, idle_fraction=0.3):
+    """A FakePsutil serving n processes, about idle_fraction of them idle (low CPU and memory)."""
+    processes = []
+    for pid in range(1000, 1000 + n):
+        name = f"{rng.choice(PROCESS_NAMES)}-{pid % 97}"
+        if rng.random() < idle_fraction:
+            processes.append(FakeProcess(pid, name, rng.uniform(0, 0.4), rng.randint(1, 9) * 2 ** 20))
+        else:
+            processes.append(FakeProcess(pid, name, rng.uniform(0.5, 40), rng.randint(10, 900) * 2 ** 20))
+    return FakePsutil(processes)
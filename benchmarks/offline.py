@@ -0,0 +1,37 @@
+"""
+Offline wiring for benchmarks: runs the real modules without a microphone,
+network, Gemini, browser or display, by plugging local fakes into the hooks
+those modules already have.
+"""
+import os
+
+from benchmarks.fakes import FakeDriver, FakeModel
+
+def use_offline_services():
+    """
+    Point speech output, AI chat and the browser at local fakes:
+      - speech: a NullSpeechOutput sink (nothing is spoken, streams are consumed)
+      - ai_chat: the shared GeminiClient answers from an instant FakeModel
+      - browser: the browser pool hands out FakeDrivers instead of Chrome
+    The microphone is never opened, since nothing starts the Listener.
+    """
+    from modules import ai_chat, browser, speech
+    speech.use_speech_output(speech.NullSpeechOutput())
+    ai_chat.client._model = FakeModel(first_chunk_delay=0, chunk_delay=0)
+    ai_chat.client.cache.clear()
+    browser.browser_pool = browser.BrowserPool(driver_factory=FakeDriver)
+
+def use_fixture_stores(directory, memory_path=None, reminders_path=None):
+    """
+    Swap the local user's memory store and reminder scheduler for ones backed
+    by files in `directory`, so benchmarks never touch the real memory.json
+    or reminders.json. Returns (memory store, reminder scheduler).
+    """
+    from modules import ai_chat, background_tasks, brain
+    memory = brain.MemoryStore(memory_path or os.path.join(directory, "memory.json"))
+    reminders = background_tasks.ReminderScheduler(reminders_path or os.path.join(directory, "reminders.json"),
+                                                   lambda message: None)
+    brain.memory_store = memory
+    background_tasks.reminder_scheduler = reminders
+    ai_chat.session.fact_search = memory.search
+    return memory, reminders
@@ -0,0 +1,90 @@
+"""
+Local HTTP stub standing in for external web services in the benchmarks.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RESULT_PAGE = """<html><body>
+{results}
+</body></html>"""
+RESULT = '<div><a href="/url?q=https://example.com/{slug}/{i}&sa=U"><h3>Result {i} for {query}</h3></a></div>'
+
+class SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        slug = query.replace(" ", "-")
+        body = RESULT_PAGE.format(results="\n".join(
+            RESULT.format(i=i, slug=slug, query=query) for i in range(10))).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(handler=SearchHandler):
+    """Start a stub server on a free localhost port. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+class FakeService:
+    """
+    Behaviour and counters of a stub started with service_handler(state).
+    Change `delay` (seconds before answering) or `status` while it runs to
+    simulate a slow, hung or failing service.
+    """
+
+    def __init__(self, delay=0.0, status=200):
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = self.connections = self.max_active = 0
+
+def service_handler(state):
+    """A keep-alive handler answering GET /...?q=<text> with "echo <text>", as `state` says."""
+
+    class ServiceHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+
+        def do_GET(self):
+            with state.lock:
+                state.requests += 1
+                state.active += 1
+                state.max_active = max(state.max_active, state.active)
+            try:
+                time.sleep(state.delay)
+                query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+                body = f"echo {query}".encode()
+                self.send_response(state.status)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with state.lock:
+                    state.active -= 1
+
+        def log_message(self, format, *args):
+            pass
+
+    return ServiceHandler
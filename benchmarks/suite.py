@@ -0,0 +1,330 @@
+"""
+Offline micro-benchmark and regression suite for the assistant's hot paths.
+
+Runs routing, memory, reminder, app lookup, process table, voice-activity
+and dispatch cases against synthetic fixtures, with speech, AI chat and the
+browser replaced by local fakes (see benchmarks.offline), so it needs no
+microphone, network, Gemini or display. Each case reports ops/sec and
+p50/p95/p99 latency; results can be written as JSON and compared against a
+stored baseline, failing (exit status 1) when a case regresses past the
+threshold. Run from the repository root:
+
+    python -m benchmarks.suite                               # print results
+    python -m benchmarks.suite --json results.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks.suite --only router,brain --scale 10000
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks import fixtures
+from benchmarks.offline import use_fixture_stores, use_offline_services
+from utils.logger import logger
+
+CASES = {}   # name -> setup(context) returning op(i)
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+class Context:
+    """Fixture sizes and a scratch directory shared by the cases of one run."""
+
+    def __init__(self, scale, directory, seed=0):
+        self.scale = scale
+        self.directory = directory
+        self.rng = random.Random(seed)
+        self.facts = 10 * scale
+        self.apps = 5 * scale
+        self.reminders = scale
+        self.processes = max(50, scale // 2)
+        self._stores = None
+
+    def stores(self):
+        """The fixture memory store (self.facts facts) and reminder scheduler (self.reminders pending)."""
+        if self._stores is None:
+            memory_path = os.path.join(self.directory, "memory.json")
+            reminders_path = os.path.join(self.directory, "reminders.json")
+            self.fact_list, self.categories = fixtures.make_facts(self.facts, self.rng)
+            fixtures.write_memory(memory_path, self.fact_list)
+            fixtures.write_reminders(reminders_path, self.reminders, self.rng)
+            self._stores = use_fixture_stores(self.directory, memory_path, reminders_path)
+            self._stores[0].build_index()
+        return self._stores
+
+# ------------------------------
+# Cases
+# ------------------------------
+@case("router.route")
+def _route(ctx):
+    from modules.intent_router import route
+    corpus = fixtures.build_corpus(1000)
+    return lambda i: route(corpus[i % len(corpus)])
+
+@case("router.route_compound")
+def _route_compound(ctx):
+    from modules.intent_router import route
+    corpus = fixtures.build_corpus(1000, templates=fixtures.COMPOUND_TEMPLATES)
+    return lambda i: route(corpus[i % len(corpus)])
+
+@case("brain.process_memory_input")
+def _teach(ctx):
+    from modules.brain import process_memory_input
+    ctx.stores()
+    # A bounded set of new facts, so later cases see the same store however many ops ran here.
+    return lambda i: process_memory_input(f"my favorite place is town number {i % 500}")
+
+@case("brain.answer_memory_query")
+def _query(ctx):
+    from modules.brain import answer_memory_query
+    ctx.stores()
+    questions = ["what is my favorite food", "who is my friend"] + \
+                [f"tell me about my {category}" for category in ctx.categories[:50]]
+    return lambda i: answer_memory_query(questions[i % len(questions)])
+
+@case("brain.recall_fact")
+def _recall(ctx):
+    from modules.brain import recall_fact
+    ctx.stores()
+    questions = [f"do you know my {category}" for category in ctx.categories]
+    return lambda i: recall_fact(questions[i % len(questions)])
+
+@case("pc_control.find_app")
+def _find_app(ctx):
+    from modules import pc_control
+    from modules.app_index import AppIndex
+    catalog = fixtures.app_catalog(ctx.apps, ctx.rng)
+    pc_control.installed_apps_index = AppIndex(catalog)
+    pc_control.installed_apps_cache = catalog
+    pc_control._catalog_started = True   # never scan the real disk
+    pc_control.apps_ready.set()
+    names = list(catalog)
+    queries = [ctx.rng.choice(names) if n % 2 else fixtures.misspell(ctx.rng.choice(names), ctx.rng)
+               for n in range(200)]
+    return lambda i: pc_control.find_app(queries[i % len(queries)])
+
+@case("background_tasks.parse_time_str")
+def _parse_time(ctx):
+    from modules.background_tasks import parse_time_str
+    times = fixtures.TIME_STRINGS
+    return lambda i: parse_time_str(times[i % len(times)])
+
+@case("time_parser.parse")
+def _parse(ctx):
+    from modules.time_parser import parse
+    expressions = [text for texts in fixtures.TIME_EXPRESSIONS.values() for text in texts]
+    return lambda i: parse(expressions[i % len(expressions)])
+
+@case("background_tasks.set_reminder")
+def _set_reminder(ctx):
+    from modules.background_tasks import set_reminder
+    ctx.stores()
+    return lambda i: set_reminder(f"{i % 12 + 1}:{i % 60:02d} PM", f"benchmark reminder {i}")
+
+@case("process_table.refresh")
+def _refresh(ctx):
+    from modules import process_table
+    process_table.psutil = fixtures.fake_psutil(ctx.processes, ctx.rng)
+    table = process_table.ProcessTable(prime_interval=0)
+    return lambda i: table.refresh()
+
+@case("background_tasks.get_unused_tasks")
+def _unused(ctx):
+    from modules import background_tasks, process_table
+    process_table.psutil = fixtures.fake_psutil(ctx.processes, ctx.rng)
+    table = process_table.ProcessTable(prime_interval=0)
+    table.snapshot(primed=True)
+    background_tasks.process_table = table
+    return lambda i: background_tasks.get_unused_tasks()
+
+@case("vad.feed")
+def _vad(ctx):
+    import numpy as np
+    from modules.vad import VoiceActivityDetector
+    rng = np.random.default_rng(0)
+    t = np.arange(16000 * 10) / 16000
+    voiced = np.sin(2 * np.pi * 0.2 * t) < 0       # 2.5 s of silence, 2.5 s of tone, ...
+    audio = rng.normal(0, 60, len(t)) + 5000 * np.sin(2 * np.pi * 150 * t) * voiced
+    pcm = np.clip(audio, -32768, 32767).astype("<i2").tobytes()
+    chunks = [pcm[i:i + 2048] for i in range(0, len(pcm), 2048)]
+    detector = VoiceActivityDetector(16000, 2)
+    return lambda i: detector.feed(chunks[i % len(chunks)])
+
+@case("main.execute.chat")
+def _chat(ctx):
+    from main import execute
+    from modules.intent_router import route
+    ctx.stores()
+
+    def op(i):
+        reply = execute(route(f"tell me a joke about topic {i}"))
+        return "".join(reply)
+    return op
+
+@case("main.execute.plan")
+def _plan(ctx):
+    from main import execute
+    from modules.intent_router import route
+    ctx.stores()
+    return lambda i: execute(route(f"my favorite food is meal {i % 20} and what is my favorite food"))
+
+# ------------------------------
+# Measurement
+# ------------------------------
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+def measure(op, min_time, min_ops, max_ops, warmup=5):
+    for i in range(warmup):
+        op(i)
+    latencies = []
+    started = time.perf_counter()
+    i = warmup
+    while len(latencies) < max_ops and (len(latencies) < min_ops or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        op(i)
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / total if total else float("inf"),
+        "mean_us": total / len(latencies) * 1e6,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p95_us": percentile(latencies, 95) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "max_us": latencies[-1] * 1e6,
+    }
+
+def best_of(op, repeat, min_time, min_ops, max_ops):
+    """Measure `repeat` times and keep the fastest run, so a noisy moment on the machine is not a regression."""
+    runs = [measure(op, min_time / repeat, min_ops, max_ops) for _ in range(repeat)]
+    return max(runs, key=lambda r: r["ops_per_sec"])
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the modules' own output (prints and the assistant's log) while a case runs."""
+    level = logger.level
+    logger.setLevel(logging.CRITICAL + 1)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logger.setLevel(level)
+
+def run_suite(names, scale, min_time, min_ops, max_ops, repeat=3, out=sys.stdout):
+    use_offline_services()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        ctx = Context(scale, directory)
+        out.write(f"{'case':<36}{'ops':>8}{'ops/sec':>12}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}\n")
+        for name in names:
+            with quiet():
+                op = CASES[name](ctx)
+                r = results[name] = best_of(op, repeat, min_time, min_ops, max_ops)
+            out.write(f"{name:<36}{r['ops']:>8}{r['ops_per_sec']:>12.0f}{r['p50_us']:>10.1f}"
+                      f"{r['p95_us']:>10.1f}{r['p99_us']:>10.1f}\n")
+            out.flush()
+        memory, _ = ctx._stores or (None, None)
+        if memory is not None:
+            memory.close()
+    return {
+        "meta": {
+            "scale": scale,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+# ------------------------------
+# Baseline Comparison
+# ------------------------------
+def compare(report, baseline, threshold, p95_threshold, out=sys.stdout):
+    """
+    Compare a run against a baseline. A case regresses when its ops/sec drop
+    by more than `threshold` or its p95 latency grows by more than
+    `p95_threshold` (fractions). Returns the names of the regressed cases.
+    """
+    if report["meta"]["scale"] != baseline["meta"].get("scale"):
+        out.write(f"warning: baseline was recorded at scale {baseline['meta'].get('scale')}, "
+                  f"this run used {report['meta']['scale']}\n")
+    regressed = []
+    out.write(f"{'case':<36}{'base ops/s':>12}{'ops/s':>12}{'change':>9}{'p95 change':>12}  status\n")
+    for name, current in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            out.write(f"{name:<36}{'':>12}{current['ops_per_sec']:>12.0f}{'':>9}{'':>12}  new\n")
+            continue
+        speed = current["ops_per_sec"] / base["ops_per_sec"] - 1
+        p95 = current["p95_us"] / base["p95_us"] - 1 if base["p95_us"] else 0.0
+        status = "ok"
+        if speed < -threshold or p95 > p95_threshold:
+            status = "REGRESSED"
+            regressed.append(name)
+        out.write(f"{name:<36}{base['ops_per_sec']:>12.0f}{current['ops_per_sec']:>12.0f}"
+                  f"{speed:>+9.1%}{p95:>+12.1%}  {status}\n")
+    for name in baseline["results"].keys() - report["results"].keys():
+        out.write(f"{name:<36}{'':>12}{'':>12}{'':>9}{'':>12}  not run\n")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1000,
+                        help="fixture size: 10x facts, 5x apps, 1x reminders, 0.5x processes")
+    parser.add_argument("--only", help="comma-separated case names or prefixes, e.g. router,brain")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per case")
+    parser.add_argument("--repeat", type=int, default=3, help="measurements per case; the fastest is kept")
+    parser.add_argument("--min-ops", type=int, default=50)
+    parser.add_argument("--max-ops", type=int, default=100000)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--save-baseline", help="write the results as the baseline to this file")
+    parser.add_argument("--compare", help="baseline file to compare against; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed ops/sec drop (fraction)")
+    parser.add_argument("--p95-threshold", type=float, default=0.5, help="allowed p95 latency growth (fraction)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+    names = list(CASES)
+    if args.only:
+        prefixes = [p.strip() for p in args.only.split(",") if p.strip()]
+        names = [name for name in names if any(name == p or name.startswith(p + ".") for p in prefixes)]
+        if not names:
+            parser.error(f"no case matches {args.only!r}; see --list")
+
+    report = run_suite(names, args.scale, args.min_time, args.min_ops, args.max_ops, args.repeat)
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"results written to {path}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = compare(report, baseline, args.threshold, args.p95_threshold)
+        if regressed:
+            print(f"{len(regressed)} case(s) regressed past the threshold: {', '.join(regressed)}")
+            return 1
+        print("no regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
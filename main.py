@@ -1,82 +1,108 @@
-from modules.ai_chat import chat_with_ai
-from modules.speech import listen, speak
-from modules.pc_control import open_app, close_app
+from modules import ai_chat, browser, gateway, language, speech
+from modules.ai_chat import chat_with_ai_stream
+from modules.speech import listener, recognize_phrase, speak, stop_speaking
+from modules.pc_control import open_app, close_app, start_app_catalog
 from modules.browser import search_google
-from modules.background_tasks import start_background_tasks, set_reminder, load_reminders, save_reminders, start_task_monitor
-from modules.brain import process_memory_input, answer_memory_query
-import threading
+from modules.background_tasks import start_background_tasks, set_reminder, start_task_monitor
+from modules.brain import add_fact, describe_fact, memory_store, recall_fact
+from modules.intent_router import (route, is_exit, is_interrupt, OPEN_APP, CLOSE_APP, SEARCH, REMINDER, EXIT,
+                                   INTERRUPT, REMEMBER, RECALL, PLAN)
+from modules.planner import plan_runner
+from modules.timers import timer_service
+from modules.runtime import AssistantRuntime
+from utils.helpers import prewarm
+import asyncio
 
-def main():
-    # Start all background tasks (system monitoring, background listening, scheduler, process monitoring)
-    threading.Thread(target=start_background_tasks, daemon=True).start()
+def execute(intent, user=None):
+    """
+    Carry out a routed intent, for the local user or for a modules.users.UserSession.
+    Returns what to say: a string, a stream of text chunks (AI answers), or None.
+    """
+    timer_service.note_activity()   # keeps background timers out of idle low-power mode
 
-    # Start monitoring for idle or high resource processes (if implemented)
+    # Compound commands, e.g. "open chrome and spotify and remind me at 5 pm to stretch"
+    if intent.name == PLAN:
+        return plan_runner.run(intent.actions, lambda action: execute(action, user), intent.slots["after_then"])
+
+    memory = user.memory if user else None
+    # Memory commands (teaching or recalling facts)
+    if intent.name == REMEMBER:
+        return add_fact(intent.slots["category"], intent.slots["fact"], memory)
+
+    if intent.name == RECALL:
+        answer = describe_fact(intent.slots["category"], memory)
+        if answer:
+            return answer
+        # Nothing stored yet: let the AI answer instead
+
+    # PC Control commands
+    elif intent.name == OPEN_APP:
+        open_app(intent.slots["app"])
+        return None
+
+    elif intent.name == CLOSE_APP:
+        close_app(intent.slots["app"])
+        return None
+
+    # Web search command
+    elif intent.name == SEARCH:
+        search_google(intent.slots["query"])
+        return None
+
+    # Reminder commands, e.g. "remind me at 10:52 p.m. to call John"
+    elif intent.name == REMINDER:
+        if "time" not in intent.slots:
+            return "Please specify the time for the reminder."
+        return set_reminder(intent.slots["time"], intent.slots.get("message", ""),
+                            user.reminders if user else None)
+
+    # Exit command
+    elif intent.name == EXIT:
+        return "Goodbye!"
+
+    # "stop", "cancel", "be quiet": the runtime has already cut off the answer
+    elif intent.name == INTERRUPT:
+        stop_speaking()
+        return None
+
+    # Differently phrased questions about stored facts are answered locally
+    answer = recall_fact(intent.text, store=memory)
+    if answer:
+        return answer
+
+    # Fallback: Use AI chat to generate a response, spoken as it streams in
+    return chat_with_ai_stream(intent.text, user.conversation if user else None)
+
+def build_runtime():
+    return AssistantRuntime(
+        capture=listener.next_audio,
+        recognize=recognize_phrase,
+        route=route,
+        execute=execute,
+        speak=speak,
+        stop_speaking=stop_speaking,
+        is_exit=is_exit,
+        is_interrupt=is_interrupt,
+    )
+
+def warm_up():
+    """
+    Start the process monitor and app catalog, and pre-load the libraries the
+    first commands will need, while the user is still speaking.
+    """
     start_task_monitor()
+    start_app_catalog()
+    memory_store.build_index()
+    prewarm(speech.sr, language.langdetect, language.deep_translator,
+            ai_chat.bard, gateway.requests, browser.webdriver)
+
+def main(prewarm_after_greeting=True):
+    # Reminders must fire even if nothing else is used; the rest starts after the greeting.
+    start_background_tasks()
 
-    speak("Hello, how can I assist you today?")
-    while True:
-        command = listen()
-        if not command:
-            continue
-        command = command.lower()
-
-        # Check if the command is meant for the brain (teaching or memory query)
-        memory_response = process_memory_input(command)
-        if memory_response:
-            speak(memory_response)
-            continue
-
-        memory_query = answer_memory_query(command)
-        if memory_query:
-            speak(memory_query)
-            continue
-
-        # PC Control commands
-        if "open" in command:
-            app_name = command.replace("open ", "")
-            open_app(app_name)
-
-        elif "close" in command:
-            app_name = command.replace("close ", "")
-            close_app(app_name)
-
-        # Web search command
-        elif "search" in command:
-            query = command.replace("search ", "")
-            search_google(query)
-
-        # Reminder commands
-        elif "set reminder" in command or "remind me" in command:
-            # Expecting a command like "remind me at 10:52 p.m. to call John"
-            words = command.split()
-            if "at" in words:
-                time_index = words.index("at") + 1
-                if time_index < len(words):
-                    # Check if the next token is "am" or "pm" to form a full time string
-                    if len(words) > time_index + 1 and words[time_index + 1] in ["am", "pm"]:
-                        time_str = words[time_index] + " " + words[time_index + 1]
-                        message = " ".join(words[time_index + 2:])
-                    else:
-                        time_str = words[time_index]
-                        message = " ".join(words[time_index + 1:])
-                    set_reminder(time_str, message)
-                else:
-                    speak("Please specify the time for the reminder.")
-            else:
-                speak("Please specify the time for the reminder.")
-
-        # System usage command
-       
-
-        # Exit command
-        elif "exit" in command or "stop" in command:
-            speak("Goodbye!")
-            break
-
-        # Fallback: Use AI chat to generate a response
-        else:
-            response = chat_with_ai(command)
-            speak(response)
+    runtime = build_runtime()
+    asyncio.run(runtime.run(greeting="Hello, how can I assist you today?",
+                            after_greeting=warm_up if prewarm_after_greeting else start_task_monitor))
 
 if __name__ == "__main__":
     main()
@@ -1,17 +1,194 @@
-import google.generativeai as bard
-from config import BARD_API_KEY
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
 
-bard.configure(api_key=BARD_API_KEY)
+from modules.brain import memory_store
+from modules.conversation import ConversationSession
+from modules.gateway import CircuitOpen, gateway
+from utils.helpers import lazy_import
+from utils.logger import incr, log, span
 
-def chat_with_ai(prompt):
-    """Directly uses Bard (Gemini) for generating responses."""
+bard = lazy_import("google.generativeai")
+
+MODEL_NAME = "gemini-2.0-flash"  # Adjust model name if necessary
+# Answered locally while the Gemini circuit is open.
+AI_UNAVAILABLE = "I can't reach the AI service right now. Please try again in a minute."
+
+def normalize_prompt(prompt):
+    """Cache key for a prompt: lowercased with whitespace collapsed."""
+    return re.sub(r"\s+", " ", prompt.strip().lower())
+
+class ResponseCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (stored_at, text)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, text):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class GeminiClient:
+    """
+    Long-lived Gemini client.
+    The model is created once, on first use (or injected, e.g. a fake backend for
+    offline testing: any object with generate_content(prompt, stream=..., request_options=...)).
+    Complete responses are cached by normalized prompt, requests go through
+    the gemini service's gateway (timeout, concurrency limit, circuit breaker;
+    identical non-streaming prompts in flight share one request; a stream is
+    guarded until its last chunk), and failures are retried with exponential
+    backoff unless the circuit is open, a streamed answer has already started,
+    or `total_timeout` seconds have passed since the first attempt.
+    """
+
+    def __init__(self, model=None, model_name=MODEL_NAME, timeout=20, retries=2,
+                 backoff=0.5, cache_size=256, cache_ttl=3600, total_timeout=30):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.retries = retries
+        self.total_timeout = total_timeout
+        self.backoff = backoff
+        self.cache = ResponseCache(cache_size, cache_ttl)
+        self._model = model
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from config import BARD_API_KEY
+                    bard.configure(api_key=BARD_API_KEY)
+                    self._model = bard.GenerativeModel(self.model_name)
+        return self._model
+
+    def _retry_wait(self, attempt, delay, deadline):
+        """Sleep before the next attempt; False if no attempt is left (retries or total_timeout used up)."""
+        incr("gemini.retries")
+        if attempt == self.retries or time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _request(self, prompt):
+        """Call the model for a complete answer, retrying with exponential backoff on errors."""
+        deadline = time.monotonic() + self.total_timeout
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                with span("gemini.request"):
+                    return gateway.call("gemini", self.model.generate_content, prompt, stream=False,
+                                        request_options={"timeout": self.timeout},
+                                        key=normalize_prompt(prompt), deadline=deadline)
+            except CircuitOpen:
+                raise   # failing fast: do not wait out the backoff
+            except Exception:
+                if not self._retry_wait(attempt, delay, deadline):
+                    raise
+                delay *= 2
+
+    @span("gemini.generate")
+    def generate(self, prompt):
+        """Return the full response text, from the cache when possible."""
+        key = normalize_prompt(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            incr("gemini.cache_hits")
+            return cached
+        response = self._request(prompt)
+        text = response.text if hasattr(response, "text") else None
+        if text:
+            self.cache.put(key, text)
+        return text
+
+    def stream(self, prompt):
+        """
+        Yield response text chunks as they arrive, so speech can start on the
+        first sentence. A cached answer is yielded as a single chunk.
+        """
+        key = normalize_prompt(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            incr("gemini.cache_hits")
+            yield cached
+            return
+        deadline = time.monotonic() + self.total_timeout
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            chunks = []
+            try:
+                for chunk in gateway.stream("gemini", self.model.generate_content, prompt, stream=True,
+                                            request_options={"timeout": self.timeout}, deadline=deadline):
+                    text = getattr(chunk, "text", "")
+                    if text:
+                        chunks.append(text)
+                        yield text
+                break
+            except CircuitOpen:
+                raise
+            except Exception:
+                if chunks or not self._retry_wait(attempt, delay, deadline):
+                    raise   # part of the answer has been spoken already: do not start over
+                delay *= 2
+        if chunks:
+            self.cache.put(key, "".join(chunks))
+
+client = GeminiClient()
+session = ConversationSession(client, fact_search=memory_store.search)
+
+def chat_with_ai(prompt, conversation=None):
+    """
+    Uses Bard (Gemini) for generating responses, in the context of the conversation
+    so far (the local one unless another ConversationSession is given).
+    """
     if not prompt.strip():  # Prevent sending empty input to Bard
         return "Sorry, I couldn't understand."
 
     try:
-        model = bard.GenerativeModel("gemini-2.0-flash")  # Adjust model name if necessary
-        response = model.generate_content(prompt)
-        return response.text if hasattr(response, 'text') else "Sorry, Bard didn't return a valid response."
+        text = (conversation or session).ask(prompt)
+        return text if text else "Sorry, Bard didn't return a valid response."
+    except CircuitOpen:
+        return AI_UNAVAILABLE
+    except Exception as e:
+        log(f"Bard Error: {e}", logging.ERROR)
+        return "Sorry, I couldn't process that."
+
+def chat_with_ai_stream(prompt, conversation=None):
+    """Streaming variant of chat_with_ai: yields text chunks as they arrive."""
+    if not prompt.strip():
+        yield "Sorry, I couldn't understand."
+        return
+
+    try:
+        yield from (conversation or session).ask_stream(prompt)
+    except CircuitOpen:
+        yield AI_UNAVAILABLE
     except Exception as e:
-        print("Bard Error:", e)
-        return "Sorry, I couldn't process that."
\ No newline at end of file
+        log(f"Bard Error: {e}", logging.ERROR)
+        yield "Sorry, I couldn't process that."
@@ -0,0 +1,97 @@
+import difflib
+import heapq
+import re
+from collections import Counter, defaultdict
+
+# Spoken names that do not look like the executable they launch.
+DEFAULT_ALIASES = {
+    "chrome": ["google chrome", "google-chrome", "chrome browser"],
+    "msedge": ["edge", "microsoft edge"],
+    "firefox": ["mozilla firefox"],
+    "code": ["vs code", "vscode", "visual studio code"],
+    "winword": ["word", "microsoft word"],
+    "excel": ["microsoft excel"],
+    "powerpnt": ["powerpoint", "microsoft powerpoint"],
+    "notepad++": ["notepad plus plus"],
+    "vlc": ["vlc player", "vlc media player"],
+    "spotify": ["spotify music"],
+    "gnome-terminal": ["terminal"],
+}
+
+_SEPARATORS = re.compile(r"[-_.]+")
+
+def display_name(app_name):
+    """Human-friendly form of an executable name: "google-chrome" -> "google chrome"."""
+    return _SEPARATORS.sub(" ", app_name).strip()
+
+def trigrams(text):
+    """Character trigrams of a space-padded string."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class AppIndex:
+    """
+    Trigram inverted index over installed application names.
+    Each app is searchable by its name, its display name and any aliases.
+    A lookup gathers candidates from the postings of the query's trigrams,
+    keeps the top_k by trigram overlap and reranks only those with difflib,
+    instead of running difflib over every installed app.
+    """
+
+    def __init__(self, apps=None, aliases=DEFAULT_ALIASES, top_k=10):
+        self.top_k = top_k
+        self.apps = {}          # app name -> path
+        self._terms = []        # searchable term, by term id
+        self._term_app = []     # app name, by term id
+        self._term_grams = []   # trigram count, by term id
+        self._exact = {}        # searchable term -> app name
+        self._postings = defaultdict(list)  # trigram -> term ids
+        self._aliases = aliases or {}
+        for name, path in (apps or {}).items():
+            self.add(name, path)
+
+    def __len__(self):
+        return len(self.apps)
+
+    def add(self, name, path, extra_names=()):
+        """Index an app under its name, display name, aliases and any extra names."""
+        name = name.lower()
+        self.apps[name] = path
+        terms = {name, display_name(name), *self._aliases.get(name, ()), *(n.lower() for n in extra_names)}
+        for term in terms:
+            if term and term not in self._exact:
+                self._exact[term] = name
+                term_id = len(self._terms)
+                grams = trigrams(term)
+                self._terms.append(term)
+                self._term_app.append(name)
+                self._term_grams.append(len(grams))
+                for gram in grams:
+                    self._postings[gram].append(term_id)
+
+    def candidates(self, query):
+        """Return up to top_k term ids ranked by trigram Dice similarity to the query."""
+        grams = trigrams(query)
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self._postings.get(gram, ()))
+        size, term_grams = len(grams), self._term_grams
+        best = heapq.nlargest(self.top_k, overlap.items(),
+                              key=lambda item: item[1] / (size + term_grams[item[0]]))
+        return [term_id for term_id, _ in best]
+
+    def lookup(self, query, cutoff=0.8):
+        """Return the path of the best-matching app, or None if nothing scores above cutoff."""
+        query = query.lower().strip()
+        if query in self._exact:
+            return self.apps[self._exact[query]]
+        best_ratio, best_app = cutoff, None
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query)
+        for term_id in self.candidates(query):
+            matcher.set_seq1(self._terms[term_id])
+            if matcher.real_quick_ratio() >= best_ratio and matcher.quick_ratio() >= best_ratio:
+                ratio = matcher.ratio()
+                if ratio >= best_ratio:
+                    best_ratio, best_app = ratio, self._term_app[term_id]
+        return self.apps[best_app] if best_app else None
@@ -1,18 +1,28 @@
+import atexit
+import heapq
+import itertools
 import json
+import logging
 import time
 import threading
-import psutil
-import schedule
 from datetime import datetime, timedelta
 from modules.speech import speak, listen
+from modules.notifications import Alert, NotificationCenter
+from modules.process_table import process_table
+from modules.timers import timer_service
+from modules.time_parser import Recurrence, describe_due, parse
 import os
-import tkinter as tk
-from tkinter import messagebox
+from utils.helpers import lazy_import
+from utils.logger import log
+
+psutil = lazy_import("psutil")
 
 # ------------------------------
 # File Persistence for Reminders
 # ------------------------------
-REMINDER_FILE = "reminders.json"
+# Next to the code rather than relative to the working directory.
+REMINDER_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reminders.json")
+JOURNAL_SUFFIX = ".journal"
 
 if not os.path.exists(REMINDER_FILE):
     with open(REMINDER_FILE, "w") as f:
@@ -21,86 +31,274 @@ if not os.path.exists(REMINDER_FILE):
 # ------------------------------
 # 1. Reminder Management
 # ------------------------------
-def load_reminders():
+def load_reminders(path=REMINDER_FILE):
     """Load reminders from the JSON file. Returns an empty list if the file is missing or corrupted."""
     try:
-        with open(REMINDER_FILE, "r") as file:
+        with open(path, "r") as file:
             return json.load(file)
     except (FileNotFoundError, json.JSONDecodeError):
         return []
 
-def save_reminders(reminders):
-    """Save the reminders list back to the JSON file."""
-    with open(REMINDER_FILE, "w") as file:
+def save_reminders(reminders, path=REMINDER_FILE):
+    """Save the reminders list back to the JSON file, atomically (temp file + rename)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as file:
         json.dump(reminders, file, indent=4)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+def load_pending_reminders(path=REMINDER_FILE):
+    """
+    The reminders file with its journal (see ReminderScheduler) replayed on
+    top: every reminder still pending, in file order.
+    """
+    pending = {}   # canonical JSON -> [reminder, count]; equal reminders are interchangeable
+    for reminder in load_reminders(path):
+        pending.setdefault(json.dumps(reminder, sort_keys=True), [reminder, 0])[1] += 1
+    try:
+        with open(path + JOURNAL_SUFFIX, "r") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn last line from a crash; everything before it is valid
+                if "add" in entry:
+                    pending.setdefault(json.dumps(entry["add"], sort_keys=True), [entry["add"], 0])[1] += 1
+                else:
+                    slot = pending.get(json.dumps(entry["done"], sort_keys=True))
+                    if slot is not None:
+                        slot[1] -= 1
+    except FileNotFoundError:
+        pass
+    return [reminder for reminder, count in pending.values() for _ in range(max(count, 0))]
+
+def reminder_record(entry):
+    """The reminders-file form of a heap entry (due_ts, seq, message, repeat)."""
+    due_ts, _, message, repeat = entry
+    due = datetime.fromtimestamp(due_ts)
+    reminder = {"time": due.strftime("%H:%M"), "due": due.isoformat(timespec="seconds"), "message": message}
+    if repeat is not None:
+        reminder["repeat"] = repeat.as_dict()
+    return reminder
 
 def parse_time_str(time_str):
     """
     Parse user-input time formats into 24-hour format (HH:MM).
-    Acceptable formats:
-      - "10:52 PM", "10:52PM", "10:52 p.m."
-      - "22:52"
+    Acceptable formats include "10:52 PM", "10:52PM", "10:52 p.m.", "22:52"
+    and "noon", plus anything else modules.time_parser understands.
     Returns formatted time as string or None if invalid.
     """
-    normalized = time_str.strip().upper().replace('.', '')
-    possible_formats = ["%I:%M %p", "%I:%M%p", "%H:%M"]
-    for fmt in possible_formats:
-        try:
-            dt = datetime.strptime(normalized, fmt)
-            return dt.strftime("%H:%M")  # Convert to 24-hour format
-        except ValueError:
-            continue
-    return None
+    parsed = parse(time_str)
+    return parsed.due.strftime("%H:%M") if parsed else None
 
-def set_reminder(time_str, message):
+def next_occurrence(formatted_time, now=None):
+    """Return the next datetime (today or tomorrow) matching an "HH:MM" string."""
+    now = now or datetime.now()
+    hour, minute = map(int, formatted_time.split(":"))
+    due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if due <= now:
+        due += timedelta(days=1)
+    return due
+
+class ReminderScheduler:
     """
-    Set a reminder at a given time, store it in the reminders.json file, and schedule it.
+    All reminders of one store, driven by one timer.
+    Pending reminders live in a min-heap keyed by absolute due time; once
+    started, a single call_at() timer on the shared timer service is kept on
+    the earliest one, so nothing wakes up until a reminder is due and idle cost
+    does not grow with the number pending. Each reminder is popped under the
+    lock before it fires, so it fires exactly once. A recurring reminder is
+    one heap entry: when it fires, its next occurrence is pushed in its place.
+
+    Changes are persisted like MemoryStore's: each add, and each batch of
+    fired reminders, appends "add"/"done" lines to a journal next to the
+    reminders file, so a change costs O(1) however many are pending. Once the
+    journal holds `compact_every` lines (and at least as many as there are
+    reminders pending) it is folded back into the file with an atomic rename.
     """
-    formatted_time = parse_time_str(time_str)
-    if not formatted_time:
-        speak("Invalid time format. Please specify a valid format like '11:45 PM'.")
-        return
 
-    reminders = load_reminders()
-    reminders.append({"time": formatted_time, "message": message})
-    save_reminders(reminders)
+    def __init__(self, path, on_due, on_schedule=None, timers=None, compact_every=500):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compact_every = compact_every
+        self.on_due = on_due
+        self.on_schedule = on_schedule   # called with each new due timestamp, if set
+        self.timers = timers             # the TimerService to use; the shared one by default
+        self.wakeups = 0
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._timer = None
+        self._journal = None
+        self._pending = 0   # journal lines since the last compaction
+        # Fold a previous session's journal, or reminders in an older format, into the file
+        # right away, so that every "done" line written from now on matches a record in it.
+        stale = not os.path.exists(path) or os.path.exists(self.journal_path)
+        for reminder in load_pending_reminders(path):
+            try:
+                if "due" in reminder:
+                    due = datetime.fromisoformat(reminder["due"])
+                else:
+                    due = next_occurrence(reminder["time"])
+                repeat = Recurrence.from_dict(reminder["repeat"]) if "repeat" in reminder else None
+                entry = (due.timestamp(), next(self._seq), reminder["message"], repeat)
+            except (KeyError, TypeError, ValueError) as e:
+                log(f"[Reminder] Skipping unreadable reminder {reminder!r}: {e}", logging.WARNING)
+                stale = True
+                continue
+            heapq.heappush(self._heap, entry)
+            stale = stale or reminder_record(entry) != reminder
+        if stale:
+            self.compact()
 
-    print(f"[Reminder] Reminder saved: {formatted_time} - {message}")
+    def _write_journal(self, records):
+        """Append change records to the journal, compacting once it has grown enough."""
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a")
+        self._journal.write("".join(json.dumps(record) + "\n" for record in records))
+        self._journal.flush()
+        self._pending += len(records)
+        if self._pending >= max(self.compact_every, len(self._heap)):
+            self.compact()
 
-    # Schedule the reminder task
-    schedule.every().day.at(formatted_time).do(trigger_reminder, message=message)
-    speak(f"Reminder set for {formatted_time}: {message}")
+    def compact(self):
+        """Write the pending reminders (in due order) to the reminders file and drop the journal."""
+        with self._cond:
+            save_reminders([reminder_record(entry) for entry in sorted(self._heap)], self.path)
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._pending = 0
 
-def trigger_reminder(message):
+    def close(self):
+        """Compact any pending journal lines; called at exit and when a user is evicted."""
+        with self._cond:
+            if self._pending:
+                self.compact()
+            elif self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def add(self, due, message, repeat=None):
+        """
+        Schedule a message at an absolute datetime, repeating by `repeat` (a
+        Recurrence) if given, and wake the timer thread.
+        """
+        with self._cond:
+            entry = (due.timestamp(), next(self._seq), message, repeat)
+            heapq.heappush(self._heap, entry)
+            self._write_journal([{"add": reminder_record(entry)}])
+            if self._timer is not None:
+                self._timer.reschedule(self._heap[0][0])
+        if self.on_schedule is not None:
+            self.on_schedule(due.timestamp())
+
+    def pending(self):
+        """Return the number of reminders still waiting to fire."""
+        with self._cond:
+            return len(self._heap)
+
+    def next_due(self):
+        """Return the timestamp of the earliest pending reminder, or None."""
+        with self._cond:
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """
+        Remove and return the messages that are due, persisting the change.
+        Used by the timer thread, or by an owner that drives several schedulers
+        from one thread (see modules.users).
+        """
+        now = now or time.time()
+        with self._cond:
+            due_now, records = [], []
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                due_ts, _, message, repeat = entry
+                due_now.append(message)
+                records.append({"done": reminder_record(entry)})
+                if repeat is not None:
+                    # Only the next occurrence is materialized; runs missed while off are skipped.
+                    try:
+                        following = repeat.next_after(datetime.fromtimestamp(due_ts), datetime.fromtimestamp(now))
+                    except Exception as e:
+                        log(f"[Reminder] Not repeating '{message}' ({repeat}): {e}", logging.ERROR)
+                        continue
+                    entry = (following.timestamp(), next(self._seq), message, repeat)
+                    heapq.heappush(self._heap, entry)
+                    records.append({"add": reminder_record(entry)})
+            if records:
+                self._write_journal(records)
+            return due_now
+
+    def fire(self, messages):
+        for message in messages:
+            try:
+                self.on_due(message)
+            except Exception as e:
+                log(f"[Reminder] Error triggering reminder: {e}", logging.ERROR)
+
+    def start(self):
+        """Register with the timer service (once), armed for the earliest reminder."""
+        with self._cond:
+            if self._timer is None:
+                timers = self.timers or timer_service
+                self._timer = timers.call_at(self.next_due(), self._tick, "reminders", blocking=True)
+
+    def stop(self):
+        """Stop firing reminders (they stay in the file)."""
+        with self._cond:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _tick(self):
+        """Fire everything due, then re-arm the timer for the next reminder."""
+        due_now = []
+        with self._cond:
+            self.wakeups += 1
+            try:
+                due_now = self.pop_due()
+            finally:
+                # Re-arm even if popping failed, or no later reminder would ever fire.
+                if self._timer is not None:
+                    self._timer.reschedule(self.next_due())
+        self.fire(due_now)
+
+def set_reminder(time_str, message, scheduler=None):
     """
-    Function that triggers the reminder and speaks it out.
+    Set a reminder at a time expression such as "11:45 PM", "in 20 minutes",
+    "tomorrow at 9" or "every monday at 8 am" (see modules.time_parser): it is
+    stored in the reminders file and handed to the reminder scheduler (the
+    local user's unless another user's scheduler is given). Returns the
+    confirmation (or error) to speak.
     """
-    speak(f"Reminder alert: {message}")
-    print(f"⏰ Reminder Triggered: {message}")
+    now = datetime.now()
+    parsed = parse(time_str, now)
+    if not parsed:
+        return "Invalid time format. Please specify a time like '11:45 PM', 'in 20 minutes' or 'tomorrow at 9'."
+    if parsed.due <= now:
+        return "That time has already passed."
 
-    # Remove the reminder from the file after execution
-    reminders = load_reminders()
-    reminders = [rem for rem in reminders if rem["message"] != message]  # Remove executed reminder
-    save_reminders(reminders)
+    (scheduler or reminder_scheduler).add(parsed.due, message, parsed.recurrence)
+    when = describe_due(parsed.due, now)
+    if parsed.recurrence:
+        when = f"{when}, repeating {parsed.recurrence.describe()}"
+    log(f"[Reminder] Reminder saved: {when} - {message}")
+    return f"Reminder set for {when}: {message}"
 
-def check_reminders():
+def trigger_reminder(message):
     """
-    Background thread to check reminders every 30 seconds.
-    If a reminder matches the current time, it is triggered and removed.
+    Function that triggers the reminder and speaks it out.
     """
-    while True:
-        now = datetime.now().strftime("%H:%M")
-        reminders = load_reminders()
-        remaining_reminders = []
-
-        for reminder in reminders:
-            if reminder["time"] == now:
-                trigger_reminder(reminder["message"])
-            else:
-                remaining_reminders.append(reminder)
+    speak(f"Reminder alert: {message}")
+    log(f"⏰ Reminder Triggered: {message}")
 
-        save_reminders(remaining_reminders)
-        time.sleep(30)  # Check reminders every 30 seconds
+reminder_scheduler = ReminderScheduler(REMINDER_FILE, trigger_reminder)
+atexit.register(reminder_scheduler.close)
 
 # ------------------------------
 # 2. Start Background Threads
@@ -108,17 +306,9 @@ def check_reminders():
 def start_background_tasks():
     """
     Start background processes:
-      - Reminder Checker
-      - Scheduler Loop
+      - Reminder Scheduler
     """
-    threading.Thread(target=check_reminders, daemon=True).start()
-    threading.Thread(target=run_scheduler, daemon=True).start()
-
-def run_scheduler():
-    """Runs scheduled tasks in an infinite loop."""
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    reminder_scheduler.start()
 
 # ------------------------------
 # 3. Background Process Monitor
@@ -130,17 +320,14 @@ def get_unused_tasks(threshold_cpu=0.5, threshold_mem=10):
     - threshold_mem: Memory usage below this threshold (MB) is considered idle.
     """
     unused_tasks = []
-    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info']):
-        try:
-            cpu_usage = proc.info['cpu_percent']
-            mem_usage_mb = proc.info['memory_info'].rss / (1024 * 1024)
-
-            # Identify processes using low CPU and memory
-            if cpu_usage < threshold_cpu and mem_usage_mb < threshold_mem:
-                unused_tasks.append({"pid": proc.info['pid'], "name": proc.info['name']})
+    # primed=True guarantees two samples, so cpu_percent is a real delta rather than 0.0
+    for info in process_table.snapshot(max_age=15, primed=True).values():
+        if info.cpu_percent is None:
+            continue  # first seen in this sample; no CPU measurement yet
 
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
+        # Identify processes using low CPU and memory
+        if info.cpu_percent < threshold_cpu and info.rss_mb < threshold_mem:
+            unused_tasks.append({"pid": info.pid, "name": info.name})
 
     return unused_tasks
 
@@ -149,53 +336,43 @@ def kill_process(pid):
     try:
         proc = psutil.Process(pid)
         proc.terminate()
-        print(f"[Task Manager] Process {proc.name()} (PID: {pid}) terminated successfully.")
+        log(f"[Task Manager] Process {proc.name()} (PID: {pid}) terminated successfully.")
     except (psutil.NoSuchProcess, psutil.AccessDenied):
-        print(f"[Task Manager] Unable to terminate process PID: {pid}")
-
-def show_task_popup(unused_tasks):
-    """
-    Generate a pop-up asking the user if they want to kill unused tasks.
-    """
-    if not unused_tasks:
-        return  # No unused tasks to notify about
-
-    def on_confirm():
-        """Terminate selected tasks on confirmation."""
-        for task in unused_tasks:
-            kill_process(task['pid'])
-        messagebox.showinfo("Task Manager", "Unused tasks terminated successfully!")
-        root.destroy()
+        log(f"[Task Manager] Unable to terminate process PID: {pid}", logging.WARNING)
 
-    def on_cancel():
-        """Ignore the unused tasks."""
-        messagebox.showinfo("Task Manager", "No changes made. Unused tasks ignored.")
-        root.destroy()
+def terminate_tasks(items):
+    """Kill every accepted {pid: name} item."""
+    for pid in items:
+        kill_process(pid)
 
-    # Create pop-up window
-    root = tk.Tk()
-    root.withdraw()  # Hide root window
+UNUSED_TASKS = "unused_tasks"
 
-    task_list = "\n".join([f"{task['name']} (PID: {task['pid']})" for task in unused_tasks])
-    response = messagebox.askyesno(
-        "Task Manager Alert",
-        f"The following unused tasks are detected:\n\n{task_list}\n\nDo you want to terminate them?"
+def unused_tasks_alert(unused_tasks):
+    return Alert(
+        kind=UNUSED_TASKS,
+        title="Task Manager Alert",
+        question="The following unused tasks are detected:\n\n{items}\n\nDo you want to terminate them?",
+        items={task["pid"]: task["name"] for task in unused_tasks},
+        on_accept=terminate_tasks,
+        accepted_text="Unused tasks terminated successfully!",
+        declined_text="No changes made. Unused tasks ignored.",
     )
 
-    if response:
-        on_confirm()
-    else:
-        on_cancel()
+# One owner for every popup; the monitor only queues alerts and never blocks on a dialog.
+notifications = NotificationCenter()
 
-def monitor_unused_tasks(interval=60):
+UNUSED_TASK_INTERVAL = 60   # seconds between checks (longer in low-power mode)
+
+def check_unused_tasks():
     """
-    Monitor and identify unused tasks every 'interval' seconds.
+    Identify unused tasks and queue an alert about them (one monitor cycle).
     """
-    while True:
-        unused_tasks = get_unused_tasks()
-        if unused_tasks:
-            show_task_popup(unused_tasks)
-        time.sleep(interval)
+    unused_tasks = get_unused_tasks()
+    if unused_tasks:
+        notifications.push(unused_tasks_alert(unused_tasks))
+
+_monitor_timer = None
+_monitor_lock = threading.Lock()
 
 # ------------------------------
 # 4. Start Task Monitor in Background
@@ -203,6 +380,16 @@ def monitor_unused_tasks(interval=60):
 def start_task_monitor():
     """
     Start the unused task monitoring in the background.
+    The monitor is a timer on the shared timer service; each check samples
+    the shared process table on demand, so processes are only scanned once
+    every UNUSED_TASK_INTERVAL seconds while idle, and the PC control
+    commands reuse that snapshot when it is fresh enough.
     """
-    threading.Thread(target=monitor_unused_tasks, daemon=True).start()
+    global _monitor_timer
+    notifications.start()
+    with _monitor_lock:
+        if _monitor_timer is None:
+            # get_unused_tasks may sample twice with a pause in between: keep it off the timer thread.
+            _monitor_timer = timer_service.call_every(UNUSED_TASK_INTERVAL, check_unused_tasks, "unused_tasks",
+                                                      blocking=True)
 
@@ -1,8 +1,15 @@
+import atexit
 import json
 import os
 import re
+import threading
 
-MEMORY_FILE = "modules/memory.json"
+from modules.memory_index import MemoryIndex
+from utils.logger import span
+
+# Next to this module rather than relative to the working directory.
+MEMORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memory.json")
+JOURNAL_SUFFIX = ".journal"
 
 def ensure_memory_file():
     """Ensure the memory file exists; if not, create it with an empty dictionary."""
@@ -13,59 +20,286 @@ def ensure_memory_file():
 # Create the memory file upon module load
 ensure_memory_file()
 
+# ------------------------------
+# In-Memory Fact Store
+# ------------------------------
+class MemoryStore:
+    """
+    Keeps the brain memory in RAM, indexed per category, and persists it through
+    an append-only journal next to the JSON snapshot.
+
+    Each add appends one JSON line to the journal, so writes cost O(1) and reads
+    never touch the disk. Once the journal holds `compact_every` entries (and at
+    least as many as the snapshot, so compaction stays amortized O(1) per write)
+    it is folded back into the snapshot: written to a temp file and renamed over
+    the original, so a crash never leaves a half-written memory file.
+
+    search() answers free-form questions from a MemoryIndex over every fact.
+    The index is built on first use and then kept up to date by add().
+    """
+
+    def __init__(self, path, compact_every=1000):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._facts = {}   # category -> facts in insertion order
+        self._index = {}   # category -> set of lowercased facts
+        self._journal = None
+        self._pending = 0
+        self._count = 0
+        self._vectors = None   # MemoryIndex, built on first search
+        self._load()
+
+    def _load(self):
+        """Read the snapshot once and replay any journal left by a previous run."""
+        try:
+            with open(self.path, "r") as f:
+                memory = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            memory = {}
+        for cat, facts in memory.items():
+            for fact in facts if isinstance(facts, list) else [facts]:
+                self._insert(cat, fact)
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn last line from a crash; everything before it is valid
+                    self._insert(entry["category"], entry["fact"])
+                    self._pending += 1
+
+    def _insert(self, category, fact):
+        """Add a fact to the in-memory index. Returns True if it was new."""
+        cat = category.lower()
+        index = self._index.setdefault(cat, set())
+        key = fact.lower()
+        if key in index:
+            return False
+        index.add(key)
+        self._facts.setdefault(cat, []).append(fact)
+        self._count += 1
+        if self._vectors is not None:
+            self._vectors.add(cat, fact)
+        return True
+
+    @span("memory.add")
+    def add(self, category, fact):
+        """Store a fact (case-insensitive duplicates are ignored). Returns True if it was new."""
+        with self._lock:
+            if not self._insert(category, fact):
+                return False
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a")
+            self._journal.write(json.dumps({"category": category.lower(), "fact": fact}) + "\n")
+            self._journal.flush()
+            self._pending += 1
+            if self._pending >= max(self.compact_every, self._count - self._pending):
+                self.compact()
+            return True
+
+    def get(self, category):
+        """Return a copy of the facts stored under a category (empty list if none)."""
+        with self._lock:
+            return list(self._facts.get(category.lower(), []))
+
+    def contains(self, category, fact):
+        """Case-insensitive membership check against the category index."""
+        return fact.lower() in self._index.get(category.lower(), ())
+
+    @span("memory.index_build")
+    def build_index(self):
+        """Index every stored fact for search() (once)."""
+        with self._lock:
+            if self._vectors is None:
+                vectors = MemoryIndex()
+                vectors.add_many((cat, fact) for cat, facts in self._facts.items() for fact in facts)
+                self._vectors = vectors
+            return self._vectors
+
+    def search(self, query, k=5):
+        """Return up to k (score, category, fact) matches for a free-form query, best first."""
+        return self.build_index().search(query, k)
+
+    def snapshot(self):
+        """Return the whole memory as a {category: [facts]} dictionary."""
+        with self._lock:
+            return {cat: list(facts) for cat, facts in self._facts.items()}
+
+    def replace(self, memory):
+        """Replace the whole memory with the given dictionary and persist it."""
+        with self._lock:
+            self._facts, self._index, self._count = {}, {}, 0
+            if self._vectors is not None:
+                self._vectors.clear()
+            for cat, facts in memory.items():
+                for fact in facts if isinstance(facts, list) else [facts]:
+                    self._insert(cat, fact)
+            self.compact()
+
+    @span("memory.compact")
+    def compact(self):
+        """Fold the journal into the snapshot with an atomic temp-file rename."""
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._facts, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._pending = 0
+
+    def close(self):
+        """Compact any pending journal entries; called at interpreter exit."""
+        with self._lock:
+            if self._pending:
+                self.compact()
+            elif self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+memory_store = MemoryStore(MEMORY_FILE)
+atexit.register(memory_store.close)
+
 def load_memory():
-    """Load the brain memory from the JSON file. Returns a dictionary."""
-    try:
-        with open(MEMORY_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return {}
+    """Return the brain memory as a dictionary (served from the in-memory store)."""
+    return memory_store.snapshot()
 
 def save_memory(memory):
-    """Save the brain memory (a dictionary) to the JSON file."""
-    with open(MEMORY_FILE, "w") as f:
-        json.dump(memory, f, indent=4)
+    """Replace the brain memory with the given dictionary and persist it."""
+    memory_store.replace(memory)
 
-def add_fact(category, fact):
+def add_fact(category, fact, store=None):
     """
-    Add or update a fact in the brain memory under a given category.
-    This ensures that the value stored is always a list of facts.
+    Add a fact to the brain memory under a given category (in `store`, e.g. one
+    user's MemoryStore, or the local memory by default).
+    Facts are stored as a list per category; case-insensitive duplicates are skipped.
     Returns a confirmation message.
     """
-    memory = load_memory()
-    cat = category.lower()
-    # If category exists but is not a list, convert it to list
-    if cat in memory and not isinstance(memory[cat], list):
-        memory[cat] = [memory[cat]]
-    if cat in memory:
-        # Only add if the fact is not already present (case-insensitive check)
-        if fact.lower() not in [x.lower() for x in memory[cat]]:
-            memory[cat].append(fact)
-    else:
-        memory[cat] = [fact]
-    save_memory(memory)
-    return f"Okay, I've noted that {cat} includes {fact}."
-
-def get_fact(category):
+    (store or memory_store).add(category, fact)
+    return f"Okay, I've noted that {category.lower()} includes {fact}."
+
+def get_fact(category, store=None):
     """
     Retrieve facts from the brain memory by category.
     Returns the facts as a comma-separated string if found.
     """
-    memory = load_memory()
-    cat = category.lower()
-    if cat in memory and isinstance(memory[cat], list) and memory[cat]:
-        facts = memory[cat]
-        if len(facts) == 1:
-            return facts[0]
-        else:
-            return ", ".join(facts[:-1]) + ", and " + facts[-1]
-    return None
+    facts = (store or memory_store).get(category)
+    if not facts:
+        return None
+    if len(facts) == 1:
+        return facts[0]
+    return ", ".join(facts[:-1]) + ", and " + facts[-1]
+
+# ------------------------------
+# Pattern Tables
+# ------------------------------
+# Teaching patterns: (category, pattern). The fact to store is captured by the
+# named group "fact"; a category of None means the pattern captures it itself
+# in a "category" group. The intent router compiles these same tables.
+TEACH_PATTERNS = [
+    # friend / best friend
+    ("friend", r"my friend name is\s+(?P<fact>.+)"),
+    ("friend", r"remember that my friend(?: is)?\s+(?P<fact>.+)"),
+    ("friend", r"(?!(?:who|how|what)\b)(?P<fact>.+?)\s+is my friend"),
+    ("friend", r"my best friend(?:'s)? name is\s+(?P<fact>.+)"),
+    # favorite food
+    ("favorite food", r"my (?:favourite|favorite) food(?: is)?\s+(?P<fact>.+)"),
+    ("favorite food", r"i love (?:eating|food)\s+(?P<fact>.+)"),
+    # favorite place
+    ("favorite place", r"my (?:favourite|favorite) place(?: is)?\s+(?P<fact>.+)"),
+    ("favorite place", r"i love (?:visiting|being in)\s+(?P<fact>.+)"),
+    # family
+    ("family", r"my family(?: is)?\s+(?P<fact>.+)"),
+    ("family", r"remember that my family(?: is)?\s+(?P<fact>.+)"),
+    # relationship status, girlfriend, boyfriend
+    (None, r"my (?P<category>girlfriend|boyfriend) name is\s+(?P<fact>.+)"),
+    ("relationship", r"i am (?P<fact>single|married|in a relationship)"),
+    (None, r"remember that my (?P<category>girlfriend|boyfriend) is\s+(?P<fact>.+)"),
+]
+
+# Query patterns: (category, pattern). "relationship" answers with the status
+# and any stored girlfriend/boyfriend together.
+QUERY_PATTERNS = [
+    ("friend", r"(?:who|how) (?:is|are) my (?:best )?friends?"),
+    ("friend", r"(?:tell me about|what do you know about) my (?:best )?friends?"),
+    ("favorite food", r"what (?:is|are) my (?:favourite|favorite) foods?"),
+    ("favorite food", r"what do i like to eat"),
+    ("favorite place", r"what (?:is|are) my (?:favourite|favorite) places?"),
+    ("favorite place", r"where do i like to go"),
+    ("family", r"(?:tell me about|who is in|what do you know about) my family"),
+    ("relationship", r"what is my relationship(?: status)?"),
+    ("relationship", r"who is my (?:girlfriend|boyfriend)"),
+]
+
+_TEACH_RULES = [(cat, re.compile(p)) for cat, p in TEACH_PATTERNS]
+_QUERY_RULES = [(cat, re.compile(p)) for cat, p in QUERY_PATTERNS]
+
+# Free-form recall only considers questions about the user, so "what is the
+# capital of France" still goes to the AI even if a stored fact mentions France.
+PERSONAL = re.compile(r"\b(?:my|mine|i|me)\b")
+RECALL_MIN_SCORE = 0.34
+
+def describe_fact(category, store=None):
+    """
+    Build the spoken answer for a stored category.
+    Returns None if nothing is stored under it.
+    """
+    if category == "relationship":
+        rel_status = get_fact("relationship", store)
+        gf = get_fact("girlfriend", store)
+        bf = get_fact("boyfriend", store)
+        response_parts = []
+        if rel_status:
+            response_parts.append(f"your relationship status is {rel_status}")
+        if gf:
+            response_parts.append(f"your girlfriend is {gf}")
+        if bf:
+            response_parts.append(f"your boyfriend is {bf}")
+        if response_parts:
+            return " and ".join(response_parts) + "."
+        return None
+
+    fact = get_fact(category, store)
+    if not fact:
+        return None
+    if category == "friend":
+        return f"Your friend is {fact}."
+    if category == "family":
+        return f"You cherish your family: {fact}."
+    return f"Your {category} is {fact}."
+
+def recall_fact(query, min_score=RECALL_MIN_SCORE, store=None):
+    """
+    Answer a differently phrased question about stored facts, e.g.
+    "which food do I like" or "anything about my pet", from the local index.
+    Returns None unless the best match scores at least min_score.
+    """
+    query = query.strip().lower()
+    if not PERSONAL.search(query):
+        return None
+    with span("memory.recall"):
+        matches = (store or memory_store).search(query, k=1)
+    if not matches or matches[0][0] < min_score:
+        return None
+    category = matches[0][1]
+    if category in ("girlfriend", "boyfriend"):
+        category = "relationship"
+    return describe_fact(category, store)
 
 def process_memory_input(command):
     """
     Process commands intended to teach the AI new facts.
-    Recognized patterns include details for:
-      - friend / best friend / friends with benefits
+    Recognized patterns (see TEACH_PATTERNS) include details for:
+      - friend / best friend
       - favorite food
       - favorite place
       - family
@@ -74,74 +308,12 @@ def process_memory_input(command):
     """
     command = command.strip().lower()
 
-    # Patterns for friend-related facts
-    friend_patterns = [
-        r"my friend name is\s+(.*)",
-        r"remember that my friend(?: is)?\s+(.*)",
-        r"(.*)\s+is my friend",
-        r"my best friend(?:'s)? name is\s+(.*)"
-    ]
-    for pattern in friend_patterns:
-        match = re.search(pattern, command)
-        if match:
-            name = match.group(1).strip()
-            if name:
-                return add_fact("friend", name)
-
-    # Patterns for favorite food
-    food_patterns = [
-        r"my (?:favourite|favorite) food(?: is)?\s+(.*)",
-        r"i love (?:eating|food)\s+(.*)"
-    ]
-    for pattern in food_patterns:
-        match = re.search(pattern, command)
+    for category, pattern in _TEACH_RULES:
+        match = pattern.search(command)
         if match:
-            food = match.group(1).strip()
-            if food:
-                return add_fact("favorite food", food)
-
-    # Patterns for favorite place
-    place_patterns = [
-        r"my (?:favourite|favorite) place(?: is)?\s+(.*)",
-        r"i love (?:visiting|being in)\s+(.*)"
-    ]
-    for pattern in place_patterns:
-        match = re.search(pattern, command)
-        if match:
-            place = match.group(1).strip()
-            if place:
-                return add_fact("favorite place", place)
-
-    # Patterns for family details
-    family_patterns = [
-        r"my family(?: is)?\s+(.*)",
-        r"remember that my family(?: is)?\s+(.*)"
-    ]
-    for pattern in family_patterns:
-        match = re.search(pattern, command)
-        if match:
-            fam = match.group(1).strip()
-            if fam:
-                return add_fact("family", fam)
-
-    # Patterns for relationship status, girlfriend, boyfriend
-    relationship_patterns = [
-        r"my (girlfriend|boyfriend) name is\s+(.*)",
-        r"i am (single|married|in a relationship)",
-        r"remember that my (girlfriend|boyfriend) is\s+(.*)"
-    ]
-    for pattern in relationship_patterns:
-        match = re.search(pattern, command)
-        if match:
-            # For relationship status with one group or two groups
-            if len(match.groups()) == 1:
-                status = match.group(1).strip()
-                return add_fact("relationship", status)
-            elif len(match.groups()) >= 2:
-                relation = match.group(1).strip()
-                name = match.group(2).strip()
-                return add_fact(relation, name)
-
+            fact = match.group("fact").strip()
+            if fact:
+                return add_fact(category or match.group("category"), fact)
     return None
 
 def answer_memory_query(command):
@@ -152,46 +324,17 @@ def answer_memory_query(command):
       - "what is my favorite food?"
       - "tell me about my family"
       - "what is my relationship status?"
+    Other phrasings are matched against every stored fact by recall_fact.
     Returns a human-like response if a fact is found, otherwise returns None.
     """
     command = command.strip().lower()
 
-    # Query for friend-related info
-    if any(q in command for q in ["who is my friend", "how is my friend", "friend"]):
-        fact = get_fact("friend")
-        if fact:
-            return f"Your friend is {fact}."
-    # Query for favorite food
-    if any(q in command for q in ["favorite food", "favourite food", "what do i like to eat"]):
-        fact = get_fact("favorite food")
-        if fact:
-            return f"Your favorite food is {fact}."
-    # Query for favorite place
-    if any(q in command for q in ["favorite place", "favourite place", "where do i like to go"]):
-        fact = get_fact("favorite place")
-        if fact:
-            return f"Your favorite place is {fact}."
-    # Query for family
-    if any(q in command for q in ["family", "my family"]):
-        fact = get_fact("family")
-        if fact:
-            return f"You cherish your family: {fact}."
-    # Query for relationship
-    if any(q in command for q in ["relationship", "girlfriend", "boyfriend"]):
-        # Check for relationship and specific ones
-        rel_status = get_fact("relationship")
-        gf = get_fact("girlfriend")
-        bf = get_fact("boyfriend")
-        response_parts = []
-        if rel_status:
-            response_parts.append(f"your relationship status is {rel_status}")
-        if gf:
-            response_parts.append(f"your girlfriend is {gf}")
-        if bf:
-            response_parts.append(f"your boyfriend is {bf}")
-        if response_parts:
-            return " and ".join(response_parts) + "."
-    return None
+    for category, pattern in _QUERY_RULES:
+        if pattern.search(command):
+            answer = describe_fact(category)
+            if answer:
+                return answer
+    return recall_fact(command)
 
 def process_brain_command(command):
     """
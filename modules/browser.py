@@ -1,10 +1,166 @@
-from selenium import webdriver
-from selenium.webdriver.common.keys import Keys
-
-def search_google(query):
-    print(f"Searching Google for {query}...")
-    driver = webdriver.Chrome()
-    driver.get("https://www.google.com")
-    search_box = driver.find_element("name", "q")
-    search_box.send_keys(query)
-    search_box.send_keys(Keys.RETURN)
\ No newline at end of file
+import atexit
+import html
+import queue
+import re
+import threading
+import time
+from urllib.parse import quote_plus, unquote
+
+from modules.gateway import gateway
+from utils.helpers import lazy_import
+from utils.logger import log
+
+webdriver = lazy_import("selenium.webdriver")
+
+SEARCH_BASE_URL = "https://www.google.com"
+
+def search_url(query, base_url=SEARCH_BASE_URL):
+    return f"{base_url.rstrip('/')}/search?q={quote_plus(query)}"
+
+# ------------------------------
+# Browser Session Pool
+# ------------------------------
+class BrowserPool:
+    """
+    Keeps up to `size` warm Chrome drivers and hands them out for reuse.
+    A driver is quit and replaced after `max_uses` searches or as soon as a
+    page load fails in any way (crashed, closed by the user, chromedriver
+    gone), and every driver is shut down when the assistant exits. Waiting
+    for a busy driver gives up after `acquire_timeout` seconds.
+    """
+
+    def __init__(self, size=1, max_uses=50, headless=False, driver_factory=None, acquire_timeout=30.0):
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.headless = headless
+        self.driver_factory = driver_factory or self._new_chrome
+        self._idle = queue.LifoQueue()   # most recently used (warmest) driver first
+        self._uses = {}                  # driver -> number of searches served
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _new_chrome(self):
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument("--headless=new")
+        return webdriver.Chrome(options=options)
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(driver, None)
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """
+        Return a warm driver, starting a new one if the pool is not full yet.
+        Raises TimeoutError if none is free within acquire_timeout seconds.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                start_new = self._created < self.size
+                if start_new:
+                    self._created += 1
+            if start_new:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"no browser free within {self.acquire_timeout:.0f} s")
+            try:
+                # Wake up now and then: a driver quit by another search frees a slot without queueing one.
+                return self._idle.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._uses[driver] = 0
+        return driver
+
+    def release(self, driver, broken=False):
+        """Return a driver to the pool, recycling it if it is broken or worn out."""
+        with self._lock:
+            self._uses[driver] = self._uses.get(driver, 0) + 1
+            worn_out = self._uses[driver] >= self.max_uses
+        if broken or worn_out or self._closed:
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+
+    def get(self, url):
+        """Load a URL in a pooled driver, retrying once on a fresh driver if it failed."""
+        for attempt in range(2):
+            driver = self.acquire()
+            broken = True
+            try:
+                driver.get(url)
+                broken = False
+                return
+            except Exception:
+                # WebDriverException, or urllib3/connection errors once chromedriver itself has died.
+                if attempt:
+                    raise
+            finally:
+                self.release(driver, broken=broken)
+
+    def shutdown(self):
+        """Quit every idle driver; drivers still in use are quit when released."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
+
+browser_pool = BrowserPool()
+atexit.register(browser_pool.shutdown)
+
+# ------------------------------
+# HTTP Fetch Mode
+# ------------------------------
+_RESULT = re.compile(r'<a[^>]+href="([^"]+)"[^>]*>\s*<h3[^>]*>(.*?)</h3>', re.S)
+_TAGS = re.compile(r"<[^>]+>")
+
+def fetch_search_results(query, base_url=SEARCH_BASE_URL, limit=5, timeout=5):
+    """
+    Fetch a results page over plain HTTP, without a browser, on the search
+    service's keep-alive session (see modules.gateway).
+    Returns a list of (title, url) tuples.
+    """
+    response = gateway.call("search", gateway.session("search").get, search_url(query, base_url),
+                            key=(query, base_url), timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+    response.raise_for_status()
+    results = []
+    for href, title in _RESULT.findall(response.text):
+        if href.startswith("/url?q="):
+            href = unquote(href[len("/url?q="):].split("&", 1)[0])
+        results.append((html.unescape(_TAGS.sub("", title)).strip(), href))
+        if len(results) >= limit:
+            break
+    return results
+
+def search_google(query, fetch_only=False, base_url=SEARCH_BASE_URL):
+    """
+    Search Google for a query.
+    By default the results page is shown in a pooled, already running browser.
+    With fetch_only=True the results are fetched over HTTP and returned instead.
+    """
+    if fetch_only:
+        return fetch_search_results(query, base_url)
+    log(f"Searching Google for {query}...")
+    browser_pool.get(search_url(query, base_url))
@@ -0,0 +1,179 @@
+import logging
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.logger import incr, log, span
+
+Turn = namedtuple("Turn", ["role", "text", "tokens"])
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token), enough for budgeting."""
+    return max(1, (len(text) + 3) // 4)
+
+SUMMARY_PROMPT = (
+    "Update the running summary of a conversation between a user and a voice assistant.\n"
+    "Keep names, preferences and open questions; drop small talk. Answer with the summary "
+    "only, in at most {words} words.\n\n"
+    "Current summary:\n{summary}\n\n"
+    "New turns:\n{turns}\n"
+)
+
+class ConversationSession:
+    """
+    Multi-turn context for the AI chat with a bounded prompt size.
+
+    The most recent turns are kept verbatim up to `window_tokens`. When the
+    window overflows, the oldest turns are moved out until it is back under
+    half the budget and folded into a running summary by a background worker,
+    so there is one summarization call per several turns rather than per turn.
+    The summary itself is capped at `summary_tokens`. Brain facts are added only
+    when `fact_search(query, k)` scores them at `fact_min_score` or better.
+    The prompt per turn therefore stays roughly constant however long the
+    session runs.
+
+    A prompt with no context at all (first question, nothing relevant stored)
+    is sent unchanged, exactly as before.
+    """
+
+    def __init__(self, client, window_tokens=1024, summary_tokens=256, fact_search=None,
+                 fact_min_score=0.34, max_facts=3, history=200):
+        self.client = client
+        self.window_tokens = window_tokens
+        self.summary_tokens = summary_tokens
+        self.fact_search = fact_search
+        self.fact_min_score = fact_min_score
+        self.max_facts = max_facts
+        self.summary = ""
+        self.summaries = 0
+        self.prompt_tokens = deque(maxlen=history)   # estimated tokens of recent prompts
+        self._turns = deque()
+        self._window = 0          # tokens currently in _turns
+        self._evicted = []        # turns waiting to be summarized
+        self._lock = threading.Lock()
+        self._summarizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+
+    # ------------------------------
+    # Prompt Building
+    # ------------------------------
+    def relevant_facts(self, text):
+        if self.fact_search is None:
+            return []
+        try:
+            matches = self.fact_search(text, self.max_facts)
+        except Exception as e:
+            log(f"[Conversation] Fact search failed: {e}", logging.WARNING)
+            return []
+        return [(category, fact) for score, category, fact in matches if score >= self.fact_min_score]
+
+    def build_prompt(self, text):
+        facts = self.relevant_facts(text)
+        with self._lock:
+            summary = self.summary
+            turns = list(self._turns)
+        if not (facts or summary or turns):
+            return text
+        sections = []
+        if facts:
+            sections.append("Facts about the user:\n" + "\n".join(f"- {c}: {f}" for c, f in facts))
+        if summary:
+            sections.append("Summary of the earlier conversation:\n" + summary)
+        lines = [f"{turn.role}: {turn.text}" for turn in turns]
+        lines += [f"User: {text}", "Assistant:"]
+        sections.append("Conversation:\n" + "\n".join(lines))
+        return "\n\n".join(sections)
+
+    # ------------------------------
+    # Window and Summary
+    # ------------------------------
+    def record(self, text, reply):
+        """Add a finished exchange; turns that overflow the window go to the summarizer."""
+        with self._lock:
+            for role, turn_text in (("User", text), ("Assistant", reply)):
+                turn = Turn(role, turn_text, estimate_tokens(turn_text))
+                self._turns.append(turn)
+                self._window += turn.tokens
+            evicted = False
+            if self._window <= self.window_tokens:
+                return
+            while self._window > self.window_tokens // 2 and len(self._turns) > 2:
+                turn = self._turns.popleft()
+                self._window -= turn.tokens
+                self._evicted.append(turn)
+                evicted = True
+        if evicted:
+            self._summarizer.submit(self._summarize)
+
+    def _clip(self, text):
+        limit = self.summary_tokens * 4
+        return text if len(text) <= limit else text[-limit:]
+
+    def _summarize(self):
+        """Fold every turn evicted so far into the summary (runs on the summarizer thread)."""
+        with self._lock:
+            turns, self._evicted = self._evicted, []
+            summary = self.summary
+        if not turns:
+            return  # an earlier run already took these turns
+        transcript = "\n".join(f"{turn.role}: {turn.text}" for turn in turns)
+        try:
+            with span("conversation.summarize"):
+                updated = self.client.generate(SUMMARY_PROMPT.format(
+                    words=self.summary_tokens * 3 // 4, summary=summary or "(none)", turns=transcript))
+        except Exception as e:
+            log(f"[Conversation] Summarization failed ({e}), keeping the raw turns.", logging.WARNING)
+            updated = None
+        if not updated:
+            incr("conversation.summary_fallbacks")
+            updated = (summary + "\n" + transcript).strip()
+        with self._lock:
+            self.summary = self._clip(updated.strip())
+            self.summaries += 1
+
+    def wait_idle(self):
+        """Block until pending summarization has finished (for tests and benchmarks)."""
+        self._summarizer.submit(lambda: None).result()
+
+    def reset(self):
+        with self._lock:
+            self._turns.clear()
+            self._window = 0
+            self._evicted = []
+            self.summary = ""
+
+    # ------------------------------
+    # Asking
+    # ------------------------------
+    def _prepare(self, text):
+        prompt = self.build_prompt(text)
+        self.prompt_tokens.append(estimate_tokens(prompt))
+        return prompt
+
+    def ask(self, text):
+        """Return the full reply to `text` in the context of this conversation."""
+        reply = self.client.generate(self._prepare(text))
+        if reply:
+            self.record(text, reply)
+        return reply
+
+    def ask_stream(self, text):
+        """Streaming variant of ask(); a reply cut short (barge-in) is recorded as far as it got."""
+        chunks = []
+        try:
+            for chunk in self.client.stream(self._prepare(text)):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            if chunks:
+                self.record(text, "".join(chunks))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "turns": len(self._turns),
+                "window_tokens": self._window,
+                "summary_tokens": estimate_tokens(self.summary) if self.summary else 0,
+                "summaries": self.summaries,
+                "last_prompt_tokens": self.prompt_tokens[-1] if self.prompt_tokens else 0,
+                "max_prompt_tokens": max(self.prompt_tokens, default=0),
+            }
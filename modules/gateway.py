@@ -0,0 +1,339 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from utils.helpers import lazy_import
+from utils.logger import incr, log, observe
+
+requests = lazy_import("requests")
+
+class GatewayError(Exception):
+    """An outbound call that produced no result."""
+
+class CircuitOpen(GatewayError):
+    """The service failed repeatedly and is not being called for now."""
+
+class GatewayTimeout(GatewayError):
+    """The call, or the wait for a free slot, took longer than the service's timeout."""
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures; while open, calls
+    fail fast. Once `reset_after` seconds have passed a single trial call is
+    let through (half-open): its success closes the breaker again, its
+    failure reopens it.
+    """
+
+    def __init__(self, failure_threshold=3, reset_after=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go out now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_after:
+                    return False
+                self.state = HALF_OPEN
+            if self._trial:
+                return False   # the trial call is still out
+            self._trial = True
+            return True
+
+    def record(self, ok):
+        """Record a call's outcome. Returns the new state if it changed, else None."""
+        with self._lock:
+            previous = self.state
+            if ok:
+                self.failures = 0
+                self.state = CLOSED
+            else:
+                self.failures += 1
+                if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+            self._trial = False
+            return self.state if self.state != previous else None
+
+class Service:
+    """
+    One outbound dependency: at most `max_concurrent` calls in flight, each
+    given `timeout` seconds (waiting for a slot included), behind its own
+    circuit breaker. Each call runs on a daemon worker thread, so a caller
+    gets its answer (or GatewayTimeout) on time even if the library call hangs,
+    and a hung call never holds up exit; it keeps its slot until it returns,
+    so a stuck service cannot pile up threads. Identical requests made while
+    one is in flight share its result (single_flight).
+    """
+
+    def __init__(self, name, max_concurrent=4, timeout=10.0, failure_threshold=3, reset_after=30.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_after)
+        self.in_flight = 0
+        self.counts = {"calls": 0, "ok": 0, "errors": 0, "timeouts": 0,
+                       "rejected": 0, "coalesced": 0, "fallbacks": 0}
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._shared = {}                    # single-flight key -> Future
+        self._outcomes = deque(maxlen=100)   # recent successes, for the error rate
+        self._latencies = deque(maxlen=200)  # recent call durations (seconds)
+        self._lock = threading.Lock()
+        self._session = None
+
+    def count(self, what):
+        with self._lock:
+            self.counts[what] += 1
+        incr(f"gateway.{self.name}.{what}")
+
+    def session(self):
+        """A keep-alive requests.Session for this service, pooling up to max_concurrent connections."""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrent)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _enter(self, deadline):
+        """
+        Pass the breaker and take a slot. Returns the call's deadline: the
+        service's timeout from now, or the caller's `deadline` (a
+        time.monotonic() value) if that is sooner.
+        """
+        self.count("calls")
+        if not self.breaker.allow():
+            self.count("rejected")
+            raise CircuitOpen(f"{self.name} is unavailable (circuit open)")
+        deadline = min(time.monotonic() + self.timeout, deadline or float("inf"))
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            self._finish(self.timeout, False, "timeouts")
+            raise GatewayTimeout(f"{self.name}: no free connection within {self.timeout:.1f} s")
+        with self._lock:
+            self.in_flight += 1
+        return deadline
+
+    def run(self, fn, args, kwargs, passthrough=(), deadline=None):
+        """
+        Call fn(*args, **kwargs) through the breaker, the concurrency limit
+        and the timeout. Exceptions in `passthrough` are answers, not
+        failures (e.g. "could not understand the audio").
+        """
+        deadline = self._enter(deadline)
+        start = time.perf_counter()
+        future = Future()
+        threading.Thread(target=self._work, args=(future, fn, args, kwargs),
+                         daemon=True, name=f"gateway-{self.name}").start()
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            self._finish(time.perf_counter() - start, False, "timeouts")
+            raise GatewayTimeout(f"{self.name}: no answer within {self.timeout:.1f} s") from None
+        except passthrough:
+            self._finish(time.perf_counter() - start, True, "ok")
+            raise
+        except Exception:
+            self._finish(time.perf_counter() - start, False, "errors")
+            raise
+        self._finish(time.perf_counter() - start, True, "ok")
+        return result
+
+    def stream(self, fn, args, kwargs, deadline=None):
+        """
+        Like run(), for a call that returns an iterator (a streamed answer).
+        The chunks are pulled on the worker thread and handed over through a
+        queue, so the whole stream, not just the call that starts it, has to
+        finish by the deadline, holds the slot and counts for the breaker.
+        Chunks already received are still delivered to a slow reader after
+        the deadline; a reader that stops early ends the stream.
+        """
+        deadline = self._enter(deadline)
+        start = time.perf_counter()
+        chunks, stop = queue.SimpleQueue(), threading.Event()
+        threading.Thread(target=self._pump, args=(chunks, stop, fn, args, kwargs),
+                         daemon=True, name=f"gateway-{self.name}").start()
+        outcome = (time.perf_counter(), True, "ok")   # if the reader stops early, e.g. barge-in
+        try:
+            while True:
+                try:
+                    kind, value = chunks.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    outcome = (time.perf_counter(), False, "timeouts")
+                    raise GatewayTimeout(f"{self.name}: stream not finished within {self.timeout:.1f} s") from None
+                if kind == "chunk":
+                    yield value
+                    continue
+                outcome = (value[0], kind == "end", "ok" if kind == "end" else "errors")
+                if kind == "error":
+                    raise value[1]
+                return
+        finally:
+            stop.set()
+            finished_at, ok, what = outcome
+            self._finish(finished_at - start, ok, what)
+
+    def _pump(self, chunks, stop, fn, args, kwargs):
+        try:
+            for chunk in fn(*args, **kwargs):
+                if stop.is_set():
+                    break
+                chunks.put(("chunk", chunk))
+            chunks.put(("end", (time.perf_counter(), None)))
+        except BaseException as e:
+            chunks.put(("error", (time.perf_counter(), e)))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def single_flight(self, key, fn, args, kwargs, passthrough=(), deadline=None):
+        """Like run(), but a call with the same key as one in flight waits for that one's result."""
+        with self._lock:
+            shared = self._shared.get(key)
+            leader = shared is None
+            if leader:
+                shared = self._shared[key] = Future()
+        if not leader:
+            self.count("coalesced")
+            return shared.result(timeout=2 * self.timeout)   # the leader waits at most twice that
+        try:
+            result = self.run(fn, args, kwargs, passthrough, deadline)
+        except BaseException as e:
+            shared.set_exception(e)
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._shared[key]
+
+    def _work(self, future, fn, args, kwargs):
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def _finish(self, seconds, ok, what):
+        self.count(what)
+        observe(f"gateway.{self.name}", seconds)
+        with self._lock:
+            self._outcomes.append(ok)
+            self._latencies.append(seconds)
+        state = self.breaker.record(ok)
+        if state is not None:
+            level = logging.WARNING if state == OPEN else logging.INFO
+            log(f"[Gateway] {self.name} circuit {state}.", level)
+            incr(f"gateway.{self.name}.circuit_{state.replace('-', '_')}")
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            outcomes = list(self._outcomes)
+            stats = dict(self.counts)
+            stats["in_flight"] = self.in_flight
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1e3 if latencies else 0.0
+        stats.update(state=self.breaker.state, error_rate=outcomes.count(False) / len(outcomes) if outcomes else 0.0,
+                     p50_ms=pct(50), p95_ms=pct(95))
+        return stats
+
+class Gateway:
+    """
+    Every call to an external service goes through here, by service name:
+
+        gateway.call("translate", translator.translate, text, key=text,
+                     fallback=lambda: transliterate_offline(text))
+
+    `key` coalesces identical in-flight requests into one call; `fallback`
+    answers locally when the call cannot be made or fails (circuit open,
+    timeout, error); exceptions listed in `passthrough` are the service's
+    own answers and always reach the caller; `deadline` (a time.monotonic()
+    value) shortens the service's timeout for this call. Other keyword
+    arguments go to fn. stream() does the same for a streamed answer.
+    """
+
+    def __init__(self, services=None):
+        self._services = {}
+        self._lock = threading.Lock()
+        for name, options in (services or {}).items():
+            self.configure(name, **options)
+
+    def configure(self, name, **options):
+        """(Re)define a service's limits: max_concurrent, timeout, failure_threshold, reset_after."""
+        with self._lock:
+            service = self._services[name] = Service(name, **options)
+        return service
+
+    def service(self, name):
+        with self._lock:
+            service = self._services.get(name)
+            if service is None:
+                service = self._services[name] = Service(name)
+        return service
+
+    def session(self, name):
+        return self.service(name).session()
+
+    def call(self, name, fn, *args, key=None, fallback=None, passthrough=(), deadline=None, **kwargs):
+        service = self.service(name)
+        try:
+            if key is None:
+                return service.run(fn, args, kwargs, passthrough, deadline)
+            return service.single_flight(key, fn, args, kwargs, passthrough, deadline)
+        except passthrough:
+            raise
+        except Exception:
+            if fallback is None:
+                raise
+            service.count("fallbacks")
+            return fallback()
+
+    def stream(self, name, fn, *args, deadline=None, **kwargs):
+        """Iterate over fn(*args, **kwargs), a streamed answer, within the service's limits."""
+        return self.service(name).stream(fn, args, kwargs, deadline)
+
+    def stats(self):
+        with self._lock:
+            services = list(self._services.values())
+        return {service.name: service.stats() for service in services}
+
+    def report(self):
+        """One line per service that has been called."""
+        lines = []
+        for name, s in self.stats().items():
+            if not s["calls"]:
+                continue
+            lines.append(f"{name}: circuit {s['state']}, {s['calls']} calls, {s['error_rate']:.0%} errors, "
+                         f"{s['timeouts']} timeouts, {s['rejected']} failed fast, {s['coalesced']} coalesced, "
+                         f"p50 {s['p50_ms']:.0f} ms, p95 {s['p95_ms']:.0f} ms")
+        return "; ".join(lines) if lines else "no outbound calls"
+
+# Limits per service. Timeouts cover waiting for a free slot plus the call itself.
+SERVICES = {
+    "speech": {"max_concurrent": 2, "timeout": 8.0, "failure_threshold": 3, "reset_after": 20.0},
+    "translate": {"max_concurrent": 2, "timeout": 5.0, "failure_threshold": 3, "reset_after": 60.0},
+    "gemini": {"max_concurrent": 4, "timeout": 25.0, "failure_threshold": 3, "reset_after": 30.0},
+    "search": {"max_concurrent": 4, "timeout": 8.0, "failure_threshold": 5, "reset_after": 30.0},
+}
+
+gateway = Gateway(SERVICES)
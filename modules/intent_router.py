@@ -0,0 +1,179 @@
+import re
+from dataclasses import dataclass, field
+
+from modules.brain import TEACH_PATTERNS, QUERY_PATTERNS
+from modules.time_parser import TIME_FRAGMENT, TIME_LEAD
+from utils.logger import span
+
+# ------------------------------
+# Intent Names
+# ------------------------------
+OPEN_APP = "open_app"
+CLOSE_APP = "close_app"
+SEARCH = "search"
+REMINDER = "reminder"
+EXIT = "exit"
+INTERRUPT = "interrupt"   # cut off the answer being spoken, keep listening
+REMEMBER = "remember"
+RECALL = "recall"
+CHAT = "chat"
+PLAN = "plan"      # a compound utterance; slots["actions"] holds its Intents in order
+
+@dataclass(frozen=True)
+class Intent:
+    """A classified utterance: the intent name plus the slots it captured."""
+    name: str
+    slots: dict = field(default_factory=dict)
+    text: str = ""
+
+    @property
+    def actions(self):
+        """The single actions this intent stands for (several for a PLAN)."""
+        return self.slots["actions"] if self.name == PLAN else (self,)
+
+# ------------------------------
+# Rule Table
+# ------------------------------
+# Each rule is (intent, pattern, fixed_slots). Rules are tried in order and
+# every pattern is anchored at the start of the utterance, so "search for open
+# source" is a search and "my friend likes pizza" is not a memory query.
+# Reminder times use the time parser's grammar, either right after "remind me"
+# or, if it starts with a word like "at", "in" or "tomorrow", at the very end.
+_TIME = "(?:" + TIME_FRAGMENT + ")"
+_REMIND = r"(?:set (?:a )?reminder|remind me)"
+
+COMMAND_PATTERNS = [
+    (EXIT, r"(?:exit|quit|goodbye)$", {}),
+    (INTERRUPT, r"(?:(?:ok(?:ay)?|please)\s+)?(?:stop(?:\s+(?:it|that|talking|speaking))?|cancel(?:\s+(?:it|that))?"
+                r"|be quiet|quiet|shut up|enough|never\s?mind)(?:\s+please)?$", {}),
+    (REMINDER, _REMIND + r"(?: for| at)?\s+(?:at\s+)?(?P<time>" + _TIME + r")(?:\s+(?:to\s+)?(?P<message>.+))?$", {}),
+    (REMINDER, _REMIND + r"\s+(?:to\s+)?(?P<message>.+?)\s+" + TIME_LEAD + "(?P<time>" + _TIME + ")$", {}),
+    (REMINDER, _REMIND + r"\b(?:\s+(?:to\s+)?(?P<message>.+))?$", {}),
+    (OPEN_APP, r"open\s+(?P<app>.+)", {}),
+    (CLOSE_APP, r"close\s+(?P<app>.+)", {}),
+    (SEARCH, r"(?:search|google)(?: for)?\s+(?P<query>.+)", {}),
+]
+
+def _build_rules():
+    """Flatten the command table and the brain's teach/query tables into one list."""
+    rules = list(COMMAND_PATTERNS)
+    for category, pattern in QUERY_PATTERNS:
+        rules.append((RECALL, pattern, {"category": category}))
+    for category, pattern in TEACH_PATTERNS:
+        rules.append((REMEMBER, pattern, {"category": category} if category else {}))
+    return rules
+
+def _compile(rules):
+    """
+    Compile every rule into a single anchored alternation.
+    Each rule is wrapped in its own group ("r0", "r1", ...) and its slot groups
+    are renamed with that prefix, so one match identifies the rule (lastgroup
+    is the outermost group that closed) and its slots at the same time.
+    """
+    alternatives = []
+    for i, (_, pattern, _) in enumerate(rules):
+        prefixed = re.sub(r"\(\?P<(\w+)>", rf"(?P<r{i}__\1>", pattern)
+        alternatives.append(f"(?P<r{i}>{prefixed})")
+    return re.compile("^(?:" + "|".join(alternatives) + ")")
+
+_RULES = _build_rules()
+_MATCHER = _compile(_RULES)
+_SLOT_NAMES = [
+    [(name, name.split("__", 1)[1]) for name in _MATCHER.groupindex if name.startswith(f"r{i}__")]
+    for i in range(len(_RULES))
+]
+
+def normalize(command):
+    """Lowercase, trim and drop trailing punctuation from a recognized utterance."""
+    return command.strip().lower().rstrip("?.!, ")
+
+def _route_one(text):
+    match = _MATCHER.match(text)
+    if not match:
+        return Intent(CHAT, {"prompt": text}, text)
+
+    index = int(match.lastgroup[1:])
+    name, _, fixed = _RULES[index]
+    slots = dict(fixed)
+    for group, slot in _SLOT_NAMES[index]:
+        value = match.group(group)
+        if value is not None:
+            slots[slot] = value.strip()
+    return Intent(name, slots, text)
+
+# ------------------------------
+# Compound Utterances
+# ------------------------------
+# "open chrome and spotify, then remind me at 5 pm to stretch" is split at the
+# connectors below. "then" orders everything after it behind everything before.
+_CONNECTOR = re.compile(r"\s*(?:,\s*and then|,\s*then|\band then|\bthen|,\s*and also|\band also|,\s*also"
+                        r"|,\s*and|\band|\balso|,|;)\s+")
+_CONNECTOR_HINT = re.compile(r" and | then | also |[,;]")   # cheap pre-check before splitting
+_APP_VERBS = {OPEN_APP: "open", CLOSE_APP: "close"}
+_MAX_APP_WORDS = 3   # "open chrome and visual studio code": a bare tail this short is another app
+
+def _split(text):
+    """
+    Route the pieces of a compound utterance. Returns a list of (intent,
+    after_then) pairs, or None when the utterance is not a compound command.
+
+    A piece that is not a command on its own either names another app for a
+    preceding open/close ("open chrome and spotify"), becomes a chat question
+    after an app command, or belongs to the previous action's free text
+    ("remind me at 5 to stretch and drink water").
+    """
+    pieces, connectors, position = [], [""], 0
+    for match in _CONNECTOR.finditer(text):
+        piece = text[position:match.start()]
+        if piece.strip():
+            pieces.append(piece)
+            connectors.append(match.group())
+        else:
+            connectors[-1] += match.group()   # nothing between two connectors ("and, then")
+        position = match.end()
+    if text[position:].strip():
+        pieces.append(text[position:])
+    else:
+        connectors.pop()
+
+    actions = []
+    for piece, connector in zip(pieces, connectors):
+        intent = _route_one(piece)
+        after_then = "then" in connector
+        if intent.name == CHAT and actions:
+            previous, previous_then = actions[-1]
+            if previous.name in _APP_VERBS and len(piece.split()) <= _MAX_APP_WORDS:
+                intent = Intent(previous.name, {"app": piece}, f"{_APP_VERBS[previous.name]} {piece}")
+            elif previous.name not in _APP_VERBS:
+                actions[-1] = (_route_one(previous.text + connector + piece), previous_then)
+                continue
+        elif intent.name == CHAT:
+            return None   # a question that merely contains "and"
+        actions.append((intent, after_then))
+    return actions if len(actions) > 1 else None
+
+@span("router.route")
+def route(command):
+    """
+    Classify an utterance in a single pass over the combined matcher.
+    Returns an Intent; anything unmatched falls through to CHAT. A compound
+    utterance becomes a PLAN whose "actions" slot holds one Intent per action
+    and whose "after_then" slot marks the actions that follow a "then".
+    """
+    text = normalize(command)
+    intent = _route_one(text)
+    if intent.name == CHAT or _CONNECTOR_HINT.search(text) is None:
+        return intent
+    actions = _split(text)
+    if actions is None:
+        return intent
+    return Intent(PLAN, {"actions": tuple(action for action, _ in actions),
+                         "after_then": tuple(after for _, after in actions)}, text)
+
+def is_exit(intent):
+    """True if handling this intent ends the session."""
+    return any(action.name == EXIT for action in intent.actions)
+
+def is_interrupt(intent):
+    """True if the utterance only asks the assistant to stop what it is saying."""
+    return intent.name == INTERRUPT
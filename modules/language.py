@@ -0,0 +1,264 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from modules.gateway import gateway
+from utils.helpers import lazy_import
+from utils.logger import log, span
+
+deep_translator = lazy_import("deep_translator")
+langdetect = lazy_import("langdetect")
+
+TRANSLATION_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translations.jsonl")
+
+DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+
+# ------------------------------
+# Statistics
+# ------------------------------
+_stats_lock = threading.Lock()
+stats = {
+    "detect_calls": 0,
+    "detect_ascii_skips": 0,
+    "detect_script_skips": 0,
+    "detect_cache_hits": 0,
+    "detect_langdetect": 0,
+    "detect_seconds": 0.0,
+    "translate_calls": 0,
+    "translate_memory_hits": 0,
+    "translate_disk_hits": 0,
+    "translate_network": 0,
+    "translate_offline": 0,
+    "translate_network_seconds": 0.0,
+}
+
+def _count(key, amount=1):
+    with _stats_lock:
+        stats[key] += amount
+
+def language_stats():
+    """Return a copy of the counters plus derived hit rates and mean latencies."""
+    with _stats_lock:
+        snapshot = dict(stats)
+    detect_calls = snapshot["detect_calls"] or 1
+    translate_calls = snapshot["translate_calls"] or 1
+    snapshot["detect_skip_rate"] = (snapshot["detect_ascii_skips"] + snapshot["detect_script_skips"]
+                                    + snapshot["detect_cache_hits"]) / detect_calls
+    snapshot["translate_hit_rate"] = (snapshot["translate_memory_hits"] + snapshot["translate_disk_hits"]) / translate_calls
+    snapshot["langdetect_mean_ms"] = snapshot["detect_seconds"] * 1e3 / (snapshot["detect_langdetect"] or 1)
+    snapshot["network_mean_ms"] = snapshot["translate_network_seconds"] * 1e3 / (snapshot["translate_network"] or 1)
+    return snapshot
+
+class LRUCache:
+    """Small thread-safe bounded LRU map."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+# ------------------------------
+# Language Detection
+# ------------------------------
+_detect_cache = LRUCache(2048)
+
+def detect_language(text):
+    """
+    Detect the language of a string, avoiding langdetect where the script decides it:
+      - pure ASCII text is treated as English (romanized Hindi included),
+      - text containing Devanagari is treated as Hindi.
+    Anything else goes through langdetect, with results cached.
+    """
+    _count("detect_calls")
+    if text.isascii():
+        _count("detect_ascii_skips")
+        return "en"
+    if DEVANAGARI.search(text):
+        _count("detect_script_skips")
+        return "hi"
+    cached = _detect_cache.get(text)
+    if cached is not None:
+        _count("detect_cache_hits")
+        return cached
+    start = time.perf_counter()
+    try:
+        with span("language.detect"):
+            lang = langdetect.detect(text)
+    except Exception:
+        lang = "unknown"
+    _count("detect_langdetect")
+    _count("detect_seconds", time.perf_counter() - start)
+    _detect_cache.put(text, lang)
+    return lang
+
+# ------------------------------
+# Offline Devanagari Transliteration
+# ------------------------------
+_VOWELS = {
+    "अ": "a", "आ": "aa", "इ": "i", "ई": "ee", "उ": "u", "ऊ": "oo", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o",
+}
+_MATRAS = {
+    "ा": "aa", "ि": "i", "ी": "ee", "ु": "u", "ू": "oo", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o",
+}
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+    "क़": "q", "ख़": "kh", "ग़": "gh", "ज़": "z", "ड़": "d", "ढ़": "dh", "फ़": "f",
+}
+_SIGNS = {"ं": "n", "ँ": "n", "ः": "h", "।": ".", "॥": "."}
+_DIGITS = {chr(0x0966 + i): str(i) for i in range(10)}
+_VIRAMA = "्"
+_NUKTA = "़"
+
+def transliterate_offline(text):
+    """
+    Rule-based Devanagari to Roman transliteration (Hinglish-style spelling).
+    Consonants carry an inherent "a" unless followed by a matra or virama; the
+    inherent "a" is dropped at the end of a word, as it is in spoken Hindi.
+    """
+    out = []
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if i + 1 < n and text[i + 1] == _NUKTA and ch + _NUKTA in _CONSONANTS:
+            ch += _NUKTA
+            i += 1
+        if ch in _CONSONANTS:
+            out.append(_CONSONANTS[ch])
+            nxt = text[i + 1] if i + 1 < n else ""
+            if nxt in _MATRAS:
+                out.append(_MATRAS[nxt])
+                i += 1
+            elif nxt == _VIRAMA:
+                i += 1
+            elif nxt and (nxt in _CONSONANTS or nxt in _SIGNS or "ऀ" <= nxt <= "ॿ"):
+                out.append("a")
+            # otherwise end of word: schwa deletion, no inherent "a"
+        elif ch in _VOWELS:
+            out.append(_VOWELS[ch])
+        elif ch in _MATRAS:
+            out.append(_MATRAS[ch])
+        elif ch in _SIGNS:
+            out.append(_SIGNS[ch])
+        elif ch in _DIGITS:
+            out.append(_DIGITS[ch])
+        elif ch not in (_VIRAMA, _NUKTA):
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+# ------------------------------
+# Cached Transliteration
+# ------------------------------
+class TranslationCache:
+    """
+    Bounded in-memory LRU in front of an append-only JSON-lines file, so the
+    same phrase is only ever sent to the translator once across sessions.
+    The file is read lazily on first use.
+    """
+
+    def __init__(self, path=TRANSLATION_CACHE_FILE, max_entries=4096):
+        self.path = path
+        self._memory = LRUCache(max_entries)
+        self._disk = None
+        self._lock = threading.Lock()
+
+    def _load_disk(self):
+        if self._disk is None:
+            self._disk = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            try:
+                                entry = json.loads(line)
+                                self._disk[entry["source"]] = entry["text"]
+                            except (ValueError, KeyError, TypeError):
+                                continue
+                except OSError as e:
+                    log(f"[Language] Could not read the translation cache: {e}", logging.WARNING)
+        return self._disk
+
+    def get(self, source):
+        """Return (text, "memory" | "disk") or (None, None)."""
+        text = self._memory.get(source)
+        if text is not None:
+            return text, "memory"
+        with self._lock:
+            text = self._load_disk().get(source)
+        if text is not None:
+            self._memory.put(source, text)
+            return text, "disk"
+        return None, None
+
+    def put(self, source, text):
+        self._memory.put(source, text)
+        with self._lock:
+            self._load_disk()[source] = text
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"source": source, "text": text}, ensure_ascii=False) + "\n")
+            except OSError as e:
+                # Still cached for this session; a failed write must not lose the translation.
+                log(f"[Language] Could not save to the translation cache: {e}", logging.WARNING)
+
+translation_cache = TranslationCache()
+
+def transliterate_hindi_to_roman(hindi_text):
+    """
+    Convert Hindi (Devanagari) text to Roman script.
+    Uses the cache first, then GoogleTranslator (as a workaround), and falls
+    back to the offline rule-based transliterator if the translator fails or
+    its circuit is open (see modules.gateway).
+    Only translator results are cached, so a later online call can improve
+    on an offline fallback.
+    """
+    _count("translate_calls")
+    key = hindi_text.strip()
+    text, source = translation_cache.get(key)
+    if text is not None:
+        _count("translate_memory_hits" if source == "memory" else "translate_disk_hits")
+        return text
+
+    start = time.perf_counter()
+    try:
+        with span("language.translate"):
+            translator = deep_translator.GoogleTranslator(source="auto", target="en")
+            text = gateway.call("translate", translator.translate, key, key=key)
+    except Exception as e:
+        log(f"[Language] Translator unavailable ({e}), using offline transliteration.", logging.WARNING)
+        text = None
+    if text:
+        _count("translate_network")
+        _count("translate_network_seconds", time.perf_counter() - start)
+        translation_cache.put(key, text)
+        return text
+
+    _count("translate_offline")
+    return transliterate_offline(key)
@@ -0,0 +1,149 @@
+import functools
+import re
+import threading
+import zlib
+
+from utils.helpers import lazy_import
+
+np = lazy_import("numpy")
+
+DIMENSIONS = 256
+CATEGORY_WEIGHT = 2.0   # a category name counts twice as much as the fact text
+BATCH_SIZE = 4096       # facts vectorized per bincount when bulk indexing
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("""
+    a an the is are was were be what who whom whose where when which how do does did
+    i me my mine you your tell about know to of in on for and or with that this it
+    like love have has any anything remember say
+""".split())
+
+@functools.lru_cache(maxsize=65536)
+def _word_hashes(word):
+    """
+    Hashes of a word and its character trigrams. The trigrams let "favourite"
+    match "favorite"; the whole word is counted twice so that an exact word
+    match outweighs a partial one.
+    """
+    padded = f" {word} "
+    grams = [word, word] + [padded[i:i + 3] for i in range(len(padded) - 2)]
+    return tuple(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+
+def feature_hashes(text):
+    """Feature hashes for the content words of a text (stop words dropped)."""
+    hashes = []
+    for word in _WORD.findall(text.lower()):
+        if word not in STOP_WORDS:
+            hashes.extend(_word_hashes(word))
+    return hashes
+
+class MemoryIndex:
+    """
+    Hashed n-gram vectors for every stored (category, fact), kept as the rows
+    of one float32 NumPy matrix so that a query is scored against all facts
+    with a single matrix product. Rows are L2-normalized, so the product is
+    the cosine similarity.
+
+    Rows are appended in place as facts are added (capacity doubles when the
+    matrix is full), so the index never needs a rebuild.
+    """
+
+    def __init__(self, dim=DIMENSIONS, capacity=1024):
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._rows = []   # row -> (category, fact)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def vectorize_many(self, texts, categories=None):
+        """
+        Normalized vectors (one row per text) for queries, or for facts when their
+        categories are given, built with a single bincount over row * dim + column.
+        """
+        hashes, counts = [], []
+        category_hashes = {}
+        for row, text in enumerate(texts):
+            text_hashes = feature_hashes(text)
+            hashes += text_hashes
+            counts.append(len(text_hashes))
+            if categories is not None:
+                category = categories[row]
+                if category not in category_hashes:
+                    category_hashes[category] = feature_hashes(category)
+                hashes += category_hashes[category]
+                counts.append(len(category_hashes[category]))
+        parts = 1 if categories is None else 2
+        part_weights = np.tile([1.0, CATEGORY_WEIGHT][:parts], len(texts))
+        rows = np.repeat(np.arange(len(texts)).repeat(parts), counts)
+        weights = np.repeat(part_weights, counts)
+        # Feature hashing: low bits pick the column, the top bit the sign.
+        hashes = np.array(hashes, dtype=np.uint32)
+        weights[hashes >= 0x80000000] *= -1
+        vectors = np.bincount(rows * self.dim + hashes % self.dim, weights=weights,
+                              minlength=len(texts) * self.dim)
+        vectors = vectors.reshape(len(texts), self.dim).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def vectorize(self, text, category=None):
+        return self.vectorize_many([text], None if category is None else [category])[0]
+
+    def _grow(self, needed):
+        capacity = len(self._matrix)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:len(self._rows)] = self._matrix[:len(self._rows)]
+        self._matrix = matrix
+
+    def add(self, category, fact):
+        vector = self.vectorize(fact, category)
+        with self._lock:
+            self._grow(len(self._rows) + 1)
+            self._matrix[len(self._rows)] = vector
+            self._rows.append((category, fact))
+
+    def add_many(self, items):
+        """Bulk add (category, fact) pairs, e.g. when indexing an existing memory."""
+        items = list(items)
+        for i in range(0, len(items), BATCH_SIZE):
+            batch = items[i:i + BATCH_SIZE]
+            vectors = self.vectorize_many([fact for _, fact in batch], [category for category, _ in batch])
+            with self._lock:
+                start = len(self._rows)
+                self._grow(start + len(batch))
+                self._matrix[start:start + len(batch)] = vectors
+                self._rows.extend(batch)
+
+    def clear(self):
+        with self._lock:
+            self._matrix[:] = 0
+            self._rows = []
+
+    def search_many(self, queries, k=5):
+        """
+        Score a batch of queries against every fact in one matmul.
+        Returns, per query, up to k (score, category, fact) tuples, best first.
+        """
+        queries = self.vectorize_many(list(queries))
+        with self._lock:
+            n = len(self._rows)
+            scores = queries @ self._matrix[:n].T
+            rows = self._rows
+        results = []
+        for row_scores in scores:
+            if n > k:
+                top = np.argpartition(-row_scores, k)[:k]
+                top = top[np.argsort(-row_scores[top])]
+            else:
+                top = np.argsort(-row_scores)
+            results.append([(float(row_scores[i]), *rows[i]) for i in top])
+        return results
+
+    def search(self, query, k=5):
+        return self.search_many([query], k)[0]
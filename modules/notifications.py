@@ -0,0 +1,210 @@
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from utils.helpers import lazy_import
+from utils.logger import incr, log
+
+tk = lazy_import("tkinter")
+messagebox = lazy_import("tkinter.messagebox")
+
+@dataclass
+class Alert:
+    """
+    A question about a set of items (e.g. {pid: process name}).
+    Alerts of the same kind that arrive close together are merged into one.
+    `question` is formatted with {items}, one item per line.
+    """
+    kind: str
+    title: str
+    question: str
+    items: dict = field(default_factory=dict)
+    on_accept: Optional[Callable] = None     # called with the accepted items
+    accepted_text: str = ""
+    declined_text: str = ""
+
+    def text(self):
+        item_list = "\n".join(f"{name} (PID: {key})" for key, name in self.items.items())
+        return self.question.format(items=item_list)
+
+# ------------------------------
+# Backends
+# ------------------------------
+class TkBackend:
+    """
+    Dialogs on one long-lived, hidden Tk root, created and used only by the
+    notification thread (Tk objects must stay on the thread that made them).
+    """
+
+    def __init__(self):
+        self._root = None
+
+    def _ensure_root(self):
+        if self._root is None:
+            self._root = tk.Tk()
+            self._root.withdraw()
+        return self._root
+
+    def ask(self, alert):
+        return messagebox.askyesno(alert.title, alert.text(), parent=self._ensure_root())
+
+    def info(self, title, text):
+        messagebox.showinfo(title, text, parent=self._ensure_root())
+
+class LogBackend:
+    """Headless: logs every alert and answers nothing, so nothing is killed or dismissed."""
+
+    def ask(self, alert):
+        log(f"[Notifications] {alert.title}: {alert.text()}", logging.WARNING)
+        return None
+
+    def info(self, title, text):
+        log(f"[Notifications] {title}: {text}")
+
+class CallbackBackend:
+    """Headless: answers with ask(alert) -> True / False / None, e.g. from a test or another UI."""
+
+    def __init__(self, ask, info=None):
+        self._ask = ask
+        self._info = info
+
+    def ask(self, alert):
+        return self._ask(alert)
+
+    def info(self, title, text):
+        if self._info is not None:
+            self._info(title, text)
+
+def default_backend():
+    """Tk dialogs when a display is available, otherwise log-only."""
+    if os.name == "nt" or sys.platform == "darwin" or os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
+        return TkBackend()
+    return LogBackend()
+
+# ------------------------------
+# Notification Center
+# ------------------------------
+class NotificationCenter:
+    """
+    Single owner of all user-facing alerts.
+
+    Producers call push(), which only enqueues and never blocks. One thread
+    owns the backend (and so the Tk root) and:
+      - coalesces alerts of the same kind arriving within `coalesce_seconds`
+        (or while a dialog is open) into one question,
+      - drops items the user has already declined; declined (key, name)
+        pairs are remembered, so a reused PID with a new name is asked about again,
+      - asks at most once per `min_interval` seconds per kind, holding newer
+        items back until the interval has passed.
+    """
+
+    def __init__(self, backend=None, coalesce_seconds=2.0, min_interval=300, max_dismissed=4096):
+        self.backend = backend
+        self.coalesce_seconds = coalesce_seconds
+        self.min_interval = min_interval
+        self.max_dismissed = max_dismissed
+        self.stats = {"pushed": 0, "shown": 0, "coalesced": 0, "dismissed_skipped": 0, "rate_limited": 0}
+        self._queue = queue.SimpleQueue()
+        self._held = {}                  # kind -> Alert waiting for its rate limit
+        self._last_shown = {}            # kind -> monotonic time of the last question
+        self._dismissed = OrderedDict()  # (key, name) -> None, oldest first
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def push(self, alert):
+        """Queue an alert for the notification thread (starting it on first use)."""
+        self.stats["pushed"] += 1
+        self._queue.put(alert)
+        if self._thread is None:
+            self.start()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, daemon=True, name="notifications")
+                self._thread.start()
+
+    def dismissed(self, key, name):
+        return (key, name) in self._dismissed
+
+    def _dismiss(self, items):
+        for key, name in items.items():
+            self._dismissed[(key, name)] = None
+            self._dismissed.move_to_end((key, name))
+        while len(self._dismissed) > self.max_dismissed:
+            self._dismissed.popitem(last=False)
+
+    def _merge(self, alert):
+        held = self._held.get(alert.kind)
+        if held is None:
+            if time.monotonic() - self._last_shown.get(alert.kind, -self.min_interval) < self.min_interval:
+                self.stats["rate_limited"] += 1
+            self._held[alert.kind] = alert
+            return
+        self.stats["coalesced"] += 1
+        held.items.update(alert.items)
+        alert.items = held.items
+        self._held[alert.kind] = alert   # newest callbacks and wording win
+
+    def _collect(self, timeout):
+        """Wait up to `timeout` for an alert, then gather everything arriving within the coalescing window."""
+        try:
+            self._merge(self._queue.get(timeout=timeout))
+        except queue.Empty:
+            return
+        deadline = time.monotonic() + self.coalesce_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                self._merge(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                return
+
+    def _next_due(self):
+        """Seconds until a held alert may be shown (None if nothing is held)."""
+        now = time.monotonic()
+        waits = [self._last_shown.get(kind, -self.min_interval) + self.min_interval - now for kind in self._held]
+        return max(min(waits), 0) if waits else None
+
+    def _show(self, alert):
+        items = {key: name for key, name in alert.items.items() if not self.dismissed(key, name)}
+        self.stats["dismissed_skipped"] += len(alert.items) - len(items)
+        if not items:
+            return
+        alert.items = items
+        self._last_shown[alert.kind] = time.monotonic()
+        self.stats["shown"] += 1
+        incr("notifications.shown")
+        answer = self.backend.ask(alert)
+        if answer:
+            if alert.on_accept is not None:
+                alert.on_accept(items)
+            if alert.accepted_text:
+                self.backend.info(alert.title, alert.accepted_text)
+        elif answer is not None:
+            self._dismiss(items)
+            if alert.declined_text:
+                self.backend.info(alert.title, alert.declined_text)
+
+    def run(self):
+        if self.backend is None:
+            self.backend = default_backend()
+        while True:
+            self._collect(self._next_due())
+            now = time.monotonic()
+            for kind in list(self._held):
+                if now - self._last_shown.get(kind, -self.min_interval) < self.min_interval:
+                    continue
+                alert = self._held.pop(kind)
+                try:
+                    self._show(alert)
+                except Exception as e:
+                    log(f"[Notifications] Error showing '{alert.title}': {e}", logging.ERROR)
@@ -1,58 +1,167 @@
+import json
+import logging
 import os
 import subprocess
-import psutil
 import platform
 import difflib
 import threading
 import shutil
+from modules.app_index import AppIndex
+from modules.process_table import process_table
+from utils.helpers import lazy_import
+from utils.logger import log
 
-installed_apps_cache = {}
+psutil = lazy_import("psutil")
 
-def scan_installed_apps():
-    apps = {}
-    system = platform.system()
+APPS_SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "apps_snapshot.json")
+APP_CATALOG_TIMEOUT = 10.0   # seconds find_app waits for the first catalog before falling back to PATH
+
+installed_apps_cache = {}
+installed_apps_index = AppIndex()
+apps_ready = threading.Event()   # set once a catalog (snapshot or scan) is available
+_scan_lock = threading.Lock()    # only one scan runs at a time
+_scan_state = {}                 # directory -> {"mtime", "apps", "subdirs"} from the last scan
+_catalog_started = False
+
+def app_directories(system=None):
+    """Return (directories, recursive) to scan for applications on this platform."""
+    system = system or platform.system()
     if system == "Windows":
-        directories = [os.environ.get("ProgramFiles", "C:\\Program Files"),
-                       os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)"),
-                       os.path.expanduser("~\\AppData\\Local\\Programs")]
-        for directory in directories:
-            if os.path.exists(directory):
-                for root, _, files in os.walk(directory):
-                    for file in files:
-                        if file.lower().endswith(".exe"):
-                            apps[os.path.splitext(file)[0].lower()] = os.path.join(root, file)
-    elif system == "Darwin":
-        directory = "/Applications"
-        if os.path.exists(directory):
-            for file in os.listdir(directory):
-                if file.lower().endswith(".app"):
-                    apps[file.lower().replace(".app", "")] = os.path.join(directory, file)
+        return [os.environ.get("ProgramFiles", "C:\\Program Files"),
+                os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)"),
+                os.path.expanduser("~\\AppData\\Local\\Programs")], True
+    if system == "Darwin":
+        return ["/Applications"], False
+    return ["/usr/bin", "/usr/local/bin"], False
+
+def _app_name(entry, system):
+    """Return the catalog name for a directory entry, or None if it is not an app."""
+    name = entry.name.lower()
+    if system == "Windows":
+        return name[:-4] if name.endswith(".exe") and entry.is_file() else None
+    if system == "Darwin":
+        return name[:-4] if name.endswith(".app") else None
+    try:
+        return name if entry.is_file() and entry.stat().st_mode & 0o111 else None
+    except OSError:
+        return None
+
+def _scan_directory(path, system, recursive, previous, state):
+    """
+    Scan one directory into `state`, reusing the previous result when the
+    directory's mtime is unchanged (adding or removing entries bumps it).
+    Subdirectories are still visited, but an unchanged one costs a single stat.
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return
+    old = previous.get(path)
+    if old and old["mtime"] == mtime:
+        state[path] = old
     else:
-        directories = ["/usr/bin", "/usr/local/bin"]
-        for directory in directories:
-            if os.path.exists(directory):
-                for file in os.listdir(directory):
-                    full_path = os.path.join(directory, file)
-                    if os.access(full_path, os.X_OK):
-                        apps[file.lower()] = full_path
-    return apps
+        apps, subdirs = {}, []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    name = _app_name(entry, system)
+                    if name:
+                        apps[name] = entry.path
+        except OSError:
+            pass
+        state[path] = {"mtime": mtime, "apps": apps, "subdirs": subdirs}
+    for subdir in state[path]["subdirs"]:
+        _scan_directory(subdir, system, recursive, previous, state)
+
+def scan_app_directories(directories, recursive, previous=None, system=None):
+    """
+    Incrementally scan application directories.
+    Returns (apps, state); pass the returned state back as `previous` next time.
+    """
+    system = system or platform.system()
+    state = {}
+    for directory in directories:
+        _scan_directory(directory, system, recursive, previous or {}, state)
+    apps = {}
+    for entry in state.values():
+        apps.update(entry["apps"])
+    return apps, state
 
-def update_installed_apps_cache():
-    global installed_apps_cache
-    installed_apps_cache = scan_installed_apps()
-    print(f"[PC Control] Found {len(installed_apps_cache)} applications.")
+def scan_installed_apps():
+    directories, recursive = app_directories()
+    return scan_app_directories(directories, recursive)[0]
+
+def load_apps_snapshot(path=APPS_SNAPSHOT_FILE):
+    """Load the catalog saved by the previous session. Returns True if one was loaded."""
+    global installed_apps_cache, installed_apps_index, _scan_state
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+        apps = {}
+        for entry in state.values():
+            apps.update(entry["apps"])
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        log(f"[PC Control] Ignoring unreadable app snapshot: {e}", logging.WARNING)
+        return False
+    _scan_state = state
+    installed_apps_index = AppIndex(apps)
+    installed_apps_cache = apps
+    apps_ready.set()
+    return True
+
+def save_apps_snapshot(state, path=APPS_SNAPSHOT_FILE):
+    """Write the scan state atomically (temp file + rename)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
 
-threading.Thread(target=update_installed_apps_cache, daemon=True).start()
+def update_installed_apps_cache():
+    """Refresh the catalog incrementally and persist it if anything changed."""
+    global installed_apps_cache, installed_apps_index, _scan_state
+    with _scan_lock:
+        try:
+            directories, recursive = app_directories()
+            apps, state = scan_app_directories(directories, recursive, _scan_state)
+            if state != _scan_state:
+                installed_apps_index = AppIndex(apps)
+                installed_apps_cache = apps
+                _scan_state = state
+                try:
+                    save_apps_snapshot(state)
+                except OSError as e:
+                    log(f"[PC Control] Could not save the app snapshot: {e}", logging.WARNING)
+        except Exception as e:
+            log(f"[PC Control] App scan failed: {e}", logging.ERROR)
+        finally:
+            apps_ready.set()   # even a failed scan must not leave find_app waiting
+    log(f"[PC Control] Found {len(installed_apps_cache)} applications.")
+
+def start_app_catalog():
+    """
+    Load the saved catalog and start a background rescan (once).
+    Called by main after the greeting, or by the first find_app otherwise.
+    """
+    global _catalog_started
+    with _scan_lock:
+        if _catalog_started:
+            return
+        _catalog_started = True
+    load_apps_snapshot()
+    threading.Thread(target=update_installed_apps_cache, daemon=True).start()
 
 def find_app(query):
-    if not installed_apps_cache:
-        update_installed_apps_cache()
-    query = query.lower().strip()
-    if query in installed_apps_cache:
-        return installed_apps_cache.get(query)
-    app_names = list(installed_apps_cache.keys())
-    matches = difflib.get_close_matches(query, app_names, n=1, cutoff=0.8)
-    return installed_apps_cache.get(matches[0]) if matches else None
+    # Wait for the saved snapshot or the background scan instead of scanning again.
+    start_app_catalog()
+    if not apps_ready.wait(APP_CATALOG_TIMEOUT):
+        log("[PC Control] App catalog not ready, looking on PATH instead.", logging.WARNING)
+        return shutil.which(query)
+    return installed_apps_index.lookup(query, cutoff=0.8)
 
 def open_app(app_query):
     app_query = app_query.lower().strip()
@@ -67,7 +176,7 @@ def open_app(app_query):
     }
     for key, func in special_commands.items():
         if key in app_query:
-            print(f"[PC Control] Executing special command for '{key}'.")
+            log(f"[PC Control] Executing special command for '{key}'.")
             func()
             return key
     
@@ -75,7 +184,7 @@ def open_app(app_query):
     path = find_app(app_query)
     if path:
         system = platform.system()
-        print(f"[PC Control] Opening application: {path}")
+        log(f"[PC Control] Opening application: {path}")
         try:
             if system == "Windows":
                 os.system(f'start "" "{path}"')
@@ -84,9 +193,9 @@ def open_app(app_query):
             else:
                 subprocess.Popen([path])
         except Exception as e:
-            print(f"[PC Control] Error opening app: {e}")
+            log(f"[PC Control] Error opening app: {e}", logging.ERROR)
     else:
-        print(f"[PC Control] No application found matching '{app_query}'.")
+        log(f"[PC Control] No application found matching '{app_query}'.", logging.WARNING)
 
 
 
@@ -104,44 +213,38 @@ def close_app(app_query):
 
     for key, func in special_commands.items():
         if key in app_query:
-            print(f"[PC Control] Closing built-in process for '{key}'.")
+            log(f"[PC Control] Closing built-in process for '{key}'.")
             func()
             return
 
     # Otherwise, perform fuzzy search in running processes
-    running_processes = [proc.info['name'] for proc in psutil.process_iter(attrs=['name'])]
-    best_match = difflib.get_close_matches(app_query, [p.lower() for p in running_processes], n=1, cutoff=0.6)
+    process_table.snapshot(max_age=2)
+    best_match = difflib.get_close_matches(app_query, process_table.names(), n=1, cutoff=0.6)
 
     if best_match:
         process_name = best_match[0]
-        print(f"[PC Control] Closing application: {process_name}")
+        log(f"[PC Control] Closing application: {process_name}")
         try:
             if platform.system() == "Windows":
                 os.system(f"taskkill /f /im {process_name}")
             else:
                 os.system(f"pkill -f {process_name}")
         except Exception as e:
-            print(f"[PC Control] Error closing app: {e}")
+            log(f"[PC Control] Error closing app: {e}", logging.ERROR)
     else:
-        print(f"[PC Control] No running process found matching '{app_query}'.")
+        log(f"[PC Control] No running process found matching '{app_query}'.", logging.WARNING)
 
 def list_processes():
-    processes = []
-    for proc in psutil.process_iter(attrs=['pid', 'name']):
-        try:
-            processes.append(proc.info)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-    return processes
+    return [{"pid": info.pid, "name": info.name} for info in process_table.snapshot(max_age=2).values()]
 
 def kill_process(app_query):
-    for proc in psutil.process_iter(attrs=['pid', 'name']):
-        try:
-            if app_query.lower() in proc.info['name'].lower():
-                proc.kill()
-                print(f"[PC Control] Killed process: {proc.info}")
+    app_query = app_query.lower()
+    for info in process_table.snapshot(max_age=2).values():
+        if app_query in info.name.lower():
+            try:
+                psutil.Process(info.pid).kill()
+                log(f"[PC Control] Killed process: {info.name} (PID: {info.pid})")
                 return
-        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-            print(f"[PC Control] Error killing process: {e}")
-    print(f"[PC Control] No matching process found to kill: '{app_query}'")
-
+            except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+                log(f"[PC Control] Error killing process: {e}", logging.ERROR)
+    log(f"[PC Control] No matching process found to kill: '{app_query}'", logging.WARNING)
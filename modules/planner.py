@@ -0,0 +1,107 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.intent_router import CHAT, CLOSE_APP, EXIT, OPEN_APP, RECALL, REMEMBER, REMINDER, SEARCH
+from utils.logger import incr, log, span
+
+def resources(intent):
+    """What an action touches; two actions sharing a resource run in plan order."""
+    if intent.name in (OPEN_APP, CLOSE_APP):
+        return {("app", intent.slots["app"])}
+    if intent.name in (REMEMBER, RECALL):
+        return {("memory", intent.slots.get("category"))}
+    if intent.name == REMINDER:
+        return {("reminders",)}
+    if intent.name == SEARCH:
+        return {("browser",)}   # one pooled browser window
+    if intent.name == CHAT:
+        return {("chat",)}      # one conversation, in order
+    return set()
+
+def schedule(actions, after_then=None):
+    """
+    Group a plan's actions into waves. Every action runs in the first wave
+    after all of its dependencies: earlier actions sharing a resource with it,
+    everything before a "then", and, for exit, everything at all. The actions
+    of one wave are independent of each other. Returns lists of indexes.
+    """
+    after_then = after_then or (False,) * len(actions)
+    levels = []
+    barrier = 0   # level every action after a "then" must exceed
+    for i, action in enumerate(actions):
+        if after_then[i] and levels:
+            barrier = max(levels) + 1
+        level = barrier
+        if action.name == EXIT:
+            level = max(levels, default=-1) + 1
+        touched = resources(action)
+        for j in range(i):
+            if touched & resources(actions[j]) or actions[j].name == EXIT:
+                level = max(level, levels[j] + 1)
+        levels.append(level)
+    waves = [[] for _ in range(max(levels, default=-1) + 1)]
+    for i, level in enumerate(levels):
+        waves[level].append(i)
+    return waves
+
+def merge_replies(replies):
+    """
+    One reply for a whole plan, in plan order. Text replies are joined; if a
+    streamed reply (an AI answer) is among them, the result streams too.
+    """
+    replies = [reply for reply in replies if reply]
+    if not replies:
+        return None
+    if all(isinstance(reply, str) for reply in replies):
+        return " ".join(reply.strip() for reply in replies)
+
+    def chunks():
+        for reply in replies:
+            if isinstance(reply, str):
+                yield reply.strip() + " "
+            else:
+                yield from reply
+    return chunks()
+
+class PlanRunner:
+    """
+    Runs the actions of a compound command on a bounded worker pool.
+    Waves run one after another; the actions within a wave run concurrently,
+    so "open chrome and spotify and remind me at 5 pm" costs about as long as
+    its slowest action instead of the sum of all three.
+    """
+
+    def __init__(self, workers=4):
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="plan")
+            return self._pool
+
+    def _run_one(self, execute, action):
+        try:
+            return execute(action)
+        except Exception as e:
+            log(f"[Planner] Error running '{action.text}': {e}", logging.ERROR)
+            return f"Sorry, I could not {action.text}."
+
+    def run(self, actions, execute, after_then=None):
+        """Execute every action with execute(intent); returns the merged reply."""
+        replies = [None] * len(actions)
+        with span("planner.run"):
+            for wave in schedule(actions, after_then):
+                if len(wave) == 1:
+                    replies[wave[0]] = self._run_one(execute, actions[wave[0]])
+                    continue
+                futures = {i: self._executor().submit(self._run_one, execute, actions[i]) for i in wave}
+                for i, future in futures.items():
+                    replies[i] = future.result()
+        incr("planner.actions", len(actions))
+        return merge_replies(replies)
+
+plan_runner = PlanRunner()
@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from utils.helpers import lazy_import
+from utils.logger import log
+
+psutil = lazy_import("psutil")
+
+ProcessInfo = namedtuple("ProcessInfo", ["pid", "name", "cpu_percent", "rss_mb"])
+
+class ProcessTable:
+    """
+    One shared snapshot of the process table, sampled on demand.
+    close_app, list_processes, kill_process and the unused-task monitor all read
+    from it instead of each walking psutil.process_iter on its own; a reader
+    only triggers a new scan when the snapshot is older than its `max_age`,
+    so nothing scans while nobody is asking.
+
+    psutil reports cpu_percent as the CPU used since the previous call on the same
+    Process object, so the first sample of every process is meaningless (0.0).
+    The table keeps the Process objects between samples and only reports a CPU
+    value once a process has been seen twice; until then cpu_percent is None.
+    """
+
+    def __init__(self, prime_interval=0.5):
+        self.prime_interval = prime_interval
+        self.samples = 0
+        self.sampled_at = None
+        self._procs = {}       # pid -> psutil.Process, kept for CPU deltas
+        self._snapshot = {}    # pid -> ProcessInfo
+        self._by_name = {}     # lowercase name -> [pids]
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Take a new sample of every process and notify listeners of changes."""
+        with self._lock:
+            procs, snapshot, by_name = {}, {}, {}
+            for proc in psutil.process_iter():
+                pid = proc.pid
+                known = self._procs.get(pid)
+                if known is not None and known == proc:  # same pid and create time, not a reused pid
+                    proc = known  # same object, so cpu_percent is a delta since the last sample
+                else:
+                    known = None
+                try:
+                    with proc.oneshot():
+                        cpu = proc.cpu_percent(None)
+                        rss_mb = proc.memory_info().rss / (1024 * 1024)
+                        name = proc.name()
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                procs[pid] = proc
+                snapshot[pid] = ProcessInfo(pid, name, cpu if known is not None else None, rss_mb)
+                by_name.setdefault(name.lower(), []).append(pid)
+
+            added = snapshot.keys() - self._snapshot.keys()
+            removed = self._snapshot.keys() - snapshot.keys()
+            self._procs, self._snapshot, self._by_name = procs, snapshot, by_name
+            self.samples += 1
+            self.sampled_at = time.monotonic()
+            listeners = list(self._listeners)
+
+        if added or removed:
+            for callback in listeners:
+                try:
+                    callback(added, removed)
+                except Exception as e:
+                    log(f"[Process Table] Listener error: {e}", logging.ERROR)
+        return snapshot
+
+    def snapshot(self, max_age=None, primed=False):
+        """
+        Return {pid: ProcessInfo}. Resamples if there is no sample yet or the
+        current one is older than `max_age` seconds. With primed=True, makes sure
+        a second sample exists so CPU percentages are real.
+        """
+        if self.sampled_at is None or (max_age is not None and time.monotonic() - self.sampled_at > max_age):
+            self.refresh()
+        if primed and self.samples < 2:
+            time.sleep(self.prime_interval)
+            self.refresh()
+        return self._snapshot
+
+    def pids_for(self, name):
+        """PIDs whose process name matches exactly (case-insensitive)."""
+        self.snapshot()
+        return list(self._by_name.get(name.lower(), ()))
+
+    def names(self):
+        """Lowercase names of all running processes."""
+        self.snapshot()
+        return list(self._by_name)
+
+    def subscribe(self, callback):
+        """Call callback(added_pids, removed_pids) whenever a sample changes the process set."""
+        with self._lock:
+            self._listeners.append(callback)
+
+process_table = ProcessTable()
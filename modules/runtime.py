@@ -0,0 +1,281 @@
+import asyncio
+import difflib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.logger import log
+
+STAGES = ("capture", "recognize", "route", "execute", "speak")
+_WORDS = re.compile(r"[\w']+")
+
+def _words(text):
+    return _WORDS.findall(text.lower())
+
+class StageStats:
+    """Per-stage counters and latency samples (seconds)."""
+
+    def __init__(self, name, history=200):
+        self.name = name
+        self.processed = 0
+        self.cancelled = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=history)
+
+    def record(self, seconds):
+        self.processed += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        return {
+            "processed": self.processed,
+            "cancelled": self.cancelled,
+            "mean_ms": self.total * 1e3 / self.processed if self.processed else 0.0,
+            "p95_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1e3 if recent else 0.0,
+            "max_ms": self.max * 1e3,
+        }
+
+class AssistantRuntime:
+    """
+    asyncio pipeline for the assistant loop:
+
+        capture -> recognize -> route -> execute -> speak
+
+    Each stage is a task reading from a bounded queue, so a slow stage applies
+    backpressure upstream instead of letting work pile up. The blocking
+    libraries (microphone, Google recognition, Gemini, TTS, PC control) run in
+    a thread pool, which lets the next command be captured and recognized while
+    the previous answer is still being generated or spoken.
+
+    With barge_in enabled, a newly routed command cancels the command still
+    being executed or spoken (via stop_speaking), so a new question interrupts
+    a long answer. An interrupt command ("stop", "cancel", "be quiet") only
+    does that and is not executed. Capture keeps running during playback, so
+    the microphone also hears the assistant's own voice: a phrase captured
+    while a reply is being spoken, or within `echo_tail` seconds after, is
+    dropped as an echo if at least `echo_match` of its words appear, in order,
+    in the text spoken so far.
+
+    The stage callables:
+      capture()          -> audio, or None when the source has ended
+      recognize(audio)   -> text or None
+      route(text)        -> Intent
+      execute(intent)    -> reply (string, iterable of chunks, or None)
+      speak(reply)       -> blocks until spoken or cancelled
+      is_exit(intent)    -> True to stop after this reply is spoken
+      is_interrupt(intent) -> True if it only asks to stop the current answer
+    """
+
+    def __init__(self, capture, recognize, route, execute, speak, stop_speaking=None,
+                 is_exit=lambda intent: False, is_interrupt=lambda intent: False, queue_size=2, workers=4,
+                 barge_in=True, echo_tail=1.0, echo_match=0.6):
+        self.capture = capture
+        self.recognize = recognize
+        self.route = route
+        self.execute = execute
+        self.speak = speak
+        self.stop_speaking = stop_speaking
+        self.is_exit = is_exit
+        self.is_interrupt = is_interrupt
+        self.queue_size = queue_size
+        self.barge_in = barge_in
+        self.echo_tail = echo_tail
+        self.echo_match = echo_match
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.end_to_end = StageStats("end_to_end")
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assistant")
+        self._queues = {}
+        self._current = None   # asyncio.Task running execute+speak for the active command
+        self._done = None
+        self._speak_started = None   # perf_counter() when the latest reply started playing
+        self._spoke_until = None     # ... and when it finished (None while it is playing)
+        self._spoken = []            # the latest reply's text chunks, as handed to speak()
+        self.echoes_dropped = 0
+
+    async def _blocking(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _timed(self, stage, fn, *args):
+        start = time.perf_counter()
+        result = await self._blocking(fn, *args)
+        self.stats[stage].record(time.perf_counter() - start)
+        return result
+
+    # ------------------------------
+    # Stages
+    # ------------------------------
+    def _in_daemon_thread(self, fn):
+        """
+        Run fn on a daemon thread. Capture blocks on the microphone indefinitely,
+        so it must not hold a pool thread that would keep the process alive at exit.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def settle(setter, value):
+            if not future.done():
+                setter(value)
+
+        def run():
+            try:
+                result = fn()
+            except Exception as e:
+                outcome = (future.set_exception, e)
+            else:
+                outcome = (future.set_result, result)
+            try:
+                loop.call_soon_threadsafe(settle, *outcome)
+            except RuntimeError:
+                pass  # the loop has already shut down
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    async def _capture_stage(self):
+        while True:
+            start = time.perf_counter()
+            audio = await self._in_daemon_thread(self.capture)
+            self.stats["capture"].record(time.perf_counter() - start)
+            if audio is None:
+                await self._queues["recognize"].put(None)
+                return
+            await self._queues["recognize"].put((audio, time.perf_counter()))
+
+    async def _recognize_stage(self):
+        while True:
+            item = await self._queues["recognize"].get()
+            if item is None:
+                await self._queues["route"].put(None)
+                return
+            audio, captured_at = item
+            text = await self._timed("recognize", self.recognize, audio)
+            if text:
+                await self._queues["route"].put((text, captured_at))
+
+    async def _route_stage(self):
+        while True:
+            item = await self._queues["route"].get()
+            if item is None:
+                await self._queues["execute"].put(None)
+                return
+            text, captured_at = item
+            start = time.perf_counter()
+            intent = self.route(text)
+            self.stats["route"].record(time.perf_counter() - start)
+            if self.is_interrupt(intent):
+                self.interrupt()
+                continue
+            if self._is_echo(text, captured_at):
+                self.echoes_dropped += 1   # the assistant hearing its own answer
+                continue
+            if self.barge_in:
+                self.interrupt()
+            await self._queues["execute"].put((intent, captured_at))
+
+    async def _execute_stage(self):
+        while True:
+            item = await self._queues["execute"].get()
+            if item is None:
+                if self._current is not None:
+                    await asyncio.gather(self._current, return_exceptions=True)
+                self._done.set()
+                return
+            intent, captured_at = item
+            self._current = asyncio.create_task(self._run_command(intent, captured_at))
+            await asyncio.gather(self._current, return_exceptions=True)
+
+    async def _run_command(self, intent, captured_at):
+        try:
+            reply = await self._timed("execute", self.execute, intent)
+            if reply:
+                self.end_to_end.record(time.perf_counter() - captured_at)
+                self._speak_started, self._spoke_until = time.perf_counter(), None
+                try:
+                    await self._timed("speak", self.speak, self._recording(reply))
+                finally:
+                    self._spoke_until = time.perf_counter()
+        except asyncio.CancelledError:
+            self.stats["execute"].cancelled += 1
+            raise
+        except Exception as e:
+            log(f"[Runtime] Error handling '{intent}': {e}", logging.ERROR)
+        if self.is_exit(intent):
+            self._done.set()
+
+    def _heard_during_playback(self, captured_at):
+        """True if a phrase whose capture ended at `captured_at` overlapped the latest reply's playback."""
+        if self._speak_started is None or captured_at < self._speak_started:
+            return False
+        return self._spoke_until is None or captured_at <= self._spoke_until + self.echo_tail
+
+    def _recording(self, reply):
+        """Pass a reply through to speak(), keeping the text that has been handed over for the echo check."""
+        self._spoken = spoken = []
+        if isinstance(reply, str):
+            spoken.append(reply)
+            return reply
+
+        def chunks():
+            for chunk in reply:
+                spoken.append(chunk)
+                yield chunk
+        return chunks()
+
+    def _is_echo(self, text, captured_at):
+        """True if a phrase heard during (or just after) playback repeats the reply being spoken."""
+        if not self._heard_during_playback(captured_at):
+            return False
+        heard = _words(text)
+        if not heard:
+            return False
+        matcher = difflib.SequenceMatcher(None, heard, _words(" ".join(self._spoken)), autojunk=False)
+        return sum(block.size for block in matcher.get_matching_blocks()) >= self.echo_match * len(heard)
+
+    def interrupt(self):
+        """Cancel the command currently executing or speaking (barge-in)."""
+        if self._current is not None and not self._current.done():
+            self._current.cancel()
+            if self.stop_speaking is not None:
+                self.stop_speaking()
+
+    # ------------------------------
+    # Lifecycle and Metrics
+    # ------------------------------
+    async def run(self, greeting=None, after_greeting=None):
+        """
+        Run the pipeline until an exit command is handled or the audio source ends.
+        after_greeting, if given, is started on a daemon thread once the greeting
+        has been spoken (e.g. to pre-load libraries while the user starts talking).
+        """
+        self._done = asyncio.Event()
+        self._queues = {name: asyncio.Queue(maxsize=self.queue_size) for name in ("recognize", "route", "execute")}
+        if greeting:
+            await self._blocking(self.speak, greeting)
+        if after_greeting is not None:
+            threading.Thread(target=after_greeting, daemon=True).start()
+        tasks = [asyncio.create_task(stage()) for stage in (
+            self._capture_stage, self._recognize_stage, self._route_stage, self._execute_stage)]
+        await self._done.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self):
+        """
+        Queue depths plus per-stage latency summaries. "end_to_end" runs from the
+        end of capture to the reply being ready to speak.
+        """
+        result = {name: stats.summary() for name, stats in self.stats.items()}
+        for name, q in self._queues.items():
+            result[name]["queue_depth"] = q.qsize()
+        result["end_to_end"] = self.end_to_end.summary()
+        result["route"]["echoes_dropped"] = self.echoes_dropped
+        return result
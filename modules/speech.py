@@ -1,59 +1,433 @@
-import speech_recognition as sr
-import pyttsx3
-from deep_translator import GoogleTranslator  
-from langdetect import detect
+from modules.gateway import CircuitOpen, GatewayError, gateway
+from modules.language import detect_language, transliterate_hindi_to_roman
+from modules.vad import VoiceActivityDetector
+from utils.helpers import lazy_import
+from utils.logger import log, span
+import logging
+import queue
+import re
 import threading
+import time
+from collections import deque
 
-recognizer = sr.Recognizer()
-tts = pyttsx3.init()
+sr = lazy_import("speech_recognition")
+pyttsx3 = lazy_import("pyttsx3")
 
-def transliterate_hindi_to_roman(hindi_text):
-    """Convert Hindi (Devanagari) text to Roman script using translation (as a workaround)."""
-    return GoogleTranslator(source="auto", target="en").translate(hindi_text)
+_recognizer = None
+
+def get_recognizer():
+    """The shared Recognizer, created on first use."""
+    global _recognizer
+    if _recognizer is None:
+        _recognizer = sr.Recognizer()
+        _recognizer.operation_timeout = gateway.service("speech").timeout   # bound the HTTP request itself too
+    return _recognizer
+
+def recognize_phrase(audio):
+    """
+    Recognize one captured phrase, through the speech service's gateway
+    (timeout, concurrency limit, circuit breaker).
+    Returns the recognized text (translated to Romanized Hindi if needed), or None.
+    While the service's circuit is open, phrases are dropped immediately.
+    """
+    try:
+        with span("speech.recognize"):
+            text = gateway.call("speech", get_recognizer().recognize_google, audio, language="en-IN",
+                                passthrough=(sr.UnknownValueError,)).strip()
+        if text:
+            log(f"📝 Speech recognized: {text}")
+            detected_lang = detect_language(text)
+            log(f"🌍 Detected language: {detected_lang}")
+            if detected_lang == "hi":
+                romanized_text = transliterate_hindi_to_roman(text)
+                log(f"🔄 Transliterated Hindi Text: {romanized_text}")
+                return romanized_text
+            return text
+        log("⚠️ No text detected, retrying...", logging.WARNING)
+    except sr.UnknownValueError:
+        log("❌ Could not understand speech, retrying...", logging.WARNING)
+    except CircuitOpen:
+        log("⚠️ Speech recognition service is unavailable, skipping phrase.", logging.WARNING)
+    except (sr.RequestError, GatewayError):
+        log("⚠️ Speech recognition service is unavailable, retrying...", logging.WARNING)
+    except Exception as e:
+        log(f"🔥 Error: {str(e)}, retrying...", logging.ERROR)
+    return None
+
+# ------------------------------
+# Speech Input Pipeline
+# ------------------------------
+class Listener:
+    """
+    Keeps one audio source open for the whole session.
+    A capture thread records phrases back to back and a recognition thread
+    turns them into text, so the next phrase is being captured while the
+    previous one is recognized.
+
+    With `vad` (the default) the capture thread reads raw frames from the
+    source into a VoiceActivityDetector and queues only its trimmed, voiced
+    segments, so silence, chatter below the noise floor and short noise bursts
+    never cost a recognize_google round trip; `vad_options` are passed to the
+    detector. Without it, the recognizer's own listen() segments the audio,
+    with its energy threshold calibrated once when the source opens and then
+    adapted on the silence between phrases (dynamic_energy_threshold).
+
+    `source_factory` defaults to the microphone; pass e.g.
+    lambda: sr.AudioFile("commands.wav") or lambda: WavSource("commands.wav")
+    to run offline. A file source ends the
+    session when it is exhausted, after which listen() returns None.
+    """
+
+    def __init__(self, source_factory=None, recognize=recognize_phrase,
+                 calibration_seconds=1, phrase_time_limit=10, max_pending=4, vad=True, vad_options=None):
+        self.source_factory = source_factory or (lambda: sr.Microphone())
+        self.recognize = recognize
+        self.calibration_seconds = calibration_seconds
+        self.phrase_time_limit = phrase_time_limit
+        self.use_vad = vad
+        self.vad_options = vad_options or {}
+        self.vad = None
+        self._audio_queue = queue.Queue(maxsize=max_pending)
+        self._text_queue = queue.Queue()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.phrases_captured = 0
+        self.phrases_recognized = 0
+
+    def start(self, recognize=True):
+        """
+        Open the source and start the capture thread, plus the recognition
+        thread unless the caller recognizes phrases itself (once).
+        """
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._capture_loop, daemon=True).start()
+        if recognize:
+            threading.Thread(target=self._recognize_loop, daemon=True).start()
+
+    def _capture_loop(self):
+        try:
+            with self.source_factory() as source:
+                if self.use_vad:
+                    self._capture_voiced(source)
+                else:
+                    self._capture_phrases(source)
+        except Exception as e:
+            log(f"🔥 Error: {str(e)}, audio capture stopped.", logging.ERROR)
+        self._audio_queue.put(None)
+
+    def _capture_phrases(self, source):
+        """Queue the phrases segmented by the recognizer's own listen()."""
+        recognizer = get_recognizer()
+        recognizer.dynamic_energy_threshold = True
+        recognizer.adjust_for_ambient_noise(source, duration=self.calibration_seconds)
+        log(f"🎚️ Energy threshold calibrated: {recognizer.energy_threshold:.0f}")
+        while True:
+            log("🎤 Listening for speech...")
+            try:
+                audio = recognizer.listen(source, phrase_time_limit=self.phrase_time_limit)
+            except sr.WaitTimeoutError:
+                continue
+            if not audio.frame_data:
+                break  # file source exhausted
+            log("✅ Audio captured.")
+            self.phrases_captured += 1
+            self._audio_queue.put(audio)
+
+    def _capture_voiced(self, source):
+        """Read raw frames from the source and queue the voiced segments found by the VAD."""
+        options = {"calibration_ms": self.calibration_seconds * 1000,
+                   "max_phrase_seconds": self.phrase_time_limit, **self.vad_options}
+        self.vad = VoiceActivityDetector(source.SAMPLE_RATE, source.SAMPLE_WIDTH, **options)
+        log("🎤 Listening for speech...")
+        while True:
+            data = source.stream.read(source.CHUNK)
+            segments = self.vad.feed(data) if data else self.vad.flush()
+            for segment in segments:
+                log(f"✅ Audio captured ({segment.end - segment.start:.1f} s of speech).")
+                self.phrases_captured += 1
+                self._audio_queue.put(sr.AudioData(segment.pcm, source.SAMPLE_RATE, 2))
+            if not data:
+                return  # source exhausted
+
+    def _recognize_loop(self):
+        while True:
+            audio = self._audio_queue.get()
+            if audio is None:
+                self._text_queue.put(None)
+                return
+            text = self.recognize(audio)
+            if text:
+                self.phrases_recognized += 1
+                self._text_queue.put(text)
+
+    def listen(self, timeout=None):
+        """
+        Return the next recognized phrase, blocking until one is available.
+        Returns None when the source has ended (or on timeout).
+        """
+        self.start()
+        try:
+            text = self._text_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if text is None:
+            self._text_queue.put(None)  # keep the end-of-session marker for later callers
+        return text
+
+    def next_audio(self, timeout=None):
+        """
+        Return the next captured phrase without recognizing it, for pipelines
+        that run recognition as their own stage. Returns None when the source
+        has ended (or on timeout). Do not mix with listen() on the same Listener.
+        """
+        self.start(recognize=False)
+        try:
+            audio = self._audio_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if audio is None:
+            self._audio_queue.put(None)
+        return audio
+
+listener = Listener()
 
 def listen():
     """
-    Continuously listen for speech until a valid phrase is recognized.
+    Return the next recognized phrase from the session listener.
     Uses phrase_time_limit to allow for longer phrases.
     Returns the recognized text (translated to Romanized Hindi if needed).
     """
-    while True:
-        with sr.Microphone() as source:
-            print("\n🎤 Listening for speech...")
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = recognizer.listen(source, phrase_time_limit=10)
-            print("✅ Audio captured.")
-        try:
-            text = recognizer.recognize_google(audio, language="en-IN").strip()
-            if text:
-                print(f"📝 Speech recognized: {text}")
-                detected_lang = detect(text)
-                print(f"🌍 Detected language: {detected_lang}")
-                if detected_lang == "hi":
-                    romanized_text = transliterate_hindi_to_roman(text)
-                    print(f"🔄 Transliterated Hindi Text: {romanized_text}")
-                    return romanized_text
-                return text
-            else:
-                print("⚠️ No text detected, retrying...")
-        except sr.UnknownValueError:
-            print("❌ Could not understand speech, retrying...")
-        except sr.RequestError:
-            print("⚠️ Speech recognition service is unavailable, retrying...")
-        except Exception as e:
-            print(f"🔥 Error: {str(e)}, retrying...")
+    return listener.listen()
+
+# ------------------------------
+# Speech Output Pipeline
+# ------------------------------
+SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+
+def split_sentences(text):
+    """Split text into sentences on ., !, ? and the Devanagari danda."""
+    return [part for part in SENTENCE_END.split(text.strip()) if part]
+
+def prepare_for_speech(text):
+    """Transliterate a sentence to Roman script if it is Hindi; otherwise return it unchanged."""
+    if detect_language(text) == "hi":
+        return transliterate_hindi_to_roman(text)
+    return text
+
+class Utterance:
+    """Handle for one queued speech request; wait() blocks until it is spoken or cancelled."""
+
+    def __init__(self):
+        self.enqueued_at = time.perf_counter()
+        self.first_audio_at = None
+        self.cancelled = False
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def time_to_first_audio(self):
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.enqueued_at
+
+class SpeechOutput:
+    """
+    Two-stage speech pipeline.
+    A prepare thread splits text into sentences and runs language detection and
+    transliteration on each; a speaker thread, which owns the TTS engine, speaks
+    sentences as soon as they are ready. The first sentence is therefore heard
+    while later ones are still being prepared, and cancel() drops everything
+    queued and stops the current sentence (barge-in).
+    """
+
+    def __init__(self, engine_factory=None, prepare=prepare_for_speech, history=100):
+        self.engine_factory = engine_factory or (lambda: pyttsx3.init())
+        self.prepare = prepare
+        self._engine = None
+        self._text_queue = queue.Queue()
+        self._audio_queue = queue.Queue()
+        self._active = set()
+        self._lock = threading.Lock()
+        self._ttfa = deque(maxlen=history)
+        self.spoken = 0
+        self.cancelled = 0
+        self._started = False
+
+    def _start(self):
+        """Start the worker threads on first use, so importing this module opens no TTS engine."""
+        threading.Thread(target=self._prepare_loop, daemon=True).start()
+        threading.Thread(target=self._speak_loop, daemon=True).start()
+        self._started = True
+
+    def say(self, source):
+        """
+        Queue text (a string, or an iterable of text chunks such as a streamed AI
+        reply) for speaking. Returns an Utterance handle without blocking.
+        """
+        utterance = Utterance()
+        with self._lock:
+            if not self._started:
+                self._start()
+            self._active.add(utterance)
+        self._text_queue.put((utterance, source))
+        return utterance
+
+    def cancel(self):
+        """Barge-in: drop every queued utterance and stop the one being spoken."""
+        with self._lock:
+            for utterance in self._active:
+                utterance.cancelled = True
+                utterance._done.set()
+            self.cancelled += len(self._active)
+            self._active.clear()
+        if self._engine is not None:
+            try:
+                self._engine.stop()
+            except Exception:
+                pass
+
+    def _sentences(self, source):
+        """Yield complete sentences from a string or from a stream of chunks."""
+        if isinstance(source, str):
+            yield from split_sentences(source)
+            return
+        buffer = ""
+        for chunk in source:
+            parts = SENTENCE_END.split(buffer + chunk)
+            buffer = parts.pop()  # the last piece may still be mid-sentence
+            yield from (part.strip() for part in parts if part.strip())
+        if buffer.strip():
+            yield buffer.strip()
+
+    def _prepare_loop(self):
+        while True:
+            utterance, source = self._text_queue.get()
+            try:
+                for sentence in self._sentences(source):
+                    if utterance.cancelled:
+                        break
+                    try:
+                        with span("tts.prepare"):
+                            sentence = self.prepare(sentence)
+                    except Exception as e:
+                        log(f"🔥 Error preparing speech: {str(e)}", logging.ERROR)
+                    self._audio_queue.put((utterance, sentence))
+            except Exception as e:
+                log(f"🔥 Error in speak: {str(e)}", logging.ERROR)
+            self._audio_queue.put((utterance, None))
+
+    def _speak_loop(self):
+        self._engine = self.engine_factory()
+        while True:
+            utterance, sentence = self._audio_queue.get()
+            if sentence is None:
+                with self._lock:
+                    self._active.discard(utterance)
+                if utterance.first_audio_at is not None and not utterance.cancelled:
+                    self.spoken += 1
+                    log("✅ Speech output completed.")
+                utterance._done.set()
+                continue
+            if utterance.cancelled:
+                continue
+            if utterance.first_audio_at is None:
+                utterance.first_audio_at = time.perf_counter()
+                self._ttfa.append(utterance.time_to_first_audio)
+            log(f"🗣️ AI is speaking: {sentence}")
+            try:
+                with span("tts.say"):
+                    self._engine.say(sentence)
+                    self._engine.runAndWait()
+            except Exception as e:
+                log(f"🔥 Error in speak: {str(e)}", logging.ERROR)
+
+    def metrics(self):
+        """Time-to-first-audio statistics (seconds) over the recent utterances."""
+        samples = sorted(self._ttfa)
+        if not samples:
+            return {"utterances": self.spoken, "cancelled": self.cancelled}
+        return {
+            "utterances": self.spoken,
+            "cancelled": self.cancelled,
+            "ttfa_last": self._ttfa[-1],
+            "ttfa_mean": sum(samples) / len(samples),
+            "ttfa_p50": samples[len(samples) // 2],
+            "ttfa_p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        }
+
+class NullSpeechOutput:
+    """Speech sink that discards everything (headless runs and load tests)."""
+
+    def __init__(self):
+        self.spoken = 0
+
+    def say(self, source):
+        # Consume streamed replies so the work behind them still happens.
+        text = source if isinstance(source, str) else "".join(source)
+        self.spoken += 1
+        self._record(text)
+        utterance = Utterance()
+        utterance.first_audio_at = time.perf_counter()
+        utterance._done.set()
+        return utterance
+
+    def _record(self, text):
+        pass
+
+    def drain(self):
+        return []
+
+    def cancel(self):
+        pass
+
+    def metrics(self):
+        return {"utterances": self.spoken, "cancelled": 0}
+
+class CapturedSpeechOutput(NullSpeechOutput):
+    """Speech sink that records what would have been spoken, optionally echoing it."""
+
+    def __init__(self, echo=None):
+        super().__init__()
+        self.echo = echo
+        self._captured = []
+        self._lock = threading.Lock()
+
+    def _record(self, text):
+        with self._lock:
+            self._captured.append(text)
+        if self.echo:
+            self.echo(text)
+
+    def drain(self):
+        """Return and clear everything captured so far."""
+        with self._lock:
+            captured, self._captured = self._captured, []
+        return captured
+
+speech_output = SpeechOutput()
+
+def use_speech_output(output):
+    """Swap the speech sink used by speak() (e.g. NullSpeechOutput for headless runs)."""
+    global speech_output
+    speech_output = output
+
+def speak_async(text):
+    """Queue text for speaking and return immediately with an Utterance handle."""
+    return speech_output.say(text)
+
+def stop_speaking():
+    """Interrupt the current speech and drop anything still queued."""
+    speech_output.cancel()
 
 def speak(text):
     """
-    Convert text to speech.
-    If the text is in Hindi (detected by langdetect), it is transliterated to Romanized Hindi.
+    Convert text to speech and wait until it has been spoken.
+    Hindi sentences (by script, or langdetect when unclear) are transliterated to Romanized Hindi.
+    Accepts a string or an iterable of streamed text chunks.
     """
-    try:
-        if detect(text) == "hi":
-            text = transliterate_hindi_to_roman(text)
-        print(f"🗣️ AI is speaking: {text}")
-        tts.say(text)
-        tts.runAndWait()
-        print("✅ Speech output completed.")
-    except Exception as e:
-        print(f"🔥 Error in speak: {str(e)}")
+    speak_async(text).wait()
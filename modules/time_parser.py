@@ -0,0 +1,266 @@
+import re
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# ------------------------------
+# Vocabulary
+# ------------------------------
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = ["january", "february", "march", "april", "may", "june",
+          "july", "august", "september", "october", "november", "december"]
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+                "seven": 7, "eight": 8, "nine": 9, "ten": 10, "fifteen": 15, "twenty": 20,
+                "thirty": 30, "forty five": 45, "other": 2}
+UNIT_SECONDS = {"se": 1, "mi": 60, "ho": 3600, "hr": 3600, "da": 86400, "we": 604800}   # by a unit's first two letters
+# Hour for a time of day named by a word; "tonight" alone means 9 pm.
+PART_HOURS = {"morning": 9, "afternoon": 15, "evening": 18, "night": 21, "noon": 12, "midnight": 0}
+DEFAULT_HOUR = 9   # "tomorrow", "on friday", "every day" without a time
+
+WEEKDAY_NUMBERS = {name: i for i, name in enumerate(WEEKDAYS)}
+MONTH_NUMBERS = {name[:3]: i for i, name in enumerate(MONTHS, 1)}
+
+_WEEKDAY = r"(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)s?"
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+_NUMBER = r"\d+|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+_UNIT = r"(?:seconds?|secs?|minutes?|mins?|hours?|hrs?|days?|weeks?)"
+_PART = r"(?:in\s+the\s+)?(?P<part{s}>morning|afternoon|evening|night|noon|midnight)"
+
+# ------------------------------
+# Grammar
+# ------------------------------
+# Sub-patterns appear in more than one form, so their group names get a
+# per-form suffix; the wrapping group of each form ("F_in", "F_every", ...)
+# closes last, so match.lastgroup says which form matched.
+def _clock(s):
+    return (r"(?:at\s+)?(?:(?P<hour{s}>\d{{1,2}})(?::(?P<minute{s}>\d{{2}}))?"
+            r"(?:\s*(?P<mer{s}>[ap])\.?\s?m\.?)?(?:\s+o'?clock)?|" + _PART + ")").format(s=s)
+
+def _day(s):
+    return (r"(?:(?P<rel{s}>today|tonight|tomorrow|(?:the\s+)?day\s+after\s+tomorrow)"
+            r"|(?:on\s+)?(?:(?P<next{s}>next|this)\s+)?(?P<wday{s}>" + _WEEKDAY + ")"
+            r"|(?:on\s+)?(?:the\s+)?(?P<mday{s}>\d{{1,2}})(?:st|nd|rd|th)?(?:\s+of)?\s+(?P<month{s}>" + _MONTH + ")"
+            r"|(?:on\s+)?(?P<month2{s}>" + _MONTH + r")\s+(?P<mday2{s}>\d{{1,2}})(?:st|nd|rd|th)?)").format(s=s)
+
+TIME_PATTERN = (
+    r"(?P<F_in>(?:in|after)\s+(?:(?P<half>half\s+an?)|(?P<count>" + _NUMBER + r"))\s+(?P<unit>" + _UNIT + "))"
+    r"|(?P<F_every>(?:every\s+(?:(?P<ecount>" + _NUMBER + r")\s+)?(?P<eunit>minute|hour|day|week)s?"
+    r"|(?P<ealias>daily|hourly|weekly)"
+    r"|every\s+(?P<edays>weekdays?|weekends?|" + _WEEKDAY + r"(?:(?:\s*,\s*(?:and\s+)?|\s+and\s+)" + _WEEKDAY + ")*)"
+    r"|every\s+" + _PART.format(s="_ep") + r")(?:\s+" + _clock("_e") + ")?)"
+    r"|(?P<F_day>" + _day("_d") + r"(?:\s+" + _clock("_d") + ")?)"
+    r"|(?P<F_clock>" + _clock("_c") + r"(?:\s+" + _day("_c") + ")?)"
+)
+_PARSER = re.compile(r"(?:" + TIME_PATTERN + r")$")
+
+# The same grammar without named groups, for embedding in other patterns such
+# as the intent router's reminder rules.
+TIME_FRAGMENT = re.sub(r"\(\?P<\w+>", "(?:", TIME_PATTERN)
+# Words a time expression can start with when it trails a reminder's message
+# ("remind me to stretch at 5 pm"); a bare trailing number is part of the message.
+TIME_LEAD = (r"(?=(?:at|in|after|every|on|the|next|this|today|tonight|tomorrow|day|daily|hourly|weekly|noon|midnight|"
+             + _WEEKDAY + r")\b)")
+
+_WEEKDAY_WORD = re.compile(r"monday|tuesday|wednesday|thursday|friday|saturday|sunday")
+
+# ------------------------------
+# Recurrence
+# ------------------------------
+@dataclass(frozen=True)
+class Recurrence:
+    """
+    How a reminder repeats: every `interval` units ("minute", "hour", "day"
+    or "week"), or, for "week" with `weekdays` (0 = Monday), on those days.
+    Only the next occurrence is ever computed (next_after); occurrences()
+    yields them lazily.
+    """
+    unit: str
+    interval: int = 1
+    weekdays: tuple = ()
+
+    def step(self):
+        return timedelta(seconds=UNIT_SECONDS[self.unit[:2]] * self.interval)
+
+    def next_after(self, due, now=None):
+        """The first occurrence after `due`, and after `now` if given (missed runs are skipped)."""
+        now = max(due, now or due)
+        if self.weekdays:
+            day = due + timedelta(days=max(1, (now - due).days))
+            while day.weekday() not in self.weekdays or day <= now:
+                day += timedelta(days=1)
+            return day
+        step = self.step()
+        return due + step * ((now - due) // step + 1)
+
+    def occurrences(self, due):
+        """Yield `due` and every later occurrence, on demand."""
+        while True:
+            yield due
+            due = self.next_after(due)
+
+    def describe(self):
+        if self.weekdays == (0, 1, 2, 3, 4):
+            return "every weekday"
+        if self.weekdays == (5, 6):
+            return "every weekend"
+        if self.weekdays:
+            names = [WEEKDAYS[d].capitalize() for d in self.weekdays]
+            return "every " + (" and ".join(names) if len(names) < 3 else ", ".join(names[:-1]) + " and " + names[-1])
+        if self.interval == 1:
+            return f"every {self.unit}"
+        return f"every {self.interval} {self.unit}s"
+
+    def as_dict(self):
+        rule = {"unit": self.unit, "interval": self.interval}
+        if self.weekdays:
+            rule["weekdays"] = list(self.weekdays)
+        return rule
+
+    @classmethod
+    def from_dict(cls, rule):
+        return cls(rule["unit"], rule.get("interval", 1), tuple(rule.get("weekdays", ())))
+
+ParsedTime = namedtuple("ParsedTime", "due recurrence")
+
+# ------------------------------
+# Parsing
+# ------------------------------
+def _number(word):
+    return int(word) if word.isdigit() else NUMBER_WORDS[word]
+
+def _time_of_day(m, s, evening=False):
+    """(hour, minute) from a matched clock, or None if there is none. Raises ValueError if invalid."""
+    hour = m.group("hour" + s)
+    if hour is None:
+        part = m.group("part" + s)
+        return None if part is None else (PART_HOURS[part], 0)
+    hour, minute = int(hour), int(m.group("minute" + s) or 0)
+    meridiem = m.group("mer" + s)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(hour)
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    elif evening and hour < 12:
+        hour += 12
+    if hour > 23 or minute > 59:
+        raise ValueError(hour, minute)
+    return hour, minute
+
+def _date(m, s, now):
+    """(date, is-evening) from a matched day, or None if there is none. Raises ValueError if invalid."""
+    rel = m.group("rel" + s)
+    if rel is not None:
+        if rel == "tomorrow":
+            return now.date() + timedelta(days=1), False
+        if rel.endswith("tomorrow"):
+            return now.date() + timedelta(days=2), False
+        return now.date(), rel == "tonight"
+    weekday = m.group("wday" + s)
+    if weekday is not None:
+        ahead = (WEEKDAY_NUMBERS[weekday.rstrip("s")] - now.weekday()) % 7
+        if ahead == 0 and m.group("next" + s) == "next":
+            ahead = 7
+        return now.date() + timedelta(days=ahead), False
+    month, mday = m.group("month" + s), m.group("mday" + s)
+    if month is None:
+        month, mday = m.group("month2" + s), m.group("mday2" + s)
+        if month is None:
+            return None
+    date = now.date().replace(month=MONTH_NUMBERS[month[:3]], day=int(mday))
+    if date < now.date():
+        date = date.replace(year=date.year + 1)
+    return date, False
+
+def _at(date, clock, evening):
+    hour, minute = clock or ((21, 0) if evening else (DEFAULT_HOUR, 0))
+    return datetime(date.year, date.month, date.day, hour, minute)
+
+def _parse_in(m, now):
+    seconds = UNIT_SECONDS[m.group("unit")[:2]]
+    if m.group("half"):
+        return ParsedTime(now + timedelta(seconds=seconds / 2), None)
+    return ParsedTime(now + timedelta(seconds=seconds * _number(m.group("count"))), None)
+
+def _parse_every(m, now):
+    clock = _time_of_day(m, "_e")
+    alias, days, part = m.group("ealias"), m.group("edays"), m.group("part_ep")
+    if alias:
+        rule = Recurrence({"daily": "day", "hourly": "hour", "weekly": "week"}[alias])
+    elif days:
+        if days.startswith("weekday"):
+            weekdays = (0, 1, 2, 3, 4)
+        elif days.startswith("weekend"):
+            weekdays = (5, 6)
+        else:
+            weekdays = tuple(sorted({WEEKDAY_NUMBERS[day] for day in _WEEKDAY_WORD.findall(days)}))
+        rule = Recurrence("week", 1, weekdays)
+    elif part:
+        rule = Recurrence("day")
+        clock = clock or (PART_HOURS[part], 0)
+    else:
+        interval = _number(m.group("ecount") or "1")
+        if interval < 1:
+            raise ValueError(interval)   # "every 0 days" never advances
+        rule = Recurrence(m.group("eunit"), interval)
+
+    if rule.unit in ("minute", "hour"):
+        return ParsedTime(now + rule.step(), rule)
+    due = _at(now.date(), clock, False)
+    if rule.weekdays and due.weekday() not in rule.weekdays or due <= now:
+        due = rule.next_after(due, now) if rule.weekdays else due + timedelta(days=1)
+    return ParsedTime(due, rule)
+
+def _parse_dated(m, now, s):
+    day = _date(m, s, now)
+    evening = day[1] if day else False
+    clock = _time_of_day(m, s, evening)
+    if day is None:
+        due = _at(now.date(), clock, False)
+        if due <= now:
+            due += timedelta(days=1)    # a bare time means its next occurrence
+        return ParsedTime(due, None)
+    due = _at(day[0], clock, evening)
+    if m.group("wday" + s) and due <= now:
+        due += timedelta(days=7)        # "on monday at 9", said on Monday at 10
+    return ParsedTime(due, None)
+
+def parse(text, now=None):
+    """
+    Parse a spoken time expression in one pass of a precompiled grammar:
+      - a time of day: "5 pm", "10:52 p.m.", "22:52", "noon", "tonight at 9"
+      - relative: "in 20 minutes", "after an hour", "in half an hour"
+      - date-qualified: "tomorrow at 9", "at 5 pm on friday", "next monday
+        morning", "on march 5th at 8 am"
+      - recurring: "every monday at 8 am", "every weekday at 7",
+        "every 2 hours", "daily at 9", "every morning"
+    Returns ParsedTime(due, recurrence): the absolute due datetime of the
+    first occurrence, and a Recurrence or None. A time of day alone means
+    its next occurrence; hours without am/pm are on the 24-hour clock, except
+    after "tonight". Returns None if the text is not a valid time expression.
+    """
+    now = now or datetime.now()
+    m = _PARSER.match(text.strip().lower().rstrip("?.!, "))
+    if m is None:
+        return None
+    form = m.lastgroup
+    try:
+        if form == "F_in":
+            return _parse_in(m, now)
+        if form == "F_every":
+            return _parse_every(m, now)
+        return _parse_dated(m, now, "_d" if form == "F_day" else "_c")
+    except ValueError:
+        return None   # e.g. "25:99" or "february 30"
+
+def describe_due(due, now=None):
+    """Spoken form of a due time: "22:52", "tomorrow at 09:00", "Friday at 17:00", "March 05 at 08:00"."""
+    now = now or datetime.now()
+    days = (due.date() - now.date()).days
+    clock = due.strftime("%H:%M")
+    if days == 0:
+        return clock
+    if days == 1:
+        return f"tomorrow at {clock}"
+    if 1 < days < 7:
+        return f"{due.strftime('%A')} at {clock}"
+    return f"{due.strftime('%B %d')} at {clock}"
@@ -0,0 +1,311 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.helpers import lazy_import
+from utils.logger import incr, log
+
+psutil = lazy_import("psutil")
+
+class Timer:
+    """
+    Handle for one registered piece of background work.
+    Periodic timers have an `interval`; one-shot timers (call_at) have none and
+    stay registered, dormant, until reschedule() gives them a new deadline.
+    """
+
+    def __init__(self, service, name, callback, deadline, interval=None, slack=0.0,
+                 stretch=True, blocking=False):
+        self.service = service
+        self.name = name
+        self.callback = callback
+        self.deadline = deadline     # wall-clock timestamp, or None when dormant
+        self.interval = interval
+        self.slack = slack           # how late it may run so that it shares a wakeup
+        self.stretch = stretch       # lengthened in low-power mode
+        self.blocking = blocking     # may take seconds: run on a worker thread
+        self.running = False
+        self.cancelled = False
+        self.runs = 0
+
+    def reschedule(self, deadline):
+        """Move the next run to `deadline` (a timestamp), or make the timer dormant with None."""
+        self.service._update(self, deadline)
+
+    def cancel(self):
+        self.service._update(self, None, cancel=True)
+
+class TimerService:
+    """
+    One thread for all of the assistant's periodic and timed background work.
+
+    Everything that used to poll on its own thread registers here instead:
+    call_every() for periodic work (the unused-task monitor, which samples
+    processes on demand, and idle-user eviction) and call_at() for exact
+    deadlines (reminders). The thread sleeps until the earliest moment some
+    timer *must* run, its deadline plus its slack, and then runs every timer
+    that is due by then, so timers with nearby deadlines share one wakeup.
+    Callbacks run on the timer thread itself, so a wakeup costs one thread
+    switch; those registered with blocking=True (e.g. reminders, which speak,
+    and the process scans) run on a small worker pool instead so they never
+    hold up other deadlines. A timer is never run again
+    while its previous run is still going.
+
+    Low-power mode multiplies the interval of every stretchable timer by
+    `low_power_factor`. In "auto" mode (the default) it is on while the
+    machine runs on battery or the assistant has been idle (no note_activity()
+    call) for `idle_after` seconds; set_low_power(True/False) forces it.
+
+    stats() reports wakeups per minute and the process's own CPU use, overall
+    and while idle.
+    """
+
+    # While exact (wall-clock) deadlines are pending, sleep at most this long, so a
+    # suspended laptop, whose monotonic clock stops, re-checks the time soon after waking.
+    MAX_SLEEP = 60
+    POWER_CHECK = 60      # seconds between battery / idle checks, made on wakeups that happen anyway
+    WINDOW = 60           # seconds of history for the per-minute figures
+
+    def __init__(self, low_power_factor=4, idle_after=300, workers=2):
+        self.low_power_factor = low_power_factor
+        self.idle_after = idle_after
+        self.workers = workers
+        self.low_power = False
+        self._mode = "auto"
+        self._timers = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pool = None
+        self._sleep_until = float("-inf")     # when the sleeping timer thread wakes anyway
+        self._started_at = time.time()
+        self._last_activity = time.time()
+        self._power_checked = 0.0
+        self._wakes = deque()                 # wakeup times within WINDOW
+        self._cpu_samples = deque()           # (wall, process CPU, idle) within WINDOW
+        self._idle_cpu = self._idle_wall = 0.0
+        self._sample_cpu(self._started_at)
+        self.counts = {"wakeups": 0, "runs": 0, "shared_wakeups": 0}
+
+    # ------------------------------
+    # Registration
+    # ------------------------------
+    def call_every(self, interval, callback, name, slack=None, stretch=True, blocking=False, delay=None):
+        """
+        Run callback() every `interval` seconds, first after `delay` (default:
+        one interval). The run may slip by up to `slack` seconds (default 10% of
+        the interval, at most 5 s) to share a wakeup with another timer.
+        """
+        slack = min(interval * 0.1, 5.0) if slack is None else slack
+        first = time.time() + (interval if delay is None else delay)
+        return self._add(Timer(self, name, callback, first, interval, slack, stretch, blocking))
+
+    def call_at(self, deadline, callback, name, slack=0.0, blocking=False):
+        """Run callback() once at the timestamp `deadline` (None: dormant until rescheduled)."""
+        return self._add(Timer(self, name, callback, deadline, None, slack, False, blocking))
+
+    def _add(self, timer):
+        with self._cond:
+            self._timers.append(timer)
+            self._wake_if_earlier(timer)
+        self.start()
+        return timer
+
+    def _update(self, timer, deadline, cancel=False):
+        with self._cond:
+            timer.deadline = deadline
+            if cancel and not timer.cancelled:
+                timer.cancelled = True
+                self._timers.remove(timer)
+            self._wake_if_earlier(timer)
+
+    def _wake_if_earlier(self, timer):
+        """Wake the timer thread only if `timer` now has to run before it would wake anyway."""
+        if timer.deadline is not None and not timer.running and timer.deadline + timer.slack < self._sleep_until:
+            self._cond.notify()
+
+    # ------------------------------
+    # Power and Activity
+    # ------------------------------
+    def note_activity(self):
+        """Called when the user does something; leaves idle low-power mode at the next check."""
+        self._last_activity = time.time()
+        if self.low_power and self._mode == "auto":
+            with self._cond:
+                self._power_checked = 0.0
+                self._cond.notify()
+
+    def set_low_power(self, mode):
+        """True or False forces low-power mode on or off; "auto" follows battery and idleness."""
+        with self._cond:
+            self._mode = mode
+            self._power_checked = 0.0
+            self._cond.notify()
+
+    def on_battery(self):
+        try:
+            battery = psutil.sensors_battery()
+        except Exception:
+            return False
+        return battery is not None and not battery.power_plugged
+
+    def _check_power(self, now):
+        """Re-evaluate low-power mode (every POWER_CHECK seconds) and rescale periodic timers."""
+        if now - self._power_checked < self.POWER_CHECK:
+            return
+        self._power_checked = now
+        if self._mode == "auto":
+            low_power = now - self._last_activity >= self.idle_after or self.on_battery()
+        else:
+            low_power = bool(self._mode)
+        if low_power == self.low_power:
+            return
+        self.low_power = low_power
+        log(f"[Timers] Low-power mode {'on' if low_power else 'off'}.")
+        factor = self.low_power_factor if low_power else 1 / self.low_power_factor
+        for timer in self._timers:
+            if timer.interval and timer.stretch and timer.deadline is not None:
+                # Keep the time already waited; scale what is left of the interval.
+                timer.deadline = now + max(0.0, timer.deadline - now) * factor
+
+    def effective_interval(self, timer):
+        if self.low_power and timer.stretch:
+            return timer.interval * self.low_power_factor
+        return timer.interval
+
+    # ------------------------------
+    # Timer Thread
+    # ------------------------------
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, daemon=True, name="timers")
+                self._thread.start()
+
+    def _next_wake(self, now):
+        """
+        Seconds to sleep: until the earliest deadline plus slack. A timer still
+        running past its next deadline is left out; its completion wakes the thread.
+        """
+        wake, exact = None, False
+        for timer in self._timers:
+            if timer.deadline is None:
+                continue
+            latest = timer.deadline + timer.slack
+            if timer.running and latest <= now:
+                continue
+            wake = latest if wake is None else min(wake, latest)
+            exact = exact or timer.interval is None
+        if wake is None:
+            return None
+        timeout = max(0.0, wake - now)
+        return min(timeout, self.MAX_SLEEP) if exact else timeout
+
+    def _due(self, now):
+        """Claim every timer due by now, advancing periodic ones to their next deadline."""
+        due = []
+        for timer in self._timers:
+            if timer.deadline is None or timer.running or timer.deadline > now:
+                continue
+            timer.running = True
+            if timer.interval:
+                interval = self.effective_interval(timer)
+                timer.deadline += interval
+                if timer.deadline <= now:       # fell behind (suspend, slow run): skip missed runs
+                    timer.deadline = now + interval
+            else:
+                timer.deadline = None
+            due.append(timer)
+        return due
+
+    def _run_timer(self, timer):
+        try:
+            timer.callback()
+        except Exception as e:
+            log(f"[Timers] Error in '{timer.name}': {e}", logging.ERROR)
+        with self._cond:
+            timer.running = False
+            timer.runs += 1
+            self.counts["runs"] += 1
+            self._wake_if_earlier(timer)
+
+    def _dispatch(self, timer):
+        if not timer.blocking:
+            self._run_timer(timer)
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="timer")
+        self._pool.submit(self._run_timer, timer)
+
+    def run(self):
+        while True:
+            with self._cond:
+                now = time.time()
+                self._check_power(now)
+                due = self._due(now)
+                if not due:
+                    timeout = self._next_wake(now)
+                    self._sleep_until = float("inf") if timeout is None else now + timeout
+                    self._cond.wait(timeout)
+                    self._sleep_until = float("-inf")
+                    self._record_wake()
+                    continue
+            if len(due) > 1:
+                self.counts["shared_wakeups"] += 1
+            for timer in due:
+                self._dispatch(timer)
+
+    # ------------------------------
+    # Metrics
+    # ------------------------------
+    def _record_wake(self):
+        now = time.time()
+        self.counts["wakeups"] += 1
+        incr("timers.wakeups")
+        self._wakes.append(now)
+        while self._wakes and self._wakes[0] < now - self.WINDOW:
+            self._wakes.popleft()
+        self._sample_cpu(now)
+
+    def _sample_cpu(self, now, force=False):
+        if self._cpu_samples and not force and now - self._cpu_samples[-1][0] < 1.0:
+            return
+        cpu = time.process_time()
+        idle = now - self._last_activity >= self.idle_after
+        if self._cpu_samples:
+            last_wall, last_cpu, last_idle = self._cpu_samples[-1]
+            if idle and last_idle:
+                self._idle_cpu += cpu - last_cpu
+                self._idle_wall += now - last_wall
+        self._cpu_samples.append((now, cpu, idle))
+        while len(self._cpu_samples) > 2 and self._cpu_samples[1][0] < now - self.WINDOW:
+            self._cpu_samples.popleft()
+
+    def stats(self):
+        """Wakeups per minute and the assistant's own CPU use (% of one core)."""
+        with self._cond:
+            now = time.time()
+            self._sample_cpu(now, force=True)
+            first_wall, first_cpu, _ = self._cpu_samples[0]
+            window = max(1e-9, now - first_wall)
+            uptime = max(1e-9, now - self._started_at)
+            return {
+                "timers": len(self._timers),
+                "low_power": self.low_power,
+                "wakeups": self.counts["wakeups"],
+                "wakeups_per_minute": len(self._wakes) * 60 / min(self.WINDOW, uptime),
+                "shared_wakeups": self.counts["shared_wakeups"],
+                "runs": self.counts["runs"],
+                "cpu_percent": (time.process_time() - first_cpu) * 100 / window,
+                "idle_cpu_percent": self._idle_cpu * 100 / self._idle_wall if self._idle_wall else None,
+            }
+
+    def report(self):
+        s = self.stats()
+        idle = f"{s['idle_cpu_percent']:.2f}%" if s["idle_cpu_percent"] is not None else "n/a"
+        return (f"{s['timers']} timers, {s['wakeups_per_minute']:.1f} wakeups/min, "
+                f"CPU {s['cpu_percent']:.2f}% (idle {idle}), "
+                f"low-power {'on' if s['low_power'] else 'off'}")
+
+timer_service = TimerService()
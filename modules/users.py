@@ -0,0 +1,243 @@
+import atexit
+import glob
+import hashlib
+import heapq
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import quote, unquote
+
+from modules.background_tasks import ReminderScheduler, load_pending_reminders, next_occurrence, trigger_reminder
+from modules.brain import MemoryStore
+from modules.timers import timer_service
+from utils.logger import incr, log, span
+
+# Per-user data lives next to the code: users/<shard>/<user id>/{memory,reminders}.json
+USERS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "users")
+
+def is_valid_user_id(user_id):
+    """Any non-empty string except "." and ".." style ids, which would name the shard or its parent."""
+    return bool(user_id) and user_id.strip(".") != ""
+
+def user_directory(root, user_id):
+    """
+    Directory for one user's stores. Users are spread over 256 shard
+    directories by a hash of their id, so no directory grows too large, and
+    the id is percent-encoded so any valid id (see is_valid_user_id) is a
+    safe directory name. Raises ValueError for an invalid id.
+    """
+    if not is_valid_user_id(user_id):
+        raise ValueError(f"invalid user id: {user_id!r}")
+    shard = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:2]
+    return os.path.join(root, shard, quote(user_id, safe=""))
+
+def remind_user(user_id, message):
+    trigger_reminder(f"{message} (for {user_id})")
+
+class UserSession:
+    """
+    One user's memory store, reminder store and chat context.
+    The stores are opened on first use and closed again when the registry
+    evicts the user; `lock` serializes that user's commands only.
+    """
+
+    def __init__(self, user_id, directory, on_due, on_schedule=None):
+        self.user_id = user_id
+        self.directory = directory
+        self.on_due = on_due
+        self.on_schedule = on_schedule
+        self.lock = threading.RLock()
+        self.memory = None
+        self.reminders = None
+        self._conversation = None
+        self.last_used = time.monotonic()
+        self.refs = 0   # callers inside registry.session(); guarded by the registry lock
+
+    @property
+    def loaded(self):
+        return self.memory is not None
+
+    def load(self):
+        if self.memory is None:
+            with span("users.load"):
+                os.makedirs(self.directory, exist_ok=True)
+                self.memory = MemoryStore(os.path.join(self.directory, "memory.json"))
+                self.reminders = ReminderScheduler(os.path.join(self.directory, "reminders.json"),
+                                                   lambda message: self.on_due(self.user_id, message),
+                                                   self.on_schedule)
+            incr("users.loads")
+
+    @property
+    def conversation(self):
+        """This user's AI chat context, created on first use."""
+        if self._conversation is None:
+            from modules.ai_chat import ConversationSession, client
+            self._conversation = ConversationSession(client, fact_search=lambda query, k: self.memory.search(query, k))
+        return self._conversation
+
+    def close(self):
+        """Flush and drop the stores (pending reminders stay queued in the registry)."""
+        if self.memory is None:
+            return
+        self.memory.close()
+        self.reminders.close()
+        self.memory = None
+        self.reminders = None
+        self._conversation = None
+        incr("users.evictions")
+
+class UserRegistry:
+    """
+    Serves many users from one process.
+
+        with user_registry.session("alice") as user:
+            reply = execute(intent, user)
+
+    Users are loaded lazily, each under its own lock, so a slow command for one
+    user never blocks another; the registry lock only guards the table of
+    sessions and is never held during disk I/O. Users idle for longer than
+    `idle_timeout` seconds are flushed and evicted.
+
+    Reminders of every user, loaded or not, are driven by one timer on the
+    shared timer service, kept on the earliest entry of a heap of (due time,
+    user id): a due entry loads the user if needed and fires what is due, so
+    evicted users still get their reminders and no thread is kept per user.
+    Eviction runs as a periodic timer of its own.
+    """
+
+    def __init__(self, root=USERS_DIR, idle_timeout=600, on_due=remind_user, timers=None):
+        self.root = root
+        self.idle_timeout = idle_timeout
+        self.on_due = on_due
+        self.timers = timers or timer_service
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._due = []   # (timestamp, user id); stale entries are harmless
+        self._cond = threading.Condition()
+        self._reminder_timer = None
+        self._eviction_timer = None
+        self._scanned = False    # users on disk are queued by the first reminder run
+
+    # ------------------------------
+    # Sessions
+    # ------------------------------
+    @contextmanager
+    def session(self, user_id):
+        """Hold a user's lock with their stores loaded."""
+        with self._lock:
+            user = self._sessions.get(user_id)
+            if user is None:
+                user = self._sessions[user_id] = UserSession(
+                    user_id, user_directory(self.root, user_id), self.on_due,
+                    lambda timestamp: self._schedule(timestamp, user_id))
+            user.refs += 1
+        try:
+            with user.lock:
+                if not user.loaded:
+                    user.load()
+                    self._schedule(user.reminders.next_due(), user_id)
+                user.last_used = time.monotonic()
+                yield user
+        finally:
+            with self._lock:
+                user.refs -= 1
+                user.last_used = time.monotonic()
+
+    def loaded_users(self):
+        with self._lock:
+            return [user_id for user_id, user in self._sessions.items() if user.loaded]
+
+    def evict_idle(self, max_idle=None):
+        """Flush and drop users idle for longer than max_idle seconds. Returns how many were evicted."""
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            candidates = [user for user in self._sessions.values()
+                          if user.refs == 0 and now - user.last_used >= max_idle]
+        evicted = 0
+        for user in candidates:
+            if not user.lock.acquire(blocking=False):
+                continue  # busy after all
+            try:
+                user.close()
+            finally:
+                user.lock.release()
+            with self._lock:
+                # Anyone who picked the session up meanwhile reloads it under its lock.
+                if user.refs == 0 and not user.loaded and self._sessions.get(user.user_id) is user:
+                    del self._sessions[user.user_id]
+                    evicted += 1
+        return evicted
+
+    def close(self):
+        """Flush every loaded user (at exit)."""
+        self.stop()
+        with self._lock:
+            users = list(self._sessions.values())
+        for user in users:
+            with user.lock:
+                user.close()
+
+    # ------------------------------
+    # Reminders
+    # ------------------------------
+    def _schedule(self, timestamp, user_id):
+        if timestamp is None:
+            return
+        with self._cond:
+            heapq.heappush(self._due, (timestamp, user_id))
+            if self._reminder_timer is not None:
+                self._reminder_timer.reschedule(self._due[0][0])
+
+    def _scan_reminders(self):
+        """Queue the earliest reminder of every user on disk, without loading their memory."""
+        for path in glob.glob(os.path.join(self.root, "*", "*", "reminders.json")):
+            user_dir = os.path.basename(os.path.dirname(path))
+            reminders = load_pending_reminders(path)
+            if reminders:
+                timestamp = min(datetime.fromisoformat(r["due"]).timestamp() if "due" in r
+                                else next_occurrence(r["time"]).timestamp() for r in reminders)
+                self._schedule(timestamp, unquote(user_dir))
+
+    def start(self):
+        """Register the reminder and eviction timers (once); the first run scans the users on disk."""
+        with self._cond:
+            if self._reminder_timer is not None:
+                return
+            self._reminder_timer = self.timers.call_at(time.time(), self._fire_due, "user_reminders", blocking=True)
+            self._eviction_timer = self.timers.call_every(self.idle_timeout / 2, self.evict_idle, "user_eviction")
+
+    def stop(self):
+        with self._cond:
+            for timer in (self._reminder_timer, self._eviction_timer):
+                if timer is not None:
+                    timer.cancel()
+            self._reminder_timer = self._eviction_timer = None
+
+    def _fire_due(self):
+        if not self._scanned:
+            self._scanned = True
+            self._scan_reminders()
+        now = time.time()
+        with self._cond:
+            due_users = set()
+            while self._due and self._due[0][0] <= now:
+                due_users.add(heapq.heappop(self._due)[1])
+        for user_id in due_users:
+            try:
+                with self.session(user_id) as user:
+                    reminders = user.reminders
+                    messages = reminders.pop_due()
+                reminders.fire(messages)
+                self._schedule(reminders.next_due(), user_id)
+            except Exception as e:
+                log(f"[Users] Error firing reminders for {user_id}: {e}", logging.ERROR)
+        with self._cond:
+            if self._reminder_timer is not None:
+                self._reminder_timer.reschedule(self._due[0][0] if self._due else None)
+
+user_registry = UserRegistry()
+atexit.register(user_registry.close)
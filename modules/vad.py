@@ -0,0 +1,232 @@
+import wave
+from collections import namedtuple
+
+from utils.helpers import lazy_import
+from utils.logger import incr, log
+
+np = lazy_import("numpy")
+
+Segment = namedtuple("Segment", ["pcm", "start", "end"])   # 16-bit mono PCM bytes, start/end in seconds
+
+def to_int16(data, sample_width):
+    """
+    Little-endian PCM bytes as int16 samples. 16-bit audio is viewed in place
+    (no copy); 8- and 32-bit audio is converted.
+    """
+    data = memoryview(data)[:len(data) - len(data) % sample_width]
+    if sample_width == 2:
+        return np.frombuffer(data, dtype="<i2")
+    if sample_width == 1:
+        return ((np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128) << 8).astype(np.int16)
+    if sample_width == 4:
+        return (np.frombuffer(data, dtype="<i4") >> 16).astype(np.int16)
+    raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+
+def frame_features(frames):
+    """RMS energy and zero-crossing rate of every row of an (n, frame_samples) int16 array."""
+    samples = frames.astype(np.float32)
+    energy = np.sqrt(np.einsum("ij,ij->i", samples, samples) / frames.shape[1])
+    signs = np.signbit(frames)
+    crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy, crossings / (frames.shape[1] - 1)
+
+class AudioRing:
+    """
+    Preallocated ring of int16 samples.
+    write() copies incoming PCM straight into place, which is the only copy
+    made; view() returns slices of the ring itself, so feature extraction
+    reads the audio where it lies. Positions are absolute sample counts, so
+    callers can refer to audio still in the ring without tracking the wrap.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.written = 0
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+
+    @property
+    def oldest(self):
+        """Position of the oldest sample still held."""
+        return max(0, self.written - self.capacity)
+
+    def write(self, samples):
+        if len(samples) > self.capacity:
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        start = self.written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[:len(samples) - first] = samples[first:]
+        self.written += len(samples)
+
+    def view(self, start, end):
+        """Samples [start, end) as one view into the ring, or two when the range wraps."""
+        if not self.oldest <= start <= end <= self.written:
+            raise IndexError(f"samples {start}-{end} are not in the ring")
+        offset = start % self.capacity
+        stop = offset + end - start
+        if stop <= self.capacity:
+            return (self._buffer[offset:stop],)
+        return (self._buffer[offset:], self._buffer[:stop - self.capacity])
+
+    def read(self, start, end):
+        """Samples [start, end) as bytes, for handing a segment on."""
+        return b"".join(part.tobytes() for part in self.view(start, end))
+
+class VoiceActivityDetector:
+    """
+    Local voice-activity detection in front of speech recognition.
+
+    Captured PCM is written into an AudioRing and processed in whole frames
+    (20 ms by default): the RMS energy and zero-crossing rate of every new
+    frame are computed in one vectorized pass. A frame is voiced when its
+    energy is `energy_ratio` times above the noise floor (and above
+    `min_energy`) and its zero-crossing rate is below `max_zcr`, which rules
+    out hiss. The noise floor is calibrated on the first `calibration_ms` and
+    then follows the quiet frames between phrases.
+
+    A phrase ends after `pause_ms` without voiced frames (or at
+    `max_phrase_seconds`) and is trimmed to its voiced frames plus `pad_ms`
+    either side. Phrases with less than `min_speech_ms` of voiced frames, such
+    as clicks, bumps and clipped noise bursts, are dropped, so only speech is
+    ever sent for recognition.
+    """
+
+    def __init__(self, sample_rate=16000, sample_width=2, frame_ms=20, calibration_ms=500,
+                 energy_ratio=3.0, min_energy=100, max_zcr=0.45, min_speech_ms=200,
+                 pause_ms=500, pad_ms=150, max_phrase_seconds=10, noise_adapt=0.05):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frame_samples = max(2, sample_rate * frame_ms // 1000)
+        frames = lambda ms: max(1, round(ms / frame_ms))
+        self.calibration_frames = frames(calibration_ms)
+        self.min_speech_frames = frames(min_speech_ms)
+        self.pause_frames = frames(pause_ms)
+        self.pad_frames = min(frames(pad_ms), self.pause_frames)
+        self.max_frames = frames(max_phrase_seconds * 1000)
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.max_zcr = max_zcr
+        self.noise_adapt = noise_adapt
+        self.noise_floor = None
+        # Room for the longest phrase plus its padding and a few seconds of slack.
+        capacity = self.max_frames + 2 * self.pad_frames + self.pause_frames + frames(3000)
+        self.ring = AudioRing(capacity * self.frame_samples)
+        self._calibration = []
+        self._next_frame = 0      # first frame not processed yet
+        self._start = None        # first voiced frame of the open phrase
+        self._last = None         # last voiced frame of the open phrase
+        self._voiced = 0          # voiced frames in the open phrase
+        self._sent_until = 0      # end of the last segment, so paddings never overlap
+        self.stats = {"frames": 0, "frames_sent": 0, "segments": 0, "rejected": 0}
+
+    @property
+    def fraction_sent(self):
+        return self.stats["frames_sent"] / self.stats["frames"] if self.stats["frames"] else 0.0
+
+    def feed(self, data):
+        """Add captured PCM bytes; returns the Segments completed by it."""
+        self.ring.write(to_int16(data, self.sample_width))
+        fs = self.frame_samples
+        complete = self.ring.written // fs
+        self._next_frame = max(self._next_frame, -(-self.ring.oldest // fs))
+        segments = []
+        while self._next_frame < complete:
+            for part in self.ring.view(self._next_frame * fs, complete * fs):
+                frames = part.reshape(-1, fs)
+                segments.extend(self._process(frames))
+        return segments
+
+    def flush(self):
+        """End of the audio: close the open phrase, if any."""
+        return self._close(self._next_frame) if self._start is not None else []
+
+    def _calibrate(self, energy):
+        needed = self.calibration_frames - len(self._calibration)
+        self._calibration.extend(energy[:needed].tolist())
+        if len(self._calibration) >= self.calibration_frames:
+            self.noise_floor = float(np.median(self._calibration))
+            log(f"🎚️ Noise floor calibrated: {self.noise_floor:.0f}")
+        return needed
+
+    def _process(self, frames):
+        base = self._next_frame
+        self._next_frame += len(frames)
+        self.stats["frames"] += len(frames)
+        energy, zcr = frame_features(frames)
+        if self.noise_floor is None:
+            skip = self._calibrate(energy)
+            if self.noise_floor is None:
+                return []
+            base += skip
+            energy, zcr = energy[skip:], zcr[skip:]
+
+        threshold = max(self.min_energy, self.noise_floor * self.energy_ratio)
+        voiced = (energy > threshold) & (zcr < self.max_zcr)
+        quiet = energy[energy <= threshold]   # not hiss or bursts, whatever their ZCR
+        if self._start is None and quiet.size:
+            self.noise_floor += self.noise_adapt * (float(quiet.mean()) - self.noise_floor)
+
+        segments = []
+        for frame in (np.flatnonzero(voiced) + base).tolist():
+            if self._start is not None:
+                if frame - self._last - 1 >= self.pause_frames:
+                    segments.extend(self._close(self._last + 1 + self.pad_frames))
+                elif frame - self._start >= self.max_frames:
+                    segments.extend(self._close(self._last + 1))
+            if self._start is None:
+                self._start = frame
+                self._voiced = 0
+            self._last = frame
+            self._voiced += 1
+        if self._start is not None and self._next_frame - self._last - 1 >= self.pause_frames:
+            segments.extend(self._close(self._last + 1 + self.pad_frames))
+        return segments
+
+    def _close(self, end):
+        """Finish the open phrase at frame `end` (exclusive)."""
+        start, voiced = self._start, self._voiced
+        self._start = self._last = None
+        if voiced < self.min_speech_frames:
+            self.stats["rejected"] += 1
+            incr("vad.rejected")
+            return []
+        fs = self.frame_samples
+        start = max(start - self.pad_frames, self._sent_until, -(-self.ring.oldest // fs))
+        end = min(end, self._next_frame)
+        self._sent_until = end
+        self.stats["segments"] += 1
+        self.stats["frames_sent"] += end - start
+        incr("vad.segments")
+        return [Segment(self.ring.read(start * fs, end * fs), start * fs / self.sample_rate,
+                        end * fs / self.sample_rate)]
+
+class WavSource:
+    """
+    Audio source that reads a mono WAV file. It has the same shape as
+    sr.AudioFile and sr.Microphone (a context manager with .stream.read(frames),
+    SAMPLE_RATE, SAMPLE_WIDTH and CHUNK), so the Listener and the VAD can run
+    offline without speech_recognition.
+    """
+
+    def __init__(self, path, chunk=1024):
+        self.path = path
+        self.CHUNK = chunk
+        self.stream = None
+
+    def __enter__(self):
+        self._wav = wave.open(self.path, "rb")
+        if self._wav.getnchannels() != 1:
+            self._wav.close()
+            raise ValueError(f"{self.path}: only mono WAV files are supported")
+        self.SAMPLE_RATE = self._wav.getframerate()
+        self.SAMPLE_WIDTH = self._wav.getsampwidth()
+        self.stream = self
+        return self
+
+    def read(self, frames):
+        return self._wav.readframes(frames)
+
+    def __exit__(self, exc_type, exc, tb):
+        self._wav.close()
+        self.stream = None
@@ -1,2 +1,240 @@
-def start_cli():
-    print("Starting CLI Assistant...")
+"""
+Text front-end for the assistant.
+
+Feeds typed or recorded commands through the same route + execute dispatch as
+main.main(), without a microphone. Commands can come from stdin, a file, or a
+local TCP / Unix socket (one command per line, one reply line back), and the
+replay mode runs a file of utterances as fast as possible and reports
+throughput and per-intent latency.
+
+    python -m ui.cli                          # interactive, replies printed
+    python -m ui.cli --file commands.txt
+    python -m ui.cli --tcp 127.0.0.1:7777
+    python -m ui.cli --unix /tmp/assistant.sock
+    python -m ui.cli --replay utterances.txt --route-only
+
+Typing /metrics prints the per-stage latency breakdown collected so far,
+followed by the background timers' wakeups per minute and the assistant's
+own CPU use, and each outbound service's circuit state, error rate and
+latency.
+
+A command prefixed with "@<user> " runs against that user's own memory,
+reminders and chat context (see modules.users), e.g. "@alice what is my
+favorite food". Different users' commands run concurrently; the reply is
+the returned text only.
+"""
+import argparse
+import logging
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from modules import speech
+from modules.gateway import gateway
+from modules.intent_router import route, is_exit
+from modules.timers import timer_service
+from utils.logger import dump_metrics, log
+
+_dispatch_lock = threading.Lock()
+
+def read_commands(lines):
+    """Yield non-empty, non-comment lines."""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+def execute_intent(intent, sink):
+    """Execute a routed intent exactly as the voice loop does; returns everything spoken."""
+    from main import execute  # imported here so routing alone needs no action modules
+    with _dispatch_lock:
+        sink.drain()
+        reply = execute(intent)
+        if reply:
+            speech.speak(reply)
+        return sink.drain()
+
+def execute_for_user(intent, user_id):
+    """Execute a routed intent for one user, holding only that user's lock; returns the reply."""
+    from main import execute
+    from modules.users import is_valid_user_id, user_registry
+    if not is_valid_user_id(user_id):
+        return [f"'{user_id}' is not a valid user name."]
+    user_registry.start()
+    with user_registry.session(user_id) as user:
+        reply = execute(intent, user)
+        if reply is not None and not isinstance(reply, str):
+            reply = "".join(reply)  # a streamed AI answer
+    return [reply] if reply else []
+
+def split_user(command):
+    """Split "@alice open notepad" into ("alice", "open notepad"); (None, command) otherwise."""
+    if command.startswith("@") and " " in command:
+        user_id, command = command[1:].split(" ", 1)
+        return user_id, command.strip()
+    return None, command
+
+def handle_command(command, sink, route_only=False):
+    """
+    Route and execute one command. Returns (intent, replies), where replies is
+    everything spoken while handling it.
+    """
+    user_id, command = split_user(command)
+    intent = route(command)
+    if route_only:
+        return intent, []
+    if user_id:
+        return intent, execute_for_user(intent, user_id)
+    return intent, execute_intent(intent, sink)
+
+def run_lines(lines, sink, out=sys.stdout, route_only=False):
+    """Handle commands one by one, writing each reply; stops on an exit command."""
+    for command in read_commands(lines):
+        if command == "/metrics":
+            dump_metrics(out)
+            out.write(f"timers: {timer_service.report()}\n")
+            out.write(f"services: {gateway.report()}\n")
+            continue
+        intent, replies = handle_command(command, sink, route_only)
+        out.write((" ".join(replies) if replies else f"[{intent.name}]") + "\n")
+        out.flush()
+        if is_exit(intent):
+            break
+
+# ------------------------------
+# Socket Server
+# ------------------------------
+class CommandHandler(socketserver.StreamRequestHandler):
+    """One command per line in, one reply per line out."""
+
+    def handle(self):
+        for raw in self.rfile:
+            command = raw.decode("utf-8", "replace").strip()
+            if not command:
+                continue
+            intent, replies = handle_command(command, self.server.sink, self.server.route_only)
+            reply = " ".join(replies) if replies else f"[{intent.name}]"
+            self.wfile.write((reply + "\n").encode("utf-8"))
+            if is_exit(intent):
+                break
+
+class ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def serve(sink, tcp=None, unix=None, route_only=False):
+    """Serve commands on a local TCP address ("host:port") or Unix socket path until interrupted."""
+    if tcp:
+        host, port = tcp.rsplit(":", 1)
+        server = ThreadingTCPServer((host, int(port)), CommandHandler)
+    else:
+        if os.path.exists(unix):
+            os.remove(unix)
+        server = ThreadingUnixServer(unix, CommandHandler)
+    server.sink = sink
+    server.route_only = route_only
+    print(f"[CLI] Serving commands on {tcp or unix}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# ------------------------------
+# Replay
+# ------------------------------
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+def replay(path, sink, repeat=1, route_only=False, out=sys.stdout):
+    """
+    Run every utterance in a file as fast as possible and report throughput and
+    p50/p95/p99 latency per intent. Exit commands are routed but not executed.
+    Returns {intent: sorted latencies in seconds}.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        commands = list(read_commands(f))
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for command in commands:
+            t0 = time.perf_counter()
+            user_id, text = split_user(command)
+            intent = route(text)
+            if not route_only and not is_exit(intent):
+                try:
+                    if user_id:
+                        execute_for_user(intent, user_id)
+                    else:
+                        execute_intent(intent, sink)
+                except Exception as e:
+                    errors[intent.name] += 1
+                    log(f"[CLI] Error replaying '{command}': {e}", logging.ERROR)
+            latencies[intent.name].append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in latencies.values())
+    out.write(f"{total} utterances in {elapsed:.3f} s ({total / elapsed:.0f} per second)\n")
+    out.write(f"{'intent':<12}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}\n")
+    for name in sorted(latencies):
+        values = sorted(latencies[name])
+        latencies[name] = values
+        out.write(f"{name:<12}{len(values):>8}{errors[name]:>8}{percentile(values, 50) * 1e3:>10.3f}"
+                  f"{percentile(values, 95) * 1e3:>10.3f}{percentile(values, 99) * 1e3:>10.3f}\n")
+    return dict(latencies)
+
+def make_sink(kind):
+    """
+    Build a speech sink: "capture" records replies, "null" discards them and
+    "tts" records them and also speaks them aloud.
+    """
+    if kind == "tts":
+        voice = speech.speech_output
+        return speech.CapturedSpeechOutput(echo=lambda text: voice.say(text).wait())
+    return speech.CapturedSpeechOutput() if kind == "capture" else speech.NullSpeechOutput()
+
+def start_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Text front-end for the assistant.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--file", help="read commands from a file instead of stdin")
+    source.add_argument("--tcp", metavar="HOST:PORT", help="serve commands on a local TCP port")
+    source.add_argument("--unix", metavar="PATH", help="serve commands on a Unix socket")
+    source.add_argument("--replay", metavar="FILE", help="replay utterances and report latency per intent")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the file this many times")
+    parser.add_argument("--sink", choices=["capture", "null", "tts"], default="capture",
+                        help="where speech output goes (default: captured and printed)")
+    parser.add_argument("--route-only", action="store_true", help="classify commands without executing them")
+    parser.add_argument("--metrics", action="store_true", help="print the latency breakdown before exiting")
+    args = parser.parse_args(argv)
+
+    sink = make_sink(args.sink)
+    speech.use_speech_output(sink)
+
+    if not (args.replay or args.route_only):
+        # Reminders set here must fire too; "@user" reminders are driven by modules.users.
+        from modules.background_tasks import start_background_tasks
+        start_background_tasks()
+
+    if args.replay:
+        replay(args.replay, sink, args.repeat, args.route_only)
+    elif args.tcp or args.unix:
+        serve(sink, args.tcp, args.unix, args.route_only)
+    elif args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            run_lines(f, sink, route_only=args.route_only)
+    else:
+        print("Starting CLI Assistant... (type 'exit' to quit)")
+        run_lines(sys.stdin, sink, route_only=args.route_only)
+    if args.metrics:
+        dump_metrics()
+
+if __name__ == "__main__":
+    start_cli()
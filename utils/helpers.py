@@ -1,2 +1,53 @@
+import importlib
+import logging
+import threading
+
+from utils.logger import log, span
+
 def clean_text(text):
-    return text.strip().lower()
\ No newline at end of file
+    return text.strip().lower()
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+        sr = lazy_import("speech_recognition")
+        sr.Recognizer()        # speech_recognition is imported here
+
+    Heavy optional dependencies are declared this way so that importing the
+    assistant stays fast; each import is timed under the "import.<name>" span.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    with span(f"import.{self._name}"):
+                        self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}' ({'loaded' if self.loaded else 'not loaded'})>"
+
+def lazy_import(name):
+    return LazyModule(name)
+
+def prewarm(*modules):
+    """Import lazy modules ahead of first use; missing dependencies are logged and skipped."""
+    for module in modules:
+        try:
+            module.load()
+        except Exception as e:
+            log(f"[Startup] Could not pre-load {module._name}: {e}", logging.WARNING)
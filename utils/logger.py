@@ -1,6 +1,142 @@
+import atexit
+import bisect
 import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from contextlib import ContextDecorator
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# ------------------------------
+# Non-blocking Logging
+# ------------------------------
+# Records are put on a queue by the calling thread and written to stderr by a
+# QueueListener thread, so logging never blocks the speech or dispatch paths.
+_log_queue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+_listener.start()
+atexit.register(_listener.stop)
 
-def log(message):
-    logging.info(message)
\ No newline at end of file
+logger = logging.getLogger("assistant")
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.propagate = False
+
+def log(message, level=logging.INFO):
+    logger.log(level, message)
+
+# ------------------------------
+# Metrics
+# ------------------------------
+# Histogram bucket upper bounds in seconds: 10 us to 100 s, four per decade.
+BUCKETS = [1e-5 * 10 ** (i / 4) for i in range(29)]
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+_metrics_lock = threading.Lock()
+histograms = {}
+counters = {}
+
+def incr(name, amount=1):
+    """Increment a named counter."""
+    with _metrics_lock:
+        counters[name] = counters.get(name, 0) + amount
+
+def observe(name, seconds):
+    """Record one duration (seconds) in a named histogram."""
+    with _metrics_lock:
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+class span(ContextDecorator):
+    """
+    Time a block or a function into the histogram of the same name.
+
+        with span("tts.say"):
+            ...
+
+        @span("gemini.generate")
+        def generate(...):
+            ...
+
+    Exceptions are counted under "<name>.errors" and re-raised.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._starts = threading.local()
+
+    def __enter__(self):
+        stack = getattr(self._starts, "stack", None)
+        if stack is None:
+            stack = self._starts.stack = []
+        stack.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self._starts.stack.pop())
+        if exc_type is not None:
+            incr(self.name + ".errors")
+        return False
+
+def reset_metrics():
+    with _metrics_lock:
+        histograms.clear()
+        counters.clear()
+
+def metrics_snapshot():
+    """Return {"spans": {name: stats}, "counters": {...}} with times in milliseconds."""
+    with _metrics_lock:
+        spans = {
+            name: {
+                "count": h.count,
+                "total_ms": h.total * 1e3,
+                "mean_ms": h.total * 1e3 / h.count if h.count else 0.0,
+                "p50_ms": h.percentile(50) * 1e3,
+                "p95_ms": h.percentile(95) * 1e3,
+                "max_ms": h.max * 1e3,
+            }
+            for name, h in histograms.items()
+        }
+        return {"spans": spans, "counters": dict(counters)}
+
+def dump_metrics(out=None):
+    """Print a latency breakdown, spans ordered by total time spent."""
+    out = out or sys.stdout
+    snapshot = metrics_snapshot()
+    out.write(f"{'span':<24}{'count':>8}{'total ms':>12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}\n")
+    for name, s in sorted(snapshot["spans"].items(), key=lambda item: -item[1]["total_ms"]):
+        out.write(f"{name:<24}{s['count']:>8}{s['total_ms']:>12.1f}{s['mean_ms']:>10.2f}"
+                  f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['max_ms']:>10.2f}\n")
+    for name, value in sorted(snapshot["counters"].items()):
+        out.write(f"{name:<24}{value:>8}\n")